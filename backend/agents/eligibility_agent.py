@@ -9,6 +9,9 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../.
 
 from typing import Dict
 from backend.utils.dgca_rules import DGCARulesEngine, DisruptionType
+from backend.utils.airports import get_airport_index
+from backend.utils.schedule_index import get_schedule_index
+from backend.utils.templates import get_template_renderer
 
 
 class EligibilityAgent:
@@ -32,11 +35,41 @@ class EligibilityAgent:
         
         # Extract required fields
         disruption_type_str = flight_data.get('disruption_type', 'delay')
-        flight_duration_hours = flight_data.get('flight_duration_hours', 2.0)
+        flight_duration_hours = flight_data.get('flight_duration_hours')
         delay_hours = flight_data.get('delay_hours')
-        is_international = flight_data.get('is_international', False)
+        is_international = flight_data.get('is_international')
         exemption_reason = flight_data.get('exemption_reason')
         
+        departure = flight_data.get('departure')
+        arrival = flight_data.get('arrival')
+        
+        # Scheduled block time and route for this flight number, if known
+        scheduled_flight = None
+        if flight_duration_hours is None or is_international is None:
+            scheduled_flight = get_schedule_index().lookup(
+                flight_data.get('flight_number'), flight_data.get('flight_date')
+            )
+            if scheduled_flight:
+                if flight_duration_hours is None:
+                    flight_duration_hours = scheduled_flight['block_hours']
+                departure = departure or scheduled_flight['departure_airport']
+                arrival = arrival or scheduled_flight['arrival_airport']
+        
+        # Fill duration / international flag from the route when not given
+        route_estimate = None
+        if flight_duration_hours is None or is_international is None:
+            route_estimate = get_airport_index().estimate_route(departure, arrival)
+            if route_estimate:
+                if flight_duration_hours is None:
+                    flight_duration_hours = route_estimate['flight_duration_hours']
+                if is_international is None:
+                    is_international = route_estimate['is_international']
+        
+        if flight_duration_hours is None:
+            flight_duration_hours = 2.0
+        if is_international is None:
+            is_international = False
+        
         # Map string to enum
         disruption_type_map = {
             'delay': DisruptionType.DELAY,
@@ -77,53 +110,29 @@ class EligibilityAgent:
             'exemption_applied': result['exemption_applied'],
             'exemption_reason': result.get('exemption_reason'),
             'airline_obligations': obligations,
+            'flight_duration_hours': flight_duration_hours,
+            'is_international': is_international,
+            'scheduled_flight': scheduled_flight,
+            'route_estimate': route_estimate,
+            'rules_version': result['rules_version'],
             'agent': 'eligibility_agent',
             'legal_basis': 'DGCA CAR Section 3, Series M, Part IV'
         }
         
         return response
     
-    def get_user_friendly_message(self, eligibility_result: Dict) -> str:
+    def get_user_friendly_message(self, eligibility_result: Dict, language: str = None) -> str:
         """
         Convert eligibility result to user-friendly message
         
         Args:
             eligibility_result: Result from check_eligibility
+            language: Language code (e.g. 'hi'); English when there is no translation
             
         Returns:
             Formatted message for user
         """
-        if eligibility_result['eligible']:
-            amount = eligibility_result['compensation_amount']
-            message = f"✅ **Good News!**\n\n"
-            message += f"You are **eligible** for compensation of **₹{amount:,}**\n\n"
-            message += f"**Reason:** {eligibility_result['reason']}\n\n"
-            
-            # Add obligations if any
-            if eligibility_result.get('airline_obligations'):
-                oblig = eligibility_result['airline_obligations']
-                message += "**Airline Must Also Provide:**\n"
-                if oblig.get('meals_and_refreshments'):
-                    message += "• Meals and refreshments\n"
-                if oblig.get('hotel_accommodation'):
-                    message += "• Hotel accommodation\n"
-                if oblig.get('communication'):
-                    message += "• 2 phone calls/emails\n"
-                if oblig.get('refund_option'):
-                    message += "• Full refund option\n"
-                message += "\n"
-            
-            message += "**Legal Basis:** DGCA CAR Section 3\n\n"
-            message += "Would you like me to file the claim on your behalf?"
-        else:
-            message = f"❌ **Eligibility Status**\n\n"
-            message += f"Unfortunately, you may not be eligible for compensation.\n\n"
-            message += f"**Reason:** {eligibility_result['reason']}\n"
-            
-            if eligibility_result.get('exemption_applied'):
-                message += f"\n**Exemption:** {eligibility_result['exemption_reason']}"
-        
-        return message
+        return get_template_renderer().render('eligibility_message.txt', eligibility_result, language=language)
 
 
 # Example usage
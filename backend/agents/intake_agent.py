@@ -2,17 +2,44 @@
 Intake Agent - Extracts flight details from natural language input
 Uses GPT-4 to parse user messages and extract structured flight information
 """
-print("🔥 USING GEMINI INTAKE AGENT 🔥")
 
 import os
 import json
+import threading
+from collections import Counter
 from datetime import datetime
 from typing import Dict, Optional
-import google.generativeai as genai
 from dotenv import load_dotenv
 
+from backend.agents.rule_extractor import RuleBasedExtractor
+from backend.utils.cache import TieredCache, make_cache_key
+from backend.utils.resilience import ResilientCaller
+from backend.utils.conversation_store import compact_summary, merge_fields
+from backend.utils.airports import get_airport_index
+from backend.utils.schedule_index import get_schedule_index
+
 load_dotenv()
 
+GEMINI_MODEL = "gemini-3-flash-preview"
+
+# Bump when the extraction prompt changes so cached extractions are discarded
+PROMPT_VERSION = 1
+
+
+def transient_llm_errors() -> tuple:
+    """
+    Gemini errors worth retrying and counting against the breaker: timeouts,
+    connection errors, every 5xx and rate limits (429)
+    """
+    from google.api_core import exceptions as google_exceptions
+    return (
+        TimeoutError,
+        ConnectionError,
+        google_exceptions.ServerError,
+        google_exceptions.ResourceExhausted,
+        google_exceptions.TooManyRequests,
+    )
+
 
 class IntakeAgent:
     """
@@ -20,12 +47,52 @@ class IntakeAgent:
     """
     
     def __init__(self):
-        genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
-        model_name = "gemini-3-flash-preview"
-        print("Using Gemini model:", model_name)
+        # The Gemini SDK takes most of a second to import; it is loaded on
+        # the first LLM call (or by load_model() in the gunicorn master), so
+        # rule-based and cached extractions never pay for it
+        self.model_name = GEMINI_MODEL
+        self._model = None
+        self._model_lock = threading.Lock()
 
-        self.model = genai.GenerativeModel(model_name)
+        # Cache of successful extractions keyed on normalized message + context,
+        # model and prompt version (and the date, for relative dates)
+        self.cache = TieredCache.from_env('INTAKE')
+        
+        # Deterministic fast path for well-formed messages
+        self.rule_extractor = RuleBasedExtractor()
+        
+        # Bulkhead, deadline, retry and circuit breaker around Gemini calls
+        # (transient error types are filled in by load_model). The SDK gets
+        # each attempt's timeout, so a hung call gives its slot back
+        self.llm = ResilientCaller.from_env(
+            'gemini', 'GEMINI',
+            timeout_kwargs=lambda timeout: {'request_options': {'timeout': timeout}}
+        )
+        
+        # Which path served each extraction: rules, cache, llm, degraded or error
+        self.path_counts = Counter()
+        self._counts_lock = threading.Lock()
 
+    def load_model(self):
+        """
+        Import and configure the Gemini SDK and create the model (once)
+        
+        Returns:
+            The GenerativeModel
+        """
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    import google.generativeai as genai
+                    genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+                    print("Using Gemini model:", self.model_name)
+                    self.llm.transient_errors = transient_llm_errors()
+                    self._model = genai.GenerativeModel(self.model_name)
+        return self._model
+    
+    @property
+    def model(self):
+        return self.load_model()
     
     def extract_flight_details(self, user_message: str, context: Optional[Dict] = None) -> Dict:
         """
@@ -38,6 +105,23 @@ class IntakeAgent:
         Returns:
             Dictionary with extracted flight details
         """
+        result = self.rule_extractor.extract(user_message)
+        if result['confidence'] == 'high':
+            result['raw_message'] = user_message
+            result['extracted_at'] = datetime.utcnow().isoformat()
+            result['agent'] = 'intake_agent'
+            result['extraction_path'] = 'rules'
+            self._count_path('rules')
+            return result
+        
+        cache_key = make_cache_key(user_message, context, version=f"{self.model_name}/{PROMPT_VERSION}")
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            cached['raw_message'] = user_message
+            cached['cached'] = True
+            cached['extraction_path'] = 'cache'
+            self._count_path('cache')
+            return cached
         
         system_prompt = """You are an AI assistant for FlyClaim AI, helping passengers file flight compensation claims.
 
@@ -94,23 +178,30 @@ Output:
 }
 """
         
-        user_prompt = f"User message: {user_message}"
-        
+        # Earlier turns are summarized as the fields already known, not replayed
+        context_note = ''
         if context:
-            user_prompt += f"\n\nPrevious context: {json.dumps(context)}"
+            context_note = (
+                "\n            Already known from earlier messages (keep unless the user corrects them):\n"
+                f"            {json.dumps(context, separators=(',', ':'), default=str)}\n"
+            )
         
-        try:
-            prompt = f"""
+        prompt = f"""
             {system_prompt}
-
+{context_note}
             User message:
             {user_message}
 
             Respond ONLY with valid JSON.
            """
-
-            response = self.model.generate_content(prompt)
-
+        
+        try:
+            response = self.llm.call(self.model.generate_content, prompt)
+        except Exception as e:
+            # Gemini unavailable, overloaded or too slow: answer from the rules instead
+            return self._degraded_result(result, user_message, e)
+        
+        try:
             result = json.loads(response.text)
 
             
@@ -118,10 +209,15 @@ Output:
             result['raw_message'] = user_message
             result['extracted_at'] = datetime.utcnow().isoformat()
             result['agent'] = 'intake_agent'
+            result['extraction_path'] = 'llm'
+            
+            self.cache.set(cache_key, result)
+            self._count_path('llm')
             
             return result
             
         except Exception as e:
+            self._count_path('error')
             return {
                 'error': str(e),
                 'raw_message': user_message,
@@ -130,12 +226,100 @@ Output:
                 'missing_fields': ['all']
             }
     
-    def validate_extracted_data(self, extracted_data: Dict) -> Dict:
+    def continue_extraction(self, user_message: str, known_fields: Dict, pending_fields: list) -> Dict:
+        """
+        Extract a follow-up message and merge it into a conversation's fields
+        
+        A reply that answers every field we asked for ("5 hours", "Mumbai")
+        is parsed by rules alone. Otherwise the message goes through
+        extract_flight_details with a compact summary of the known fields as
+        context. A different flight number starts a new claim.
+        
+        Args:
+            user_message: The user's latest message
+            known_fields: Fields merged from earlier messages
+            pending_fields: Fields the user was last asked for
+            
+        Returns:
+            Extraction dictionary with the merged fields
+        """
+        answer = self.rule_extractor.extract_answer(user_message, pending_fields)
+        if pending_fields and all(field in answer for field in pending_fields):
+            self._count_path('followup')
+            result = merge_fields(known_fields, answer)
+            result.update({
+                'raw_message': user_message,
+                'extracted_at': datetime.utcnow().isoformat(),
+                'agent': 'intake_agent',
+                'extraction_path': 'followup',
+                'confidence': 'high'
+            })
+            return result
+        
+        extracted = self.extract_flight_details(user_message, compact_summary(known_fields, pending_fields))
+        
+        new_flight = extracted.get('flight_number')
+        if new_flight and known_fields.get('flight_number') and new_flight != known_fields['flight_number']:
+            return extracted
+        
+        if extracted.get('error') and not any(known_fields.values()):
+            return extracted
+        
+        result = dict(extracted)
+        result.pop('error', None)
+        result.update(merge_fields(known_fields, merge_fields(extracted, answer)))
+        return result
+    
+    def _degraded_result(self, partial: Dict, user_message: str, error: Exception) -> Dict:
+        """
+        Build a no-LLM response from the partial rule-based extraction
+        
+        Fields the rules could not resolve stay null and are listed in
+        missing_fields, so callers ask the user for them as usual.
+        """
+        self._count_path('degraded')
+        partial['raw_message'] = user_message
+        partial['extracted_at'] = datetime.utcnow().isoformat()
+        partial['agent'] = 'intake_agent'
+        partial['extraction_path'] = 'degraded'
+        partial['degraded'] = True
+        partial['degraded_reason'] = f"{type(error).__name__}: {error}"
+        partial['confidence'] = 'low'
+        return partial
+    
+    def stats(self) -> Dict:
+        """
+        Return runtime counters for monitoring
+        
+        Returns:
+            Dictionary with extraction path and cache statistics
+        """
+        with self._counts_lock:
+            paths = dict(self.path_counts)
+        
+        total = sum(paths.values())
+        return {
+            'extraction_paths': paths,
+            'llm_skip_rate': round(
+                (paths.get('rules', 0) + paths.get('cache', 0) + paths.get('followup', 0)) / total, 4
+            ) if total else 0.0,
+            'cache': self.cache.stats(),
+            'llm': self.llm.stats(),
+            'model_loaded': self._model is not None
+        }
+    
+    def _count_path(self, path: str):
+        with self._counts_lock:
+            self.path_counts[path] += 1
+    
+    def validate_extracted_data(self, extracted_data: Dict, require_delay_hours: bool = False) -> Dict:
         """
         Validate and normalize extracted data
         
         Args:
             extracted_data: Data extracted by extract_flight_details
+            require_delay_hours: Treat a delay without delay_hours as invalid
+                (the WhatsApp conversation asks for it); otherwise only warn
             
         Returns:
             Dictionary with validation results
@@ -173,9 +357,20 @@ Output:
         # Check for delay duration if disruption is delay
         if extracted_data.get('disruption_type') == 'delay':
             if not extracted_data.get('delay_hours'):
+                if require_delay_hours:
+                    # Compensation depends on the delay length; ask before checking eligibility
+                    validation['is_valid'] = False
                 validation['warnings'].append("Delay duration not specified")
                 validation['required_follow_up'].append('delay_hours')
         
+        # Fill route and block time from the schedule when the message omitted them
+        if extracted_data.get('flight_number') and not (
+            extracted_data.get('departure') and extracted_data.get('arrival') and extracted_data.get('flight_duration_hours')
+        ):
+            filled = self._fill_from_schedule(extracted_data)
+            if filled:
+                validation['filled_from_schedule'] = filled
+        
         # Check route information
         if not extracted_data.get('departure') or not extracted_data.get('arrival'):
             validation['warnings'].append("Route information incomplete")
@@ -183,6 +378,29 @@ Output:
         
         return validation
     
+    def _fill_from_schedule(self, extracted_data: Dict) -> list:
+        """Fill missing departure/arrival/duration in place; returns the fields filled"""
+        flight_date = extracted_data.get('flight_date')
+        try:
+            scheduled = get_schedule_index().lookup(extracted_data['flight_number'], flight_date)
+        except (ValueError, TypeError):
+            return []
+        if not scheduled:
+            return []
+        
+        airports = get_airport_index().airports
+        values = {
+            'departure': getattr(airports.get(scheduled['departure_airport']), 'city', scheduled['departure_airport']),
+            'arrival': getattr(airports.get(scheduled['arrival_airport']), 'city', scheduled['arrival_airport']),
+            'flight_duration_hours': scheduled['block_hours']
+        }
+        filled = []
+        for field, value in values.items():
+            if not extracted_data.get(field):
+                extracted_data[field] = value
+                filled.append(field)
+        return filled
+    
     def generate_follow_up_question(self, missing_field: str) -> str:
         """
         Generate a natural follow-up question for missing information
@@ -0,0 +1,87 @@
+"""
+Agent Registry - One instance of each agent per process, built on first use
+Routes call get_intake_agent()/get_eligibility_agent() instead of building
+their own agents at import; preload() builds and warms everything up front
+(used by the gunicorn master so workers inherit it copy-on-write)
+"""
+
+import time
+import threading
+from typing import Dict
+
+from backend.agents.intake_agent import IntakeAgent
+from backend.agents.eligibility_agent import EligibilityAgent
+
+
+_agents = {}
+_lock = threading.Lock()
+
+AGENT_CLASSES = {
+    'intake': IntakeAgent,
+    'eligibility': EligibilityAgent
+}
+
+
+def get_agent(name: str):
+    """
+    Return the process-wide agent called name, constructing it on first use
+
+    Raises:
+        KeyError: Unknown agent name
+    """
+    agent = _agents.get(name)
+    if agent is None:
+        with _lock:
+            agent = _agents.get(name)
+            if agent is None:
+                agent = _agents[name] = AGENT_CLASSES[name]()
+    return agent
+
+
+def get_intake_agent() -> IntakeAgent:
+    return get_agent('intake')
+
+
+def get_eligibility_agent() -> EligibilityAgent:
+    return get_agent('eligibility')
+
+
+def preload() -> Dict[str, float]:
+    """
+    Build every agent and load the data they read on first request
+
+    Imports the Gemini SDK and creates the model object (no connection is
+    opened until the first call), compiles templates and builds the rule,
+    airport and schedule indexes. Nothing here starts threads. The intake
+    cache's SQLite tier (INTAKE_CACHE_DB) connects on first use in each
+    process, and connections the app's engine opens in the master are
+    dropped in gunicorn's post_fork, so workers forked afterwards never
+    share a database connection.
+
+    Returns:
+        Milliseconds spent per step
+    """
+    from backend.utils.airports import get_airport_index
+    from backend.utils.dgca_ruleset import get_active_rules
+    from backend.utils.schedule_index import get_schedule_index
+    from backend.utils.templates import get_template_renderer
+
+    steps = (
+        ('agents', lambda: [get_agent(name) for name in AGENT_CLASSES]),
+        ('gemini_model', lambda: get_intake_agent().load_model()),
+        ('templates', get_template_renderer),
+        ('dgca_rules', get_active_rules),
+        ('airports', get_airport_index),
+        ('schedules', get_schedule_index)
+    )
+    timings = {}
+    for name, step in steps:
+        started = time.perf_counter()
+        step()
+        timings[name] = round((time.perf_counter() - started) * 1000, 1)
+    return timings
+
+
+def loaded() -> Dict[str, bool]:
+    """Which agents have been constructed in this process"""
+    return {name: name in _agents for name in AGENT_CLASSES}
@@ -0,0 +1,274 @@
+"""
+Rule Extractor - Deterministic fast path for well-formed flight messages
+Pulls flight details out of messages like "6E-234 from Delhi to Mumbai on
+28 Oct delayed 5 hours" without calling the LLM
+"""
+
+import re
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from backend.database.models import get_airline_name, parse_flight_number
+from backend.utils.airports import get_airport_index
+
+
+MONTHS = {
+    'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
+    'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12
+}
+
+_MONTH = (
+    r'(jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?'
+    r'|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)\.?'
+)
+_ORDINAL = r'(?:st|nd|rd|th)?'
+
+FLIGHT_NUMBER_RE = re.compile(r'\b([A-Z0-9]{2})[- ]?(\d{1,4})\b', re.IGNORECASE)
+
+ISO_DATE_RE = re.compile(r'\b(\d{4})-(\d{1,2})-(\d{1,2})\b')
+NUMERIC_DATE_RE = re.compile(r'\b(\d{1,2})[/.](\d{1,2})[/.](\d{2,4})\b')
+DAY_MONTH_RE = re.compile(
+    rf'\b(\d{{1,2}}){_ORDINAL}\s+(?:of\s+)?{_MONTH}(?:,?\s+(\d{{4}}))?\b', re.IGNORECASE
+)
+MONTH_DAY_RE = re.compile(
+    rf'\b{_MONTH}\s+(\d{{1,2}}){_ORDINAL}(?:,?\s+(\d{{4}}))?\b', re.IGNORECASE
+)
+RELATIVE_DATE_RE = re.compile(r'\b(day before yesterday|yesterday|today|tonight)\b', re.IGNORECASE)
+
+_PLACE = r'([A-Za-z]+(?:\s+[A-Za-z]+){0,2}?)'
+ROUTE_RE = re.compile(
+    rf'\bfrom\s+{_PLACE}(?:\s+to\s+|\s*(?:->|-|→)\s*){_PLACE}'
+    r'(?=\s*(?:$|[,.!?;]|\s(?:on|was|were|is|got|has|had|delay\w*|late|cancel\w*|denied|yesterday|today'
+    r'|at|by|and|flight|for|due|in|with)\b))',
+    re.IGNORECASE
+)
+
+DISRUPTION_PATTERNS = {
+    'delay': re.compile(r'\b(?:delay\w*|late)\b', re.IGNORECASE),
+    'cancellation': re.compile(r'\bcancel\w*', re.IGNORECASE),
+    'denied_boarding': re.compile(
+        r'\b(?:denied\s+boarding|deny\w*\s+boarding|offloaded|bumped|not\s+allowed\s+to\s+board|overbook\w*)\b',
+        re.IGNORECASE
+    ),
+}
+
+HOURS_RE = re.compile(
+    r'\b(\d+(?:\.\d+)?)\s*(?:hours?|hrs?|h)\b(?:\s*(?:and\s*)?(\d{1,2})\s*(?:minutes?|mins?|m)\b)?',
+    re.IGNORECASE
+)
+MINUTES_RE = re.compile(r'\b(\d{1,3})\s*(?:minutes?|mins?)\b', re.IGNORECASE)
+
+# Short replies to follow-up questions: "5", "Mumbai", "Delhi to Mumbai"
+BARE_NUMBER_RE = re.compile(r'^\s*(\d+(?:\.\d+)?)\s*[.!]?\s*$')
+BARE_PLACE_RE = re.compile(r'^\s*(?:from\s+|to\s+)?([A-Za-z]+(?:\s+[A-Za-z]+){0,2})\s*[.!]?\s*$', re.IGNORECASE)
+BARE_ROUTE_RE = re.compile(
+    rf'^\s*(?:from\s+)?{_PLACE}\s*(?:\s+to\s+|->|→)\s*{_PLACE}\s*[.!]?\s*$', re.IGNORECASE
+)
+
+# Fields that must be resolved before a rule-based result is trusted
+REQUIRED_FIELDS = ['flight_number', 'flight_date', 'departure', 'arrival', 'disruption_type']
+
+
+class RuleBasedExtractor:
+    """
+    Regex/rule extractor that mirrors the IntakeAgent output schema
+    """
+
+    def extract(self, user_message: str, today: Optional[datetime] = None) -> Dict:
+        """
+        Extract whatever fields can be resolved deterministically
+
+        Args:
+            user_message: User's message describing their flight issue
+            today: Reference date for relative and year-less dates
+
+        Returns:
+            Dictionary in the IntakeAgent schema. 'confidence' is 'high' only
+            when every required field was resolved unambiguously.
+        """
+        today = today or datetime.utcnow()
+
+        flight_number, airline_code = self._extract_flight_number(user_message)
+        departure, arrival = self._extract_route(user_message)
+        disruption_type = self._extract_disruption_type(user_message)
+
+        result = {
+            'flight_number': flight_number,
+            'airline_name': get_airline_name(airline_code) if airline_code else None,
+            'flight_date': self._extract_date(user_message, today),
+            'departure': departure,
+            'arrival': arrival,
+            'disruption_type': disruption_type,
+            'delay_hours': self._extract_delay_hours(user_message) if disruption_type == 'delay' else None,
+            'passenger_name': None,
+            'additional_context': None,
+        }
+
+        missing = [field for field in REQUIRED_FIELDS if not result[field]]
+        if disruption_type == 'delay' and result['delay_hours'] is None:
+            missing.append('delay_hours')
+
+        result['confidence'] = 'low' if missing else 'high'
+        result['missing_fields'] = missing + ['passenger_name']
+
+        return result
+
+    def extract_answer(self, user_message: str, expected_fields: List[str],
+                       today: Optional[datetime] = None) -> Dict:
+        """
+        Parse a short reply to a follow-up question
+
+        Only the fields the user was asked for are looked for, which allows
+        bare answers ("5 hours", "5", "Mumbai") that would be meaningless
+        without the question.
+
+        Args:
+            user_message: The user's reply
+            expected_fields: Fields the user was asked for
+            today: Reference date for relative and year-less dates
+
+        Returns:
+            Dictionary of the fields that were resolved (possibly empty)
+        """
+        today = today or datetime.utcnow()
+        expected = set(expected_fields)
+        found = {}
+
+        if 'flight_number' in expected:
+            flight_number, airline_code = self._extract_flight_number(user_message)
+            if flight_number:
+                found['flight_number'] = flight_number
+                found['airline_name'] = get_airline_name(airline_code)
+
+        if 'flight_date' in expected:
+            flight_date = self._extract_date(user_message, today)
+            if flight_date:
+                found['flight_date'] = flight_date
+
+        if 'disruption_type' in expected:
+            disruption_type = self._extract_disruption_type(user_message)
+            if disruption_type:
+                found['disruption_type'] = disruption_type
+
+        if 'delay_hours' in expected:
+            delay_hours = self._extract_delay_hours(user_message)
+            bare = BARE_NUMBER_RE.match(user_message)
+            if delay_hours is None and bare:
+                delay_hours = float(bare.group(1))
+                delay_hours = int(delay_hours) if delay_hours.is_integer() else delay_hours
+            if delay_hours is not None:
+                found['delay_hours'] = delay_hours
+
+        place_fields = [field for field in ('departure', 'arrival') if field in expected]
+        if place_fields:
+            departure, arrival = self._extract_route(user_message)
+            if not departure:
+                route = BARE_ROUTE_RE.match(user_message)
+                if route:
+                    departure, arrival = _normalize_place(route.group(1)), _normalize_place(route.group(2))
+            if departure:
+                found.update({field: value for field, value in (('departure', departure), ('arrival', arrival))
+                              if field in expected})
+            elif len(place_fields) == 1:
+                place = BARE_PLACE_RE.match(user_message)
+                # Only accept a bare word as a place if it is a known airport/city
+                if place and get_airport_index().resolve(place.group(1)):
+                    found[place_fields[0]] = _normalize_place(place.group(1))
+
+        return found
+
+    @staticmethod
+    def _extract_flight_number(message: str):
+        for match in FLIGHT_NUMBER_RE.finditer(message):
+            code, number = parse_flight_number(match.group(0))
+            if not code or not any(char.isalpha() for char in code):
+                continue
+            # Only trust codes we actually know; "to 5" or "in 2" are not flights
+            if get_airline_name(code) == code:
+                continue
+            return f"{code}-{number}", code
+        return None, None
+
+    @staticmethod
+    def _extract_date(message: str, today: datetime) -> Optional[str]:
+        candidates = set()
+
+        for match in ISO_DATE_RE.finditer(message):
+            candidates.add(_build_date(int(match.group(1)), int(match.group(2)), int(match.group(3))))
+
+        for match in NUMERIC_DATE_RE.finditer(message):
+            day, month, year = int(match.group(1)), int(match.group(2)), int(match.group(3))
+            if year < 100:
+                year += 2000
+            candidates.add(_build_date(year, month, day))
+
+        for match in DAY_MONTH_RE.finditer(message):
+            candidates.add(_infer_year(int(match.group(1)), MONTHS[match.group(2)[:3].lower()], match.group(3), today))
+
+        for match in MONTH_DAY_RE.finditer(message):
+            candidates.add(_infer_year(int(match.group(2)), MONTHS[match.group(1)[:3].lower()], match.group(3), today))
+
+        for match in RELATIVE_DATE_RE.finditer(message):
+            offset = {'day before yesterday': 2, 'yesterday': 1}.get(match.group(1).lower(), 0)
+            candidates.add((today - timedelta(days=offset)).strftime('%Y-%m-%d'))
+
+        candidates.discard(None)
+        # Two different dates in one message is ambiguous
+        return candidates.pop() if len(candidates) == 1 else None
+
+    @staticmethod
+    def _extract_route(message: str):
+        match = ROUTE_RE.search(message)
+        if not match:
+            return None, None
+        return _normalize_place(match.group(1)), _normalize_place(match.group(2))
+
+    @staticmethod
+    def _extract_disruption_type(message: str) -> Optional[str]:
+        found = [name for name, pattern in DISRUPTION_PATTERNS.items() if pattern.search(message)]
+        # "Delayed and then cancelled" needs judgement; leave it to the LLM
+        return found[0] if len(found) == 1 else None
+
+    @staticmethod
+    def _extract_delay_hours(message: str) -> Optional[float]:
+        values = set()
+        for match in HOURS_RE.finditer(message):
+            hours = float(match.group(1))
+            if match.group(2):
+                hours += int(match.group(2)) / 60
+            values.add(round(hours, 2))
+
+        if not values:
+            for match in MINUTES_RE.finditer(message):
+                values.add(round(int(match.group(1)) / 60, 2))
+
+        if len(values) != 1:
+            return None
+
+        hours = values.pop()
+        return int(hours) if hours.is_integer() else hours
+
+
+def _build_date(year: int, month: int, day: int) -> Optional[str]:
+    try:
+        return datetime(year, month, day).strftime('%Y-%m-%d')
+    except ValueError:
+        return None
+
+
+def _infer_year(day: int, month: int, year: Optional[str], today: datetime) -> Optional[str]:
+    if year:
+        return _build_date(int(year), month, day)
+
+    # Claims are about past flights: "28 Dec" typed in January means last year
+    date = _build_date(today.year, month, day)
+    if date and date > today.strftime('%Y-%m-%d'):
+        date = _build_date(today.year - 1, month, day)
+    return date
+
+
+def _normalize_place(place: str) -> str:
+    place = ' '.join(place.split())
+    if len(place) == 3 and place.isupper():
+        return place  # IATA code
+    return place.title()
@@ -5,32 +5,48 @@ Simple REST API that exposes AI agents as HTTP endpoints
 
 import os
 import sys
-from flask import Flask, request, jsonify
+import time
+from datetime import datetime
+from flask import Flask, request, jsonify, send_file
 from flask_cors import CORS
 from dotenv import load_dotenv
 
 # Add project root to path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from backend.agents.intake_agent import IntakeAgent
-from backend.agents.eligibility_agent import EligibilityAgent
-from backend.routes.whatsapp_webhook import whatsapp_bp
+from backend.agents.registry import get_intake_agent, get_eligibility_agent, loaded as agents_loaded
+from backend.routes.whatsapp_webhook import whatsapp_bp, whatsapp_pool, conversation_store, idempotency_store, outbound_queue, status_events
 from backend.routes.web_api import web_api_bp
+from backend.database.models import generate_unsaved_claim_reference, parse_flight_number
+from backend.database.db_session import init_app as init_db_session
+from backend.utils.dgca_batch import score_claims_batch
+from backend.utils.dgca_ruleset import get_active_rules
+from backend.utils.flight_verification import get_verification_service
+from backend.utils.pdf_letters import get_pdf_cache
+from backend.utils.airline_registry import get_airline_registry
+from backend.utils.claim_documents import build_claim_letter, prepare_submission
+from backend.utils.job_queue import get_job_queue
 
 # Load environment
 load_dotenv()
 
 # Initialize Flask app
 app = Flask(__name__)
-CORS(app)  # Enable CORS for n8n
+CORS(app, expose_headers=['X-Next-Cursor'])  # Enable CORS for n8n
+
+# Request-scoped DB sessions
+init_db_session(app)
 
 # Register blueprints
 app.register_blueprint(whatsapp_bp)
 app.register_blueprint(web_api_bp)
 
-# Initialize agents
-intake_agent = IntakeAgent()
-eligibility_agent = EligibilityAgent()
+FLIGHT_VERIFICATION_ENABLED = os.getenv('ENABLE_FLIGHT_VERIFICATION', 'True') == 'True'
+PDF_GENERATION_ENABLED = os.getenv('ENABLE_PDF_GENERATION', 'True') == 'True'
+
+# Airline directory, loaded on first use (or preloaded by the gunicorn
+# master); requests read the in-memory snapshot
+airline_registry = get_airline_registry()
 
 # ============================================================================
 # HEALTH CHECK
@@ -46,7 +62,11 @@ def home():
         'endpoints': {
             'extract': '/api/extract',
             'eligibility': '/api/eligibility',
-            'health': '/health'
+            'eligibility_batch': '/api/eligibility/batch',
+            'pipeline': '/api/pipeline',
+            'verify_flight': '/api/flights/verify',
+            'health': '/health',
+            'metrics': '/api/metrics'
         }
     })
 
@@ -57,6 +77,25 @@ def health():
     return jsonify({'status': 'healthy', 'service': 'FlyClaim AI'})
 
 
+@app.route('/api/metrics', methods=['GET'])
+def metrics():
+    """Runtime counters (cache hit rates etc.) for monitoring"""
+    return jsonify({
+        'agents_loaded': agents_loaded(),
+        'intake_agent': get_intake_agent().stats(),
+        'whatsapp_pool': whatsapp_pool.stats(),
+        'whatsapp_conversations': conversation_store.stats(),
+        'whatsapp_idempotency': idempotency_store.stats(),
+        'whatsapp_outbound': outbound_queue.stats(),
+        'whatsapp_status_events': status_events.stats(),
+        'pdf_letters': get_pdf_cache().stats() if PDF_GENERATION_ENABLED else None,
+        'airline_registry': airline_registry.stats(),
+        'jobs': get_job_queue().stats(),
+        'dgca_rules_version': get_active_rules().version,
+        'flight_verification': get_verification_service().stats() if FLIGHT_VERIFICATION_ENABLED else None
+    })
+
+
 # ============================================================================
 # AGENT ENDPOINTS (for n8n)
 # ============================================================================
@@ -89,6 +128,7 @@ def extract_flight_details():
             return jsonify({'error': 'Missing message field'}), 400
         
         # Call intake agent
+        intake_agent = get_intake_agent()
         result = intake_agent.extract_flight_details(message, context)
         
         # Add validation
@@ -112,12 +152,16 @@ def check_eligibility():
     Request body:
     {
         "flight_number": "6E-234",
-        "flight_duration_hours": 2.5,
+        "departure": "Delhi",
+        "arrival": "Mumbai",
         "delay_hours": 5,
-        "disruption_type": "delay",
-        "is_international": false
+        "disruption_type": "delay"
     }
     
+    flight_duration_hours / is_international may be passed explicitly;
+    otherwise they are estimated from departure and arrival. An optional
+    "language" (e.g. "hi") selects the user_message translation.
+    
     Response:
     {
         "eligible": true,
@@ -133,17 +177,90 @@ def check_eligibility():
             return jsonify({'error': 'Missing flight data'}), 400
         
         # Call eligibility agent
+        eligibility_agent = get_eligibility_agent()
         result = eligibility_agent.check_eligibility(flight_data)
         
         # Add user-friendly message
-        result['user_message'] = eligibility_agent.get_user_friendly_message(result)
+        result['user_message'] = eligibility_agent.get_user_friendly_message(result, flight_data.get('language'))
+        
+        return jsonify(result), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e), 'agent': 'eligibility_agent'}), 500
+
+
+@app.route('/api/eligibility/batch', methods=['POST'])
+def check_eligibility_batch():
+    """
+    Eligibility Agent (bulk): score many claims in one vectorized pass
+    
+    Request body (equal-length columns, null for missing values):
+    {
+        "flight_duration_hours": [2.5, 1.0, ...],
+        "delay_hours": [5, null, ...],
+        "is_international": [false, true, ...],
+        "disruption_type": ["delay", "cancellation", ...],
+        "cancellation_notice_days": [null, 3, ...]
+    }
+    
+    Response:
+    {
+        "count": 2,
+        "eligible": [true, true],
+        "compensation_amount": [10000, 20000],
+        "exemption_applied": [false, false],
+        ...
+    }
+    """
+    try:
+        columns = request.json
+        
+        if not columns:
+            return jsonify({'error': 'Missing claim columns'}), 400
+        
+        result = score_claims_batch(columns)
+        result['agent'] = 'eligibility_agent'
         
         return jsonify(result), 200
         
+    except ValueError as e:
+        return jsonify({'error': str(e), 'agent': 'eligibility_agent'}), 400
     except Exception as e:
         return jsonify({'error': str(e), 'agent': 'eligibility_agent'}), 500
 
 
+@app.route('/api/flights/verify', methods=['GET'])
+def verify_flight():
+    """
+    Verify a flight's actual status (cached in the flight_verifications table)
+    
+    Query params: flight_number=6E-234&flight_date=2026-10-01
+    
+    Response:
+    {
+        "flight_number": "6E-234",
+        "status": "landed",
+        "delay_minutes": 315,
+        "source": "cache",
+        ...
+    }
+    """
+    if not FLIGHT_VERIFICATION_ENABLED:
+        return jsonify({'error': 'Flight verification is disabled'}), 404
+    
+    flight_number = request.args.get('flight_number')
+    flight_date = request.args.get('flight_date')
+    if not flight_number or not flight_date:
+        return jsonify({'error': 'flight_number and flight_date are required'}), 400
+    
+    try:
+        return jsonify(get_verification_service().verify(flight_number, flight_date)), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 502
+
+
 @app.route('/api/claim/generate', methods=['POST'])
 def generate_claim_letter():
     """
@@ -158,7 +275,10 @@ def generate_claim_letter():
         "route_from": "Delhi",
         "route_to": "Mumbai",
         "delay_hours": 5,
-        "compensation_amount": 10000
+        "compensation_amount": 10000,
+        "airline_code": "6E",    // optional: airline-specific letter variant
+        "language": "en",        // optional: letter language
+        "format": "pdf"          // optional: "text" (default) or "pdf"; also ?format=pdf
     }
     
     Response:
@@ -166,80 +286,28 @@ def generate_claim_letter():
         "claim_letter": "...",
         "claim_reference": "FC-20241028-6E234-0001"
     }
+    or, for format=pdf, the PDF file (application/pdf, ETag = content hash)
     """
     try:
         data = request.json
         
-        # Generate claim letter text
-        claim_letter = f"""
-FLIGHT COMPENSATION CLAIM UNDER DGCA CAR SECTION 3
-
-Date: {data.get('date', 'N/A')}
-Claim Reference: {data.get('claim_reference', 'PENDING')}
-
-TO: Customer Relations Department
-{data.get('airline_name', 'Airline')}
-
-Dear Sir/Madam,
-
-SUBJECT: Claim for Compensation under DGCA CAR Section 3, Series M, Part IV
-
-I am writing to file a formal claim for compensation for the disruption to my flight as detailed below:
-
-PASSENGER DETAILS:
-Name: {data.get('passenger_name', 'N/A')}
-Email: {data.get('passenger_email', 'N/A')}
-Phone: {data.get('passenger_phone', 'N/A')}
-
-FLIGHT DETAILS:
-Flight Number: {data.get('flight_number', 'N/A')}
-Date of Travel: {data.get('flight_date', 'N/A')}
-Route: {data.get('route_from', 'N/A')} to {data.get('route_to', 'N/A')}
-Booking Reference/PNR: {data.get('pnr', 'N/A')}
-
-DISRUPTION DETAILS:
-Type: {data.get('disruption_type', 'Delay').upper()}
-Delay Duration: {data.get('delay_hours', 'N/A')} hours
-Scheduled Departure: {data.get('scheduled_departure', 'N/A')}
-Actual Departure: {data.get('actual_departure', 'N/A')}
-
-COMPENSATION CLAIMED:
-Amount: ₹{data.get('compensation_amount', 0):,}
-Legal Basis: DGCA Civil Aviation Requirements (CAR) Section 3, Series M, Part IV
-
-LEGAL GROUNDS:
-As per DGCA CAR Section 3, airlines are mandated to compensate passengers for flight delays exceeding 2 hours (for domestic flights) with compensation ranging from ₹5,000 to ₹20,000 depending on the flight duration and delay magnitude.
-
-My flight was delayed by {data.get('delay_hours', 'N/A')} hours, which clearly exceeds the threshold set by DGCA regulations. Therefore, I am entitled to compensation of ₹{data.get('compensation_amount', 0):,}.
-
-REQUESTED ACTION:
-I request you to:
-1. Acknowledge receipt of this claim within 7 days
-2. Process the compensation as per DGCA guidelines
-3. Credit the compensation amount to my account within 30 days
-
-If I do not receive a satisfactory response within 30 days, I will be compelled to escalate this matter to:
-- AirSewa (DGCA's grievance portal)
-- Directorate General of Civil Aviation (DGCA)
-- Consumer Court
-
-I have attached/will provide upon request:
-- Copy of boarding pass
-- Copy of ticket/booking confirmation
-- Any other relevant documents
-
-I look forward to your prompt response and resolution of this matter.
-
-Yours sincerely,
-{data.get('passenger_name', 'N/A')}
-{data.get('passenger_email', 'N/A')}
-{data.get('passenger_phone', 'N/A')}
-
-Date: {data.get('date', 'N/A')}
-
----
-This claim is generated by FlyClaim AI - Automated Flight Compensation System
-"""
+        claim_letter = build_claim_letter(data)
+        
+        output_format = (request.args.get('format') or data.get('format') or 'text').lower()
+        if output_format == 'pdf':
+            if not PDF_GENERATION_ENABLED:
+                return jsonify({'error': 'PDF generation is disabled', 'agent': 'document_agent'}), 404
+            reference = data.get('claim_reference', 'PENDING')
+            pdf_cache = get_pdf_cache()
+            # Only renders; a claim's stored letter is written by its processing job
+            pdf_file, cache_key = pdf_cache.open(claim_letter, title=f"Compensation Claim {reference}")
+            # Streamed from disk; send_file closes the file when done
+            return send_file(
+                pdf_file,
+                mimetype='application/pdf',
+                download_name=f"{reference}.pdf",
+                etag=cache_key
+            )
         
         response = {
             'claim_letter': claim_letter,
@@ -276,34 +344,171 @@ def submit_claim():
     """
     try:
         data = request.json
-        airline_code = data.get('airline_code', '')
-        
-        # Airline email mapping
-        airline_emails = {
-            '6E': 'customer.relations@goindigo.in',
-            'AI': 'feedback@airindia.in',
-            'SG': 'complaints@spicejet.com',
-            'UK': 'customer.feedback@airvistara.com',
-            'I5': 'support@airasia.com',
-            'G8': 'care@flygofirst.com',
-            'QP': 'support@akasaair.com'
-        }
+        response = prepare_submission(data)
         
-        airline_email = airline_emails.get(airline_code.upper(), 'unknown@airline.com')
+        return jsonify(response), 200
         
+    except Exception as e:
+        return jsonify({'error': str(e), 'agent': 'submission_agent'}), 500
+
+
+# ============================================================================
+# PIPELINE ENDPOINT (single round trip for n8n)
+# ============================================================================
+
+@app.route('/api/pipeline', methods=['POST'])
+def claim_pipeline():
+    """
+    Run intake -> eligibility -> letter -> submission prep in one request
+    
+    Request body:
+    {
+        "message": "My IndiGo flight 6E-234 from Delhi to Mumbai on 28 Oct was delayed by 5 hours",
+        "context": {},                      // optional
+        "passenger_name": "Rahul Kumar",    // optional letter fields
+        "passenger_email": "rahul@example.com",
+        "passenger_phone": "+919876543210",
+        "pnr": "ABC123",
+        "language": "hi",                   // optional message/letter language
+        "flight_duration_hours": 2.5,       // optional eligibility overrides
+        "is_international": false
+    }
+    
+    Response:
+    {
+        "status": "ready_to_send" | "need_info" | "not_eligible" | "extraction_failed",
+        "stopped_at": null | "intake" | "eligibility",
+        "stages": {"intake": {...}, "eligibility": {...}, "letter": {...}, "submission": {...}},
+        "timings_ms": {"intake": 1.2, ..., "total": 3.4},
+        // plus the fields n8n branches on: validation, eligible, reason,
+        // compensation_amount, claim_reference, airline_email, subject, body
+    }
+    """
+    started = time.perf_counter()
+    stages = {}
+    timings = {}
+    
+    def finish(status, stopped_at, **fields):
+        timings['total'] = round((time.perf_counter() - started) * 1000, 2)
         response = {
-            'airline_email': airline_email,
-            'cc_email': data.get('passenger_email'),
-            'subject': f"Flight Compensation Claim - {data.get('claim_reference', 'DGCA CAR Section 3')}",
-            'body': data.get('claim_letter', ''),
-            'ready_to_send': True,
-            'agent': 'submission_agent'
+            'status': status,
+            'stopped_at': stopped_at,
+            'stages': stages,
+            'timings_ms': timings,
+            'agent': 'pipeline'
         }
-        
+        response.update(fields)
         return jsonify(response), 200
+    
+    try:
+        data = request.json or {}
+        message = data.get('message', '')
+        
+        if not message:
+            return jsonify({'error': 'Missing message field'}), 400
+        
+        intake_agent = get_intake_agent()
+        eligibility_agent = get_eligibility_agent()
+        
+        # Stage 1: Intake
+        stage_started = time.perf_counter()
+        extracted = intake_agent.extract_flight_details(message, data.get('context'))
+        validation = intake_agent.validate_extracted_data(extracted)
+        extracted['validation'] = validation
+        extracted['confirmation_message'] = intake_agent.create_confirmation_message(extracted)
+        stages['intake'] = extracted
+        timings['intake'] = round((time.perf_counter() - stage_started) * 1000, 2)
+        
+        if extracted.get('error'):
+            return finish('extraction_failed', 'intake', validation=validation, error=extracted['error'])
+        
+        if not validation['is_valid']:
+            return finish('need_info', 'intake', validation=validation)
+        
+        # Stage 2: Eligibility
+        stage_started = time.perf_counter()
+        eligibility = eligibility_agent.check_eligibility({
+            'flight_number': extracted.get('flight_number'),
+            'flight_date': extracted.get('flight_date'),
+            'departure': extracted.get('departure'),
+            'arrival': extracted.get('arrival'),
+            'flight_duration_hours': data.get('flight_duration_hours') or extracted.get('flight_duration_hours'),
+            'delay_hours': extracted.get('delay_hours'),
+            'disruption_type': extracted.get('disruption_type'),
+            'is_international': data.get('is_international', extracted.get('is_international'))
+        })
+        eligibility['user_message'] = eligibility_agent.get_user_friendly_message(eligibility, data.get('language'))
+        stages['eligibility'] = eligibility
+        timings['eligibility'] = round((time.perf_counter() - stage_started) * 1000, 2)
+        
+        if not eligibility['eligible']:
+            return finish(
+                'not_eligible', 'eligibility',
+                validation=validation,
+                eligible=False,
+                reason=eligibility['reason']
+            )
+        
+        # Stage 3: Claim letter
+        stage_started = time.perf_counter()
+        today = datetime.utcnow().strftime('%Y-%m-%d')
+        flight_number = extracted['flight_number']
+        airline_code, _ = parse_flight_number(flight_number)
+        # No claim row exists yet, so the reference gets a random suffix instead of the id
+        claim_reference = data.get('claim_reference') or generate_unsaved_claim_reference(flight_number)
+        letter_data = {
+            'passenger_name': data.get('passenger_name') or extracted.get('passenger_name') or 'Passenger',
+            'passenger_email': data.get('passenger_email', 'N/A'),
+            'passenger_phone': data.get('passenger_phone', 'N/A'),
+            'pnr': data.get('pnr', 'N/A'),
+            'flight_number': flight_number,
+            'flight_date': extracted.get('flight_date'),
+            'route_from': extracted.get('departure'),
+            'route_to': extracted.get('arrival'),
+            'airline_name': extracted.get('airline_name') or (airline_registry.name_for(airline_code) if airline_code else 'Airline'),
+            'delay_hours': extracted.get('delay_hours'),
+            'disruption_type': extracted.get('disruption_type') or 'delay',
+            'compensation_amount': eligibility['compensation_amount'],
+            'claim_reference': claim_reference,
+            'date': today,
+            'airline_code': airline_code,
+            'language': data.get('language')
+        }
+        claim_letter = build_claim_letter(letter_data)
+        stages['letter'] = {
+            'claim_letter': claim_letter,
+            'claim_reference': claim_reference,
+            'generated_at': today,
+            'agent': 'document_agent'
+        }
+        timings['letter'] = round((time.perf_counter() - stage_started) * 1000, 2)
+        
+        # Stage 4: Submission prep
+        stage_started = time.perf_counter()
+        submission = prepare_submission({
+            'claim_letter': claim_letter,
+            'airline_code': airline_code or '',
+            'passenger_email': data.get('passenger_email'),
+            'claim_reference': claim_reference
+        })
+        stages['submission'] = submission
+        timings['submission'] = round((time.perf_counter() - stage_started) * 1000, 2)
+        
+        return finish(
+            'ready_to_send', None,
+            validation=validation,
+            eligible=True,
+            reason=eligibility['reason'],
+            compensation_amount=eligibility['compensation_amount'],
+            claim_reference=claim_reference,
+            airline_email=submission['airline_email'],
+            cc_email=submission['cc_email'],
+            subject=submission['subject'],
+            body=submission['body']
+        )
         
     except Exception as e:
-        return jsonify({'error': str(e), 'agent': 'submission_agent'}), 500
+        return jsonify({'error': str(e), 'agent': 'pipeline', 'stages': stages}), 500
 
 
 # ============================================================================
@@ -372,10 +577,10 @@ def demo():
             // 2️⃣ Step 2: Prepare data for eligibility
             const eligibilityPayload = {
                 flight_number: extractData.flight_number,
-                flight_duration_hours: 2.5, // default / later calculate
+                departure: extractData.departure, // duration and international flag come from the route
+                arrival: extractData.arrival,
                 delay_hours: extractData.delay_hours,
-                disruption_type: extractData.disruption_type,
-                is_international: false
+                disruption_type: extractData.disruption_type
             };
 
             // 3️⃣ Step 3: Call eligibility agent
@@ -414,9 +619,15 @@ if __name__ == '__main__':
     print("\nAPI Endpoints:")
     print("  POST /api/extract - Extract flight details")
     print("  POST /api/eligibility - Check compensation eligibility")
+    print("  POST /api/eligibility/batch - Score many claims at once")
     print("  POST /api/claim/generate - Generate claim letter")
     print("  POST /api/claim/submit - Prepare claim for submission")
+    print("  POST /api/pipeline - Run all four stages in one request")
+    print("  GET  /api/flights/verify - Verify actual flight status")
     print("\nReady for n8n integration!")
     print("="*60 + "\n")
+
+    # Send WhatsApp replies left in the queue by the previous run
+    outbound_queue.start()
     
     app.run(host="0.0.0.0", port=5000, debug=True)
@@ -0,0 +1,97 @@
+"""
+Export Benchmark - Streaming export throughput and memory
+Seeds a temporary SQLite database with synthetic claims and times the
+NDJSON and CSV exports, checking peak memory at a tenth and at all rows
+
+Usage: python backend/benchmarks/bench_export.py [rows]
+"""
+
+import os
+import sys
+import time
+import random
+import sqlite3
+import resource
+import tempfile
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from sqlalchemy.orm import sessionmaker
+
+from backend.database.db_session import build_engine
+from backend.database.models import Base
+from backend.utils.claim_export import TableExport
+
+
+AIRLINES = [('6E', 'IndiGo'), ('AI', 'Air India'), ('SG', 'SpiceJet'), ('QP', 'Akasa Air'), ('IX', 'Air India Express')]
+AIRPORTS = ['DEL', 'BOM', 'BLR', 'MAA', 'CCU', 'HYD', 'COK', 'AMD', 'PNQ', 'GOI']
+STATUSES = ['INITIATED', 'ELIGIBILITY_CHECKED', 'DOCUMENT_GENERATED', 'SUBMITTED_TO_AIRLINE', 'RESOLVED']
+DISRUPTIONS = ['DELAY', 'CANCELLATION', 'DENIED_BOARDING']
+
+
+def seed(path: str, rows: int, seed: int = 5):
+    """Write rows straight through sqlite3 so seeding does not count towards memory"""
+    engine = build_engine(f'sqlite:///{path}')
+    Base.metadata.create_all(engine)
+    engine.dispose()
+
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1)
+
+    def claims():
+        for i in range(1, rows + 1):
+            code, name = rng.choice(AIRLINES)
+            departure, arrival = rng.sample(AIRPORTS, 2)
+            created = start + timedelta(minutes=i)
+            yield (
+                i, f'FC-{code}{i:08d}', 1, f'{code}-{rng.randrange(100, 9999)}', code, name,
+                (created - timedelta(days=rng.randrange(1, 30))).isoformat(' '), departure, arrival,
+                rng.choice(DISRUPTIONS), round(rng.uniform(0, 12), 1), rng.choice([0, 5000, 7500, 10000]),
+                'Delay of more than 2 hours on a domestic flight', rng.choice(STATUSES),
+                created.isoformat(' '), created.isoformat(' ')
+            )
+
+    connection = sqlite3.connect(path)
+    connection.execute("INSERT INTO users (id, phone_number) VALUES (1, '+910000000000')")
+    connection.executemany(
+        "INSERT INTO claims (id, claim_reference, user_id, flight_number, airline_code, airline_name,"
+        " flight_date, route_from, route_to, disruption_type, delay_hours, compensation_amount,"
+        " calculation_reason, status, created_at, updated_at)"
+        " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        claims()
+    )
+    connection.commit()
+    connection.close()
+
+
+def max_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'export.db')
+        started = time.perf_counter()
+        seed(path, rows)
+        print(f"Seeded {rows:,} claims in {time.perf_counter() - started:.1f}s")
+
+        session_factory = sessionmaker(bind=build_engine(f'sqlite:///{path}'))
+        baseline = max_rss_mb()
+        print(f"Peak RSS before exporting: {baseline:.0f} MiB")
+
+        for fmt in ('ndjson', 'csv'):
+            for limit in (rows // 10, rows):
+                export = TableExport('claims', limit=limit, session_factory=session_factory)
+                started = time.perf_counter()
+                written = sum(len(chunk) for chunk in export.stream(fmt))
+                elapsed = time.perf_counter() - started
+                print(f"{fmt:>6} {export.rows_exported:>9,} rows: {elapsed:6.2f}s"
+                      f" ({export.rows_exported / elapsed:,.0f} rows/s, {written / elapsed / 1024 / 1024:.0f} MiB/s),"
+                      f" peak RSS {max_rss_mb():.0f} MiB")
+
+
+if __name__ == '__main__':
+    main()
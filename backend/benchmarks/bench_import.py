@@ -0,0 +1,102 @@
+"""
+Import Benchmark - Bulk claim import throughput
+Imports synthetic claims as JSON lines and as CSV into a temporary SQLite
+database, next to the one-claim-per-request path of POST /api/claims
+
+Usage: python backend/benchmarks/bench_import.py [rows] [single_rows]
+"""
+
+import io
+import os
+import sys
+import csv
+import json
+import time
+import random
+import tempfile
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from sqlalchemy.orm import sessionmaker
+
+from backend.database.db_session import build_engine
+from backend.database.models import Base, Claim, ClaimStatus, User, generate_claim_reference
+from backend.utils.claim_import import ClaimImporter, claim_values
+from backend.utils.claim_jobs import enqueue_claim_processing
+from backend.utils.job_queue import JobQueue
+
+
+AIRLINES = ['6E', 'AI', 'SG', 'QP', 'I5', 'UK']
+AIRPORTS = ['DEL', 'BOM', 'BLR', 'MAA', 'CCU', 'HYD', 'COK', 'AMD', 'PNQ', 'GOI']
+REASONS = ['Flight delayed', 'Flight cancelled', 'Denied boarding']
+FIELDS = ['user_id', 'flight_number', 'flight_date', 'reason', 'delay_hours', 'route_from', 'route_to']
+
+
+def claims(rows: int, seed: int = 3):
+    rng = random.Random(seed)
+    for _ in range(rows):
+        departure, arrival = rng.sample(AIRPORTS, 2)
+        yield {
+            'user_id': rng.randrange(1, 51),
+            'flight_number': f'{rng.choice(AIRLINES)}-{rng.randrange(100, 9999)}',
+            'flight_date': (date(2025, 1, 1) + timedelta(days=rng.randrange(365))).isoformat(),
+            'reason': rng.choice(REASONS),
+            'delay_hours': round(rng.uniform(0, 12), 1),
+            'route_from': departure,
+            'route_to': arrival
+        }
+
+
+def upload(rows: int, fmt: str) -> bytes:
+    if fmt == 'ndjson':
+        return ''.join(json.dumps(claim) + '\n' for claim in claims(rows)).encode()
+    out = io.StringIO()
+    writer = csv.DictWriter(out, FIELDS)
+    writer.writeheader()
+    writer.writerows(claims(rows))
+    return out.getvalue().encode()
+
+
+def create_one_by_one(session_factory, queue, rows: int):
+    """What POST /api/claims does per claim: insert, flush, update the reference, enqueue"""
+    for data in claims(rows):
+        with session_factory() as session:
+            claim = Claim(**claim_values(data), claim_reference='TEMP', status=ClaimStatus.INITIATED)
+            session.add(claim)
+            session.flush()
+            claim.claim_reference = generate_claim_reference(claim.id, claim.flight_number)
+            enqueue_claim_processing(claim.id, session=session, queue=queue)
+            session.commit()
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    single_rows = int(sys.argv[2]) if len(sys.argv) > 2 else 2_000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = build_engine(f"sqlite:///{os.path.join(tmp, 'import.db')}")
+        Base.metadata.create_all(engine)
+        session_factory = sessionmaker(bind=engine)
+        with session_factory() as session:
+            session.add_all(User(phone_number=f'+91{i:010d}') for i in range(1, 51))
+            session.commit()
+        queue = JobQueue(session_factory=session_factory)
+
+        started = time.perf_counter()
+        create_one_by_one(session_factory, queue, single_rows)
+        elapsed = time.perf_counter() - started
+        print(f"one per request: {single_rows:>8,} claims in {elapsed:6.2f}s ({single_rows / elapsed:>9,.0f} claims/s)")
+
+        for fmt in ('ndjson', 'csv'):
+            body = upload(rows, fmt)
+            importer = ClaimImporter(session_factory=session_factory, max_rows=rows, queue=queue)
+            started = time.perf_counter()
+            report = importer.run(io.BytesIO(body), fmt)
+            elapsed = time.perf_counter() - started
+            print(f"bulk {fmt:>6}:     {report['imported']:>8,} claims in {elapsed:6.2f}s"
+                  f" ({report['imported'] / elapsed:>9,.0f} claims/s, {report['failed']} failed)")
+
+
+if __name__ == '__main__':
+    main()
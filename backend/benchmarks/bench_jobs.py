@@ -0,0 +1,107 @@
+"""
+Job Queue Benchmark - Claims processed by several worker processes
+Files synthetic claims into a temporary SQLite database and drains their
+jobs with python -m backend.worker processes (PDFs and email off), then
+reports how the jobs split between workers and any lost leases
+
+Usage: python backend/benchmarks/bench_jobs.py [claims] [workers]
+"""
+
+import os
+import ast
+import sys
+import time
+import random
+import tempfile
+import subprocess
+from datetime import datetime, timedelta
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+sys.path.insert(0, ROOT)
+
+from sqlalchemy import func
+from sqlalchemy.orm import sessionmaker
+
+from backend.database.db_session import build_engine
+from backend.database.init_db import create_tables, seed_airline_data
+from backend.database.models import Claim, ClaimStatus, DisruptionType, Job, User, generate_claim_reference
+from backend.utils.claim_jobs import enqueue_claim_processing
+from backend.utils.job_queue import JobQueue
+
+
+AIRLINES = {'6E': 'IndiGo', 'AI': 'Air India', 'SG': 'SpiceJet', 'I5': 'AIX Connect'}
+
+
+def file_claims(session_factory, count: int, seed: int = 22):
+    rng = random.Random(seed)
+    queue = JobQueue(session_factory=session_factory)
+    with session_factory() as session:
+        users = [User(phone_number=f'+91{i:010d}', email=f'passenger{i}@example.com') for i in range(1, 21)]
+        session.add_all(users)
+        session.flush()
+        for _ in range(count):
+            code = rng.choice(list(AIRLINES))
+            flight_number = f'{code}-{rng.randrange(100, 9999)}'
+            claim = Claim(
+                user_id=rng.choice(users).id,
+                claim_reference='TEMP',
+                flight_number=flight_number,
+                airline_code=code,
+                airline_name=AIRLINES[code],
+                flight_date=datetime(2025, 1, 1) + timedelta(days=rng.randrange(300)),
+                disruption_type=DisruptionType.DELAY,
+                delay_hours=round(rng.uniform(1, 8), 1),
+                flight_duration_hours=round(rng.uniform(0.8, 3), 1),
+                route_from='DEL',
+                route_to='BOM',
+                status=ClaimStatus.INITIATED
+            )
+            session.add(claim)
+            session.flush()
+            claim.claim_reference = generate_claim_reference(claim.id, flight_number)
+            enqueue_claim_processing(claim.id, session=session, queue=queue)
+        session.commit()
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else 2
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f"sqlite:///{os.path.join(tmp, 'jobs.db')}"
+        engine = build_engine(database_url)
+        create_tables(engine)
+        session_factory = sessionmaker(bind=engine)
+        with session_factory() as session:
+            seed_airline_data(session)
+        file_claims(session_factory, count)
+
+        env = dict(os.environ, DATABASE_URL=database_url, ENABLE_PDF_GENERATION='False',
+                   ENABLE_EMAIL_SUBMISSION='False', PYTHONPATH=ROOT)
+        started = time.perf_counter()
+        processes = [
+            subprocess.Popen(
+                [sys.executable, '-m', 'backend.worker', '--drain', '--no-escalation', '--poll-interval', '0.1'],
+                cwd=ROOT, env=env, stdout=subprocess.PIPE, text=True
+            )
+            for _ in range(workers)
+        ]
+        outputs = [process.communicate()[0] for process in processes]
+        elapsed = time.perf_counter() - started
+
+        print(f"{count} claims, {workers} worker processes, {elapsed:.1f}s")
+        for index, output in enumerate(outputs, 1):
+            last = output.strip().splitlines()[-1]
+            stats = ast.literal_eval(last.split('; ', 1)[1])
+            print(f"worker {index}: {stats['succeeded']} jobs succeeded, {stats['retried']} retried,"
+                  f" {stats['dead']} dead, {stats['lost_leases']} lost leases")
+
+        with session_factory() as session:
+            jobs = dict(session.query(Job.status, func.count(Job.id)).group_by(Job.status).all())
+            claims = dict(session.query(Claim.status, func.count(Claim.id)).group_by(Claim.status).all())
+        print(f"jobs by status: {jobs}")
+        print(f"claims by status: {({status.value: n for status, n in claims.items()})}")
+
+
+if __name__ == '__main__':
+    main()
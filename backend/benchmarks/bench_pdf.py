@@ -0,0 +1,76 @@
+"""
+PDF Letter Benchmark - Render, cache hit and coalescing timings
+Renders distinct claim letters on a warm process pool, re-opens them from
+the cache, and fires concurrent requests for one new letter to count how
+many shared a single render. Uses a temporary cache directory
+
+Usage: python backend/benchmarks/bench_pdf.py [letters] [concurrent]
+"""
+
+import os
+import sys
+import time
+import tempfile
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from backend.utils.claim_documents import build_claim_letter
+from backend.utils.pdf_letters import PdfLetterCache
+
+
+def letter(n: int) -> str:
+    return build_claim_letter({
+        'passenger_name': f'Passenger {n}',
+        'passenger_email': f'passenger{n}@example.com',
+        'passenger_phone': f'+91{n:010d}',
+        'pnr': f'PNR{n:05d}',
+        'flight_number': '6E-234',
+        'flight_date': '2025-01-15',
+        'route_from': 'DEL',
+        'route_to': 'BOM',
+        'airline_name': 'IndiGo',
+        'airline_code': '6E',
+        'delay_hours': 4,
+        'disruption_type': 'delay',
+        'compensation_amount': 10000,
+        'claim_reference': f'FC-20250115-6E234-{n:04d}',
+        'date': '2025-01-16'
+    })
+
+
+def timed_open(cache: PdfLetterCache, text: str) -> float:
+    started = time.perf_counter()
+    pdf_file, _ = cache.open(text)
+    pdf_file.close()
+    return (time.perf_counter() - started) * 1000
+
+
+def main():
+    letters = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    concurrent = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = PdfLetterCache(cache_dir=os.path.join(tmp, 'cache'), letter_dir=os.path.join(tmp, 'letters'))
+        try:
+            timed_open(cache, letter(0))  # Start the pool
+
+            renders = [timed_open(cache, letter(n)) for n in range(1, letters + 1)]
+            hits = [timed_open(cache, letter(n)) for n in range(1, letters + 1)]
+            print(f"render (warm pool): median {statistics.median(renders):6.2f} ms over {letters} letters")
+            print(f"cache hit:          median {statistics.median(hits):6.2f} ms")
+
+            before = cache.stats()['coalesced']
+            text = letter(letters + 1)
+            with ThreadPoolExecutor(concurrent) as pool:
+                list(pool.map(lambda _: timed_open(cache, text), range(concurrent)))
+            print(f"{concurrent} concurrent requests for one letter: "
+                  f"{cache.stats()['coalesced'] - before} coalesced")
+            print(f"font: {cache.stats()['font']}")
+        finally:
+            cache.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""
+Schedule Index Benchmark - Ingest and lookup throughput
+Generates a synthetic SSIM-like schedule, ingests it and times random lookups
+
+Usage: python backend/benchmarks/bench_schedule_index.py [rows] [lookups]
+"""
+
+import os
+import sys
+import csv
+import time
+import random
+import tempfile
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from backend.utils.schedule_index import ScheduleIndex
+
+
+AIRLINES = ['6E', 'AI', 'SG', 'IX', 'QP', 'UK', 'I5', 'G8', 'EK', 'QR']
+AIRPORTS = ['DEL', 'BOM', 'BLR', 'MAA', 'CCU', 'HYD', 'COK', 'AMD', 'PNQ', 'GOI', 'JAI', 'LKO', 'DXB', 'SIN']
+DAY_PATTERNS = ['1234567', '12345..', '1.3.5.7', '.2.4.6.', '......7']
+
+
+def write_schedule(path: str, rows: int, seed: int = 7):
+    rng = random.Random(seed)
+    start = date(2025, 1, 1)
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['airline', 'flight_number', 'departure', 'arrival', 'departure_time',
+                         'block_minutes', 'days_of_operation', 'effective_from', 'effective_to'])
+        for _ in range(rows):
+            departure, arrival = rng.sample(AIRPORTS, 2)
+            period_start = start + timedelta(days=rng.randrange(0, 600))
+            writer.writerow([
+                rng.choice(AIRLINES),
+                rng.randrange(1, 10000),
+                departure,
+                arrival,
+                f"{rng.randrange(24):02d}:{rng.randrange(0, 60, 5):02d}",
+                rng.randrange(45, 600),
+                rng.choice(DAY_PATTERNS),
+                period_start.isoformat(),
+                (period_start + timedelta(days=rng.randrange(30, 365))).isoformat()
+            ])
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    lookups = int(sys.argv[2]) if len(sys.argv) > 2 else 200_000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'schedule.csv')
+        write_schedule(path, rows)
+
+        started = time.perf_counter()
+        index = ScheduleIndex.from_csv(path)
+        ingest_seconds = time.perf_counter() - started
+
+    rng = random.Random(11)
+    queries = [
+        (f"{rng.choice(AIRLINES)}-{rng.randrange(1, 10000)}",
+         (date(2025, 1, 1) + timedelta(days=rng.randrange(0, 900))).isoformat())
+        for _ in range(lookups)
+    ]
+
+    started = time.perf_counter()
+    found = sum(1 for flight_number, flight_date in queries if index.lookup(flight_number, flight_date))
+    lookup_seconds = time.perf_counter() - started
+
+    array_bytes = sum(
+        column.itemsize * len(column)
+        for column in (index.keys, index.departure, index.arrival, index.departure_minutes,
+                       index.block_minutes, index.days, index.effective_from, index.effective_to)
+    )
+
+    print(f"Rows ingested:   {len(index):,} in {ingest_seconds:.2f}s ({len(index) / ingest_seconds:,.0f} rows/s)")
+    print(f"Index size:      {array_bytes / 1024 / 1024:.1f} MiB in typed arrays ({array_bytes / len(index):.0f} B/row)")
+    print(f"Lookups:         {lookups:,} in {lookup_seconds:.2f}s ({lookups / lookup_seconds:,.0f}/s, "
+          f"{lookup_seconds / lookups * 1e6:.1f} us each), {found:,} matched")
+
+
+if __name__ == '__main__':
+    main()
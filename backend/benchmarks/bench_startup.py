@@ -0,0 +1,125 @@
+"""
+Startup Benchmark - Import time of backend.app and memory shared by forked workers
+Each timing runs in a fresh interpreter. The memory check preloads in a
+parent process, forks workers the way gunicorn does and reads each
+worker's shared/private pages from /proc (Linux only)
+
+Usage: python backend/benchmarks/bench_startup.py [runs]
+"""
+
+import os
+import sys
+import json
+import statistics
+import subprocess
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+sys.path.insert(0, ROOT)
+
+
+# Timed in a child interpreter; prints a JSON dict of milliseconds
+IMPORT_SNIPPET = """
+import json, time, contextlib, io
+started = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()):
+    import backend.app
+timings = {'import_app': (time.perf_counter() - started) * 1000}
+if PRELOAD:
+    from backend.agents.registry import preload
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        preload()
+    timings['preload'] = (time.perf_counter() - started) * 1000
+import sys
+timings['gemini_imported'] = 'google.generativeai' in sys.modules
+print(json.dumps(timings))
+"""
+
+
+def time_import(preload: bool, runs: int):
+    results = []
+    env = dict(os.environ, PYTHONPATH=ROOT, PYTHONDONTWRITEBYTECODE='0')
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, '-c', f"PRELOAD = {preload}\n{IMPORT_SNIPPET}"],
+            cwd=ROOT, env=env, capture_output=True, text=True, check=True
+        ).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+    return results
+
+
+def memory_kb(pid='self'):
+    """Rss, Shared and Private (clean + dirty) kB from smaps_rollup"""
+    fields = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[0].endswith(':') and parts[1].isdigit():
+                fields[parts[0][:-1]] = int(parts[1])
+    return {
+        'rss': fields.get('Rss', 0),
+        'shared': fields.get('Shared_Clean', 0) + fields.get('Shared_Dirty', 0),
+        'private': fields.get('Private_Clean', 0) + fields.get('Private_Dirty', 0)
+    }
+
+
+def fork_workers(workers: int = 2):
+    """Preload like the gunicorn master, fork, serve a little, report memory"""
+    import gc
+    import contextlib
+    import io
+    with contextlib.redirect_stdout(io.StringIO()):
+        from backend.app import app
+        from backend.agents.registry import preload
+        preload()
+    gc.freeze()
+
+    pipes = []
+    for _ in range(workers):
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            client = app.test_client()
+            for _ in range(50):
+                client.post('/api/extract', json={
+                    'message': 'My IndiGo flight 6E-234 from Delhi to Mumbai on 28 October was delayed by 5 hours'
+                })
+                client.post('/api/eligibility', json={
+                    'disruption_type': 'delay', 'delay_hours': 5, 'flight_duration_hours': 2
+                })
+            gc.collect()
+            os.write(write_fd, json.dumps(memory_kb()).encode())
+            os._exit(0)
+        os.close(write_fd)
+        pipes.append((pid, read_fd))
+
+    results = []
+    for pid, read_fd in pipes:
+        with os.fdopen(read_fd) as f:
+            results.append(json.loads(f.read()))
+        os.waitpid(pid, 0)
+    return results
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    for preload in (False, True):
+        results = time_import(preload, runs)
+        import_ms = statistics.median(r['import_app'] for r in results)
+        line = f"import backend.app{' + preload()' if preload else ''}: {import_ms:7.1f} ms"
+        if preload:
+            preload_ms = statistics.median(r['preload'] for r in results)
+            line += f" + {preload_ms:.1f} ms preload = {import_ms + preload_ms:.1f} ms"
+        line += f"  (Gemini SDK imported: {results[0]['gemini_imported']}, median of {runs})"
+        print(line)
+
+    if os.path.exists('/proc/self/smaps_rollup') and hasattr(os, 'fork'):
+        print("\nForked workers after preload (kB):")
+        for i, mem in enumerate(fork_workers()):
+            print(f"  worker {i}: rss {mem['rss']:>7}  shared {mem['shared']:>7}  private {mem['private']:>7}")
+
+
+if __name__ == '__main__':
+    main()
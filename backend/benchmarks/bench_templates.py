@@ -0,0 +1,284 @@
+"""
+Template Benchmark - Render throughput of compiled templates vs. f-strings
+Checks that each template reproduces the f-string code it replaced, then
+times both over the same inputs
+
+Usage: python backend/benchmarks/bench_templates.py [iterations]
+"""
+
+import os
+import sys
+import time
+from typing import Dict
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from backend.utils.dgca_rules import DisruptionType
+from backend.utils.templates import TemplateRenderer
+
+
+# ----------------------------------------------------------------------------
+# Baseline: the f-string builders the templates replaced
+# ----------------------------------------------------------------------------
+
+def legacy_claim_letter(data: dict) -> str:
+    return f"""
+FLIGHT COMPENSATION CLAIM UNDER DGCA CAR SECTION 3
+
+Date: {data.get('date', 'N/A')}
+Claim Reference: {data.get('claim_reference', 'PENDING')}
+
+TO: Customer Relations Department
+{data.get('airline_name', 'Airline')}
+
+Dear Sir/Madam,
+
+SUBJECT: Claim for Compensation under DGCA CAR Section 3, Series M, Part IV
+
+I am writing to file a formal claim for compensation for the disruption to my flight as detailed below:
+
+PASSENGER DETAILS:
+Name: {data.get('passenger_name', 'N/A')}
+Email: {data.get('passenger_email', 'N/A')}
+Phone: {data.get('passenger_phone', 'N/A')}
+
+FLIGHT DETAILS:
+Flight Number: {data.get('flight_number', 'N/A')}
+Date of Travel: {data.get('flight_date', 'N/A')}
+Route: {data.get('route_from', 'N/A')} to {data.get('route_to', 'N/A')}
+Booking Reference/PNR: {data.get('pnr', 'N/A')}
+
+DISRUPTION DETAILS:
+Type: {data.get('disruption_type', 'Delay').upper()}
+Delay Duration: {data.get('delay_hours', 'N/A')} hours
+Scheduled Departure: {data.get('scheduled_departure', 'N/A')}
+Actual Departure: {data.get('actual_departure', 'N/A')}
+
+COMPENSATION CLAIMED:
+Amount: ₹{data.get('compensation_amount', 0):,}
+Legal Basis: DGCA Civil Aviation Requirements (CAR) Section 3, Series M, Part IV
+
+LEGAL GROUNDS:
+As per DGCA CAR Section 3, airlines are mandated to compensate passengers for flight delays exceeding 2 hours (for domestic flights) with compensation ranging from ₹5,000 to ₹20,000 depending on the flight duration and delay magnitude.
+
+My flight was delayed by {data.get('delay_hours', 'N/A')} hours, which clearly exceeds the threshold set by DGCA regulations. Therefore, I am entitled to compensation of ₹{data.get('compensation_amount', 0):,}.
+
+REQUESTED ACTION:
+I request you to:
+1. Acknowledge receipt of this claim within 7 days
+2. Process the compensation as per DGCA guidelines
+3. Credit the compensation amount to my account within 30 days
+
+If I do not receive a satisfactory response within 30 days, I will be compelled to escalate this matter to:
+- AirSewa (DGCA's grievance portal)
+- Directorate General of Civil Aviation (DGCA)
+- Consumer Court
+
+I have attached/will provide upon request:
+- Copy of boarding pass
+- Copy of ticket/booking confirmation
+- Any other relevant documents
+
+I look forward to your prompt response and resolution of this matter.
+
+Yours sincerely,
+{data.get('passenger_name', 'N/A')}
+{data.get('passenger_email', 'N/A')}
+{data.get('passenger_phone', 'N/A')}
+
+Date: {data.get('date', 'N/A')}
+
+---
+This claim is generated by FlyClaim AI - Automated Flight Compensation System
+"""
+
+
+def legacy_claim_details(
+    passenger_name: str,
+    flight_number: str,
+    flight_date: str,
+    route: str,
+    disruption_type: DisruptionType,
+    compensation_result: Dict
+) -> str:
+    claim_text = f"""
+FLIGHT COMPENSATION CLAIM UNDER DGCA CAR SECTION 3
+
+Passenger Name: {passenger_name}
+Flight Number: {flight_number}
+Flight Date: {flight_date}
+Route: {route}
+Disruption Type: {disruption_type.value.upper()}
+
+ELIGIBILITY STATUS: {'ELIGIBLE' if compensation_result['eligible'] else 'NOT ELIGIBLE'}
+Compensation Amount: ₹{compensation_result['compensation_amount']:,}
+
+Reason: {compensation_result['reason']}
+"""
+
+    if compensation_result.get('exemption_applied'):
+        claim_text += f"\nExemption Applied: {compensation_result['exemption_reason']}"
+
+    claim_text += """
+
+LEGAL BASIS:
+This claim is filed under DGCA Civil Aviation Requirements (CAR) Section 3, 
+Series M, Part IV, which mandates airlines to compensate passengers for 
+flight delays, cancellations, and denied boarding, except in cases of 
+extraordinary circumstances beyond the airline's control.
+"""
+
+    return claim_text
+
+
+def legacy_eligibility_message(eligibility_result: Dict) -> str:
+    if eligibility_result['eligible']:
+        amount = eligibility_result['compensation_amount']
+        message = f"✅ **Good News!**\n\n"
+        message += f"You are **eligible** for compensation of **₹{amount:,}**\n\n"
+        message += f"**Reason:** {eligibility_result['reason']}\n\n"
+
+        # Add obligations if any
+        if eligibility_result.get('airline_obligations'):
+            oblig = eligibility_result['airline_obligations']
+            message += "**Airline Must Also Provide:**\n"
+            if oblig.get('meals_and_refreshments'):
+                message += "• Meals and refreshments\n"
+            if oblig.get('hotel_accommodation'):
+                message += "• Hotel accommodation\n"
+            if oblig.get('communication'):
+                message += "• 2 phone calls/emails\n"
+            if oblig.get('refund_option'):
+                message += "• Full refund option\n"
+            message += "\n"
+
+        message += "**Legal Basis:** DGCA CAR Section 3\n\n"
+        message += "Would you like me to file the claim on your behalf?"
+    else:
+        message = f"❌ **Eligibility Status**\n\n"
+        message += f"Unfortunately, you may not be eligible for compensation.\n\n"
+        message += f"**Reason:** {eligibility_result['reason']}\n"
+
+        if eligibility_result.get('exemption_applied'):
+            message += f"\n**Exemption:** {eligibility_result['exemption_reason']}"
+
+    return message
+
+
+def legacy_whatsapp_eligible(extracted_data: Dict, amount: int) -> str:
+    return (
+        f"✅ Great News!\n\n"
+        f"You are eligible for ₹{amount:,} compensation!\n\n"
+        f"📋 Details:\n"
+        f"Flight: {extracted_data.get('flight_number')}\n"
+        f"Date: {extracted_data.get('flight_date')}\n"
+        f"Route: {extracted_data.get('departure')} → {extracted_data.get('arrival')}\n"
+        f"Issue: {extracted_data.get('disruption_type').title()}\n\n"
+        f"💼 Legal Basis:\n"
+        f"DGCA CAR Section 3\n\n"
+        f"🚀 Next Steps:\n"
+        f"Reply 'YES' to file the claim automatically, or 'INFO' for more details."
+    )
+
+
+# ----------------------------------------------------------------------------
+# Inputs
+# ----------------------------------------------------------------------------
+
+LETTER = {
+    'passenger_name': 'Rahul Kumar',
+    'passenger_email': 'rahul@example.com',
+    'passenger_phone': '+919876543210',
+    'pnr': 'ABC123',
+    'flight_number': '6E-234',
+    'flight_date': '2024-10-28',
+    'route_from': 'Delhi',
+    'route_to': 'Mumbai',
+    'airline_name': 'IndiGo',
+    'delay_hours': 5,
+    'disruption_type': 'delay',
+    'compensation_amount': 10000,
+    'claim_reference': 'FC-20241028-6E-234',
+    'date': '2024-10-30'
+}
+
+ELIGIBLE = {
+    'eligible': True,
+    'compensation_amount': 10000,
+    'reason': 'Delay of 5.0 hours on a 2.5 hour flight',
+    'airline_obligations': {'meals_and_refreshments': True, 'hotel_accommodation': False,
+                            'communication': True, 'refund_option': True},
+    'exemption_applied': False
+}
+
+NOT_ELIGIBLE = {
+    'eligible': False,
+    'compensation_amount': 0,
+    'reason': 'Extraordinary circumstances',
+    'exemption_applied': True,
+    'exemption_reason': 'weather'
+}
+
+WHATSAPP = {
+    'flight_number': '6E-234', 'flight_date': '2024-10-28', 'departure': 'Delhi',
+    'arrival': 'Mumbai', 'disruption_type': 'denied_boarding'
+}
+
+
+def cases(renderer: TemplateRenderer):
+    """(name, legacy callable, template callable) triples"""
+    details_args = ('Rahul Kumar', '6E-234', '2024-10-28', 'Delhi to Mumbai', DisruptionType.DELAY)
+    return [
+        ('claim letter',
+         lambda: legacy_claim_letter(LETTER),
+         lambda: renderer.render('claim_letter.txt', LETTER)),
+        ('claim details',
+         lambda: legacy_claim_details(*details_args, NOT_ELIGIBLE),
+         lambda: renderer.render('claim_details.txt', passenger_name=details_args[0], flight_number=details_args[1],
+                                 flight_date=details_args[2], route=details_args[3],
+                                 disruption_type=details_args[4], compensation_result=NOT_ELIGIBLE)),
+        ('eligibility message',
+         lambda: legacy_eligibility_message(ELIGIBLE),
+         lambda: renderer.render('eligibility_message.txt', ELIGIBLE)),
+        ('not eligible message',
+         lambda: legacy_eligibility_message(NOT_ELIGIBLE),
+         lambda: renderer.render('eligibility_message.txt', NOT_ELIGIBLE)),
+        ('whatsapp reply',
+         lambda: legacy_whatsapp_eligible(WHATSAPP, 10000),
+         lambda: renderer.render('whatsapp/eligible.txt', WHATSAPP, amount=10000)),
+    ]
+
+
+def per_call_us(fn, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+
+    started = time.perf_counter()
+    renderer = TemplateRenderer()
+    compile_ms = (time.perf_counter() - started) * 1000
+    print(f"Compiled {len(renderer.env.list_templates())} templates in {compile_ms:.1f} ms "
+          f"(variants: {renderer.variants()})")
+
+    # Extra cases for the variant lookup itself
+    for case in (('eligibility_message.txt', 'hi'), ('eligibility_message.txt', 'ta')):
+        assert renderer.render(case[0], ELIGIBLE, language=case[1])
+
+    print(f"{'':22}{'f-string':>12}{'template':>12}{'ratio':>8}")
+    for name, legacy, template in cases(renderer):
+        expected, actual = legacy(), template()
+        if expected != actual:
+            raise SystemExit(f"{name}: template output differs from the f-string code\n"
+                             f"--- expected\n{expected!r}\n--- actual\n{actual!r}")
+        legacy_us = per_call_us(legacy, iterations)
+        template_us = per_call_us(template, iterations)
+        print(f"{name:22}{legacy_us:>10.2f}us{template_us:>10.2f}us{template_us / legacy_us:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,7 @@
 
 import os
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, scoped_session
 from dotenv import load_dotenv
 
@@ -8,9 +9,66 @@ load_dotenv()
 
 DATABASE_URL = os.getenv('DATABASE_URL', 'sqlite:///flyclaim.db')
 
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+
+def build_engine(database_url: str = DATABASE_URL):
+    """
+    Create an engine with pool and connection settings suited to the backend
+
+    SQLite: connections are shared across threads, WAL journaling lets
+    readers run alongside a writer, and busy_timeout makes writers from
+    other gunicorn workers wait for the lock instead of failing.
+
+    Postgres/MySQL: a bounded pool per worker with pre-ping (drops dead
+    connections after failovers) and recycle (stays under server idle limits).
+    """
+    url = make_url(database_url)
+
+    if url.get_backend_name() == 'sqlite':
+        engine = create_engine(
+            database_url,
+            connect_args={"check_same_thread": False, "timeout": 30}
+        )
+        busy_timeout_ms = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', 30000))
+        in_memory = url.database in (None, '', ':memory:')
+
+        @event.listens_for(engine, "connect")
+        def _configure_sqlite(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            if not in_memory:
+                cursor.execute("PRAGMA journal_mode=WAL")
+                cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.execute(f"PRAGMA busy_timeout={busy_timeout_ms}")
+            cursor.close()
+
+        return engine
+
+    return create_engine(
+        database_url,
+        pool_size=int(os.getenv('DB_POOL_SIZE', 5)),
+        max_overflow=int(os.getenv('DB_MAX_OVERFLOW', 10)),
+        pool_timeout=int(os.getenv('DB_POOL_TIMEOUT', 30)),
+        pool_recycle=int(os.getenv('DB_POOL_RECYCLE', 1800)),
+        pool_pre_ping=True
+    )
+
+
+engine = build_engine(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Thread-local session; removed at the end of every Flask request (see init_app)
+db_session = scoped_session(SessionLocal)
+
+
+def init_app(app):
+    """Register request-scoped session cleanup on a Flask app"""
+
+    @app.teardown_appcontext
+    def remove_db_session(exception=None):
+        if exception is not None:
+            db_session.rollback()
+        db_session.remove()
+
+
 def get_db():
     """Dependency for getting DB session"""
     db = SessionLocal()
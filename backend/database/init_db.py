@@ -10,9 +10,11 @@ from datetime import datetime
 # Add parent directory to path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
-from sqlalchemy import create_engine
+from sqlalchemy import inspect, text
 from sqlalchemy.orm import sessionmaker
 from backend.database.models import Base, AirlineNodalOfficer
+from backend.database.db_session import build_engine
+from backend.utils.airline_registry import load_seed_airlines
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -25,64 +27,53 @@ def create_tables(engine):
     """Create all tables"""
     print("Creating database tables...")
     Base.metadata.create_all(engine)
+    add_missing_columns(engine)
+    create_missing_indexes(engine)
     print("✓ Tables created successfully")
 
 
+def add_missing_columns(engine):
+    """
+    Add columns added to models after their tables already existed
+
+    create_all never alters an existing table, so a database created from
+    older models is upgraded here with ALTER TABLE ... ADD COLUMN. Added
+    columns are nullable; existing rows read them as NULL.
+    """
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    quote = engine.dialect.identifier_preparer.quote
+
+    with engine.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            present = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in present:
+                    continue
+                if not column.nullable and column.server_default is None:
+                    print(f"  ! Cannot add NOT NULL column {table.name}.{column.name} to existing rows; skipped")
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                connection.execute(text(
+                    f"ALTER TABLE {quote(table.name)} ADD COLUMN {quote(column.name)} {column_type}"
+                ))
+                print(f"  ✓ Added column {table.name}.{column.name}")
+
+
+def create_missing_indexes(engine):
+    """Create indexes added to models after their tables already existed"""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(engine, checkfirst=True)
+
+
 def seed_airline_data(session):
     """Seed airline nodal officer information"""
     print("\nSeeding airline nodal officer data...")
     
-    airlines = [
-        {
-            'airline_code': '6E',
-            'airline_name': 'IndiGo',
-            'email': 'customer.relations@goindigo.in',
-            'phone': '+91-9910383838',
-            'office_address': 'Upper Ground Floor, Thapar House, Gate No. 2, Western Wing, 124 Janpath, New Delhi - 110001'
-        },
-        {
-            'airline_code': 'AI',
-            'airline_name': 'Air India',
-            'email': 'feedback@airindia.in',
-            'phone': '+91-124-2641407',
-            'office_address': 'Airlines House, 113, Gurudwara Rakabganj Road, New Delhi - 110001'
-        },
-        {
-            'airline_code': 'SG',
-            'airline_name': 'SpiceJet',
-            'email': 'complaints@spicejet.com',
-            'phone': '+91-987-1803333',
-            'office_address': '319, Udyog Vihar, Phase IV, Gurgaon - 122015, Haryana'
-        },
-        {
-            'airline_code': 'UK',
-            'airline_name': 'Vistara',
-            'email': 'customer.feedback@airvistara.com',
-            'phone': '+91-9289228888',
-            'office_address': 'One Horizon Center, Golf Course Road, DLF Phase 5, Sector 43, Gurgaon - 122002'
-        },
-        {
-            'airline_code': 'I5',
-            'airline_name': 'AirAsia India',
-            'email': 'support@airasia.com',
-            'phone': '+91-80-46452500',
-            'office_address': 'Gopalan Millennium Tower, ITPL Main Road, Whitefield, Bangalore - 560066'
-        },
-        {
-            'airline_code': 'G8',
-            'airline_name': 'Go First',
-            'email': 'care@flygofirst.com',
-            'phone': '+91-22-71229900',
-            'office_address': 'Mumbai Airport, Domestic Terminal 1, Santa Cruz East, Mumbai - 400099'
-        },
-        {
-            'airline_code': 'QP',
-            'airline_name': 'Akasa Air',
-            'email': 'support@akasaair.com',
-            'phone': '+91-22-71229900',
-            'office_address': 'Akasa Air, Mumbai, Maharashtra'
-        },
-    ]
+    airlines = load_seed_airlines()
     
     for airline_data in airlines:
         # Check if already exists
@@ -93,7 +84,8 @@ def seed_airline_data(session):
         if not existing:
             officer = AirlineNodalOfficer(**airline_data)
             session.add(officer)
-            print(f"  ✓ Added {airline_data['airline_name']}")
+            note = '' if airline_data.get('email') else ' (no nodal contact on file)'
+            print(f"  ✓ Added {airline_data['airline_name']}{note}")
         else:
             print(f"  - {airline_data['airline_name']} already exists")
     
@@ -109,7 +101,7 @@ def init_database():
     
     # Create engine
     print(f"\nConnecting to database: {DATABASE_URL}")
-    engine = create_engine(DATABASE_URL, echo=False)
+    engine = build_engine(DATABASE_URL)
     
     # Create tables
     create_tables(engine)
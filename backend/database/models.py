@@ -4,7 +4,7 @@ SQLAlchemy ORM models for claims, users, and tracking
 """
 
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, Text, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, Text, ForeignKey, Index, Enum as SQLEnum
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 import enum
@@ -92,6 +92,7 @@ class Claim(Base):
     compensation_currency = Column(String(10), default='INR')
     calculation_reason = Column(Text)
     exemption_applied = Column(Boolean, default=False)
+    rules_version = Column(String(20))  # DGCA rule set version that scored the claim
     
     # Document paths
     claim_letter_path = Column(String(500))
@@ -123,6 +124,18 @@ class Claim(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # Composite indexes for the per-user claims listing (keyset pagination on id,
+    # optionally filtered by status, airline or flight date range)
+    __table_args__ = (
+        Index('ix_claims_user_id_id', 'user_id', 'id'),
+        Index('ix_claims_user_status_id', 'user_id', 'status', 'id'),
+        Index('ix_claims_user_airline_id', 'user_id', 'airline_name', 'id'),
+        Index('ix_claims_user_flight_date_id', 'user_id', 'flight_date', 'id'),
+        # Escalation scheduler: due-date range scans per status
+        Index('ix_claims_status_response_deadline', 'status', 'airline_response_deadline'),
+        Index('ix_claims_status_airsewa_date', 'status', 'airsewa_escalation_date'),
+    )
+    
     # Relationships
     user = relationship("User", back_populates="claims")
     activities = relationship("ClaimActivity", back_populates="claim", cascade="all, delete-orphan")
@@ -143,6 +156,7 @@ class Claim(Base):
             'delay_hours': self.delay_hours,
             'is_eligible': self.is_eligible,
             'compensation_amount': self.compensation_amount,
+            'rules_version': self.rules_version,
             'status': self.status.value if self.status else None,
             'submitted_at': self.submitted_at.isoformat() if self.submitted_at else None,
             'created_at': self.created_at.isoformat() if self.created_at else None
@@ -227,10 +241,149 @@ class FlightVerification(Base):
     
     # Cache metadata
     verified_at = Column(DateTime, default=datetime.utcnow)
-    expires_at = Column(DateTime)
+    expires_at = Column(DateTime, index=True)
     
     def __repr__(self):
         return f"<FlightVerification(flight={self.flight_number}, date={self.flight_date}, status={self.status})>"
+    
+    def to_dict(self):
+        """Convert verification to dictionary"""
+        return {
+            'flight_number': self.flight_number,
+            'flight_date': self.flight_date.strftime('%Y-%m-%d') if self.flight_date else None,
+            'status': self.status,
+            'scheduled_departure': self.scheduled_departure.isoformat() if self.scheduled_departure else None,
+            'actual_departure': self.actual_departure.isoformat() if self.actual_departure else None,
+            'scheduled_arrival': self.scheduled_arrival.isoformat() if self.scheduled_arrival else None,
+            'actual_arrival': self.actual_arrival.isoformat() if self.actual_arrival else None,
+            'delay_minutes': self.delay_minutes,
+            'departure_airport': self.departure_airport,
+            'arrival_airport': self.arrival_airport,
+            'verified_at': self.verified_at.isoformat() if self.verified_at else None,
+            'expires_at': self.expires_at.isoformat() if self.expires_at else None
+        }
+
+
+class WhatsAppConversation(Base):
+    """In-progress WhatsApp claim conversation (partial extraction per phone number)"""
+    __tablename__ = 'whatsapp_conversations'
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    phone_number = Column(String(50), unique=True, nullable=False, index=True)
+    
+    state = Column(String(50), default='collecting_info')
+    
+    # JSON: merged extracted fields so far, and the fields we last asked for
+    fields = Column(Text)
+    pending_fields = Column(Text)
+    turns = Column(Integer, default=0)
+    # Bumped by every save; in-process copies are only used while it matches
+    version = Column(Integer, default=0)
+    
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    expires_at = Column(DateTime, index=True)
+    
+    def __repr__(self):
+        return f"<WhatsAppConversation(phone={self.phone_number}, state={self.state}, turns={self.turns})>"
+
+
+class WebhookDelivery(Base):
+    """Processed inbound webhook deliveries, for de-duplicating provider retries"""
+    __tablename__ = 'webhook_deliveries'
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    message_sid = Column(String(64), unique=True, nullable=False, index=True)
+    
+    status = Column(String(20), default='processing')  # processing, done
+    response = Column(Text)  # Response body returned to the first delivery
+    
+    created_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, index=True)
+    
+    def __repr__(self):
+        return f"<WebhookDelivery(sid={self.message_sid}, status={self.status})>"
+
+
+class OutboundMessage(Base):
+    """Outbound WhatsApp message queued for delivery through Twilio"""
+    __tablename__ = 'outbound_messages'
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    to_number = Column(String(50), nullable=False)
+    body = Column(Text, nullable=False)
+    
+    # queued, sending, sent, delivered, read, failed, undelivered
+    status = Column(String(20), default='queued', nullable=False)
+    attempts = Column(Integer, default=0)
+    next_attempt_at = Column(DateTime, default=datetime.utcnow)
+    last_error = Column(Text)
+    
+    # Twilio message SID, used to match status callbacks
+    provider_sid = Column(String(64), unique=True, index=True)
+    
+    created_at = Column(DateTime, default=datetime.utcnow)
+    sent_at = Column(DateTime)
+    delivered_at = Column(DateTime)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    __table_args__ = (
+        Index('ix_outbound_messages_status_next_attempt', 'status', 'next_attempt_at'),
+    )
+    
+    def __repr__(self):
+        return f"<OutboundMessage(id={self.id}, to={self.to_number}, status={self.status})>"
+
+
+class MessageStatusEvent(Base):
+    """Twilio message status callback, kept for delivery analytics"""
+    __tablename__ = 'message_status_events'
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    message_sid = Column(String(64), nullable=False, index=True)
+    status = Column(String(20), nullable=False)
+    error_code = Column(String(10))
+    to_number = Column(String(50))
+    received_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    __table_args__ = (
+        Index('ix_message_status_events_status_received', 'status', 'received_at'),
+    )
+    
+    def __repr__(self):
+        return f"<MessageStatusEvent(sid={self.message_sid}, status={self.status})>"
+
+
+class Job(Base):
+    """Background job (e.g. one claim processing step) run by worker processes"""
+    __tablename__ = 'jobs'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    kind = Column(String(50), nullable=False)  # Handler name, e.g. 'claim.eligibility'
+    payload = Column(Text)  # JSON object passed to the handler
+    priority = Column(Integer, default=0, nullable=False)  # Higher runs first
+
+    # queued, running, succeeded, dead (gave up; kept for inspection / requeue)
+    status = Column(String(20), default='queued', nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    max_attempts = Column(Integer, default=5, nullable=False)
+    # Earliest time the job may be claimed; while running, when its lease expires
+    run_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    locked_by = Column(String(100))
+    locked_at = Column(DateTime)
+    last_error = Column(Text)
+
+    claim_id = Column(Integer, ForeignKey('claims.id'), index=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    finished_at = Column(DateTime)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        Index('ix_jobs_status_priority_run_at', 'status', 'priority', 'run_at'),
+    )
+
+    def __repr__(self):
+        return f"<Job(id={self.id}, kind={self.kind}, status={self.status})>"
 
 
 # Utility functions
@@ -241,26 +394,18 @@ def generate_claim_reference(claim_id: int, flight_number: str) -> str:
     return f"FC-{timestamp}-{flight_number}-{claim_id:04d}"
 
 
+def generate_unsaved_claim_reference(flight_number: str) -> str:
+    """Claim reference for a claim with no row (and so no id) yet; a random suffix keeps it unique"""
+    import secrets
+    from datetime import datetime
+    timestamp = datetime.utcnow().strftime('%Y%m%d')
+    return f"FC-{timestamp}-{flight_number}-{secrets.token_hex(3).upper()}"
+
+
 def get_airline_name(airline_code: str) -> str:
-    """Map airline code to full name"""
-    airline_map = {
-        '6E': 'IndiGo',
-        'AI': 'Air India',
-        'SG': 'SpiceJet',
-        'UK': 'Vistara',
-        'I5': 'AirAsia India',
-        'G8': 'Go First',
-        'QP': 'Akasa Air',
-        '9I': 'Alliance Air',
-        # International
-        'EK': 'Emirates',
-        'QR': 'Qatar Airways',
-        'SQ': 'Singapore Airlines',
-        'TG': 'Thai Airways',
-        'BA': 'British Airways',
-        'LH': 'Lufthansa',
-    }
-    return airline_map.get(airline_code.upper(), airline_code)
+    """Map airline code to full name (the code itself if unknown)"""
+    from backend.utils.airline_registry import get_airline_registry
+    return get_airline_registry().name_for(airline_code)
 
 
 def parse_flight_number(flight_number: str) -> tuple:
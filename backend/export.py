@@ -0,0 +1,113 @@
+"""
+FlyClaim AI - Table export
+Streams claims or claim_activities to a file (or stdout) as NDJSON or CSV
+
+Usage:
+    python -m backend.export claims -o claims.ndjson [--filter status=submitted_to_airline ...]
+    python -m backend.export claim_activities -o activities.csv [--after-id N] [--limit N]
+    python -m backend.export claims -o claims.ndjson --resume   (continue an interrupted export)
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from backend.utils.claim_export import EXPORT_FORMATS, EXPORT_TABLES, TableExport
+
+
+def last_ndjson_id(path: str) -> int:
+    """
+    Id of the last complete row in an NDJSON export; a partly written
+    last line is cut off so the resumed export appends cleanly
+    """
+    with open(path, 'rb+') as f:
+        position = f.seek(0, os.SEEK_END)
+        tail = b''
+        while position > 0:
+            step = min(65536, position)
+            position -= step
+            f.seek(position)
+            tail = f.read(step) + tail
+            complete = tail.rfind(b'\n')
+            previous = tail.rfind(b'\n', 0, complete) if complete >= 0 else -1
+            if previous >= 0 or (complete >= 0 and position == 0):
+                f.truncate(position + complete + 1)
+                return json.loads(tail[previous + 1:complete])['id']
+        f.truncate(0)
+        raise ValueError('no complete row to resume from')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='FlyClaim AI table export')
+    parser.add_argument('table', choices=list(EXPORT_TABLES))
+    parser.add_argument('-o', '--output', help='output file (default: stdout)')
+    parser.add_argument('--format', choices=list(EXPORT_FORMATS),
+                        help='default: from the output file extension, else ndjson')
+    parser.add_argument('--filter', action='append', default=[], metavar='NAME=VALUE',
+                        help='filter rows, as in the /api/export query string (repeatable)')
+    parser.add_argument('--after-id', type=int, help='export rows after this id')
+    parser.add_argument('--limit', type=int)
+    parser.add_argument('--resume', action='store_true',
+                        help='append to an interrupted NDJSON export, after its last row')
+    parser.add_argument('--no-header', action='store_true', help='omit the CSV header (when appending)')
+    parser.add_argument('--batch-size', type=int, default=2000, help='rows fetched per round trip')
+    args = parser.parse_args()
+
+    fmt = args.format
+    if fmt is None:
+        extension = os.path.splitext(args.output or '')[1].lstrip('.')
+        fmt = extension if extension in EXPORT_FORMATS else 'ndjson'
+
+    filters = {}
+    for item in args.filter:
+        name, separator, value = item.partition('=')
+        if not separator:
+            parser.error(f'--filter expects NAME=VALUE, got {item!r}')
+        filters[name] = value
+
+    after_id = args.after_id
+    mode = 'w'
+    if args.resume:
+        if fmt != 'ndjson' or not args.output:
+            parser.error('--resume needs an NDJSON --output file; for CSV pass --after-id')
+        if os.path.exists(args.output) and os.path.getsize(args.output):
+            try:
+                after_id = last_ndjson_id(args.output)
+            except ValueError:
+                after_id = None
+            mode = 'a'
+
+    try:
+        export = TableExport(args.table, filters=filters, after_id=after_id, limit=args.limit,
+                             batch_size=args.batch_size)
+    except ValueError as e:
+        parser.error(str(e))
+
+    out = open(args.output, mode, encoding='utf-8', newline='') if args.output else sys.stdout
+    started = time.perf_counter()
+    try:
+        chunks = export.csv(header=not args.no_header) if fmt == 'csv' else export.ndjson()
+        for chunk in chunks:
+            out.write(chunk)
+    except KeyboardInterrupt:
+        print(f"Interrupted; resume with --after-id {export.last_id}", file=sys.stderr)
+        sys.exit(130)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    elapsed = time.perf_counter() - started
+    print(f"Exported {export.rows_exported:,} {args.table} rows in {elapsed:.1f}s"
+          f" (last id {export.last_id})", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,16 +1,24 @@
 
-from flask import Blueprint, request, jsonify
-from datetime import datetime
+import os
+import hmac
+import json
+import base64
+from flask import Blueprint, Response, request, jsonify
+from datetime import datetime, timedelta
+from sqlalchemy import or_, and_
 from werkzeug.security import generate_password_hash, check_password_hash
-from backend.database.db_session import get_db
-from backend.database.models import User, Claim, DisruptionType, ClaimStatus, generate_claim_reference
+from backend.database.db_session import db_session
+from backend.database.models import User, Claim, ClaimStatus, generate_claim_reference
+from backend.utils.claim_jobs import enqueue_claim_processing
+from backend.utils.claim_export import EXPORT_FORMATS, EXPORT_TABLES, TableExport
+from backend.utils.claim_import import IMPORT_FORMATS, ClaimImporter, claim_values
 
 web_api_bp = Blueprint('web_api', __name__)
 
 @web_api_bp.route('/api/auth/signup', methods=['POST'])
 def signup():
     data = request.json
-    db = next(get_db())
+    db = db_session()
 
     try:
         phone = data.get('phone')
@@ -44,13 +52,11 @@ def signup():
     except Exception as e:
         db.rollback()
         return jsonify({'error': str(e)}), 500
-    finally:
-        db.close()
 
 @web_api_bp.route('/api/auth/login', methods=['POST'])
 def login():
     data = request.json
-    db = next(get_db())
+    db = db_session()
 
     try:
         phone = data.get('phone')
@@ -74,41 +80,20 @@ def login():
         }), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
-    finally:
-        db.close()
 
 @web_api_bp.route('/api/claims', methods=['POST'])
 def create_claim():
     data = request.json
-    db = next(get_db())
+    db = db_session()
 
     try:
-        # Validate required fields
-        required_fields = ['user_id', 'flight_number', 'flight_date', 'airline_name', 'reason']
-        for field in required_fields:
-            if not data.get(field):
-                return jsonify({'error': f'Missing field: {field}'}), 400
-
-        # Parse flight date
         try:
-            flight_date = datetime.fromisoformat(data['flight_date'].replace('Z', '+00:00'))
-        except ValueError:
-            flight_date = datetime.strptime(data['flight_date'], '%Y-%m-%d')
-
-        # Determine disruption type (simplified mapping)
-        reason = data.get('reason', '').lower()
-        disruption_type = DisruptionType.DELAY
-        if 'cancel' in reason:
-            disruption_type = DisruptionType.CANCELLATION
-        elif 'denied' in reason:
-            disruption_type = DisruptionType.DENIED_BOARDING
+            values = claim_values(data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
 
         new_claim = Claim(
-            user_id=data['user_id'],
-            flight_number=data['flight_number'],
-            airline_name=data['airline_name'],
-            flight_date=flight_date,
-            disruption_type=disruption_type,
+            **values,
             claim_reference='TEMP', # Placeholder
             status=ClaimStatus.INITIATED
         )
@@ -119,23 +104,54 @@ def create_claim():
         # Generate real reference
         new_claim.claim_reference = generate_claim_reference(new_claim.id, new_claim.flight_number)
 
+        # Eligibility, letter and submission run on the job workers; the job
+        # is committed with the claim so neither exists without the other
+        job_id = enqueue_claim_processing(new_claim.id, session=db)
+
         db.commit()
         db.refresh(new_claim)
 
         return jsonify({
             'message': 'Claim submitted successfully',
-            'claim': new_claim.to_dict()
+            'claim': new_claim.to_dict(),
+            'job_id': job_id
         }), 201
 
     except Exception as e:
         db.rollback()
         return jsonify({'error': str(e)}), 500
-    finally:
-        db.close()
+
+@web_api_bp.route('/api/claims/bulk', methods=['POST'])
+def bulk_import_claims():
+    """
+    Import many claims from JSON lines or CSV (for travel-agency partners)
+
+    The body is one JSON object per line (Content-Type application/x-ndjson)
+    or CSV with a header row (text/csv), with the fields POST /api/claims
+    takes; ?format=ndjson|csv overrides the content type. The upload is
+    validated as it streams in and imported in batches. The report lists
+    each imported claim's reference and each rejected row with its error;
+    ?dry_run=true only validates. If a batch cannot be written the import
+    stops and the partial report comes back with status 500, its 'stopped'
+    entry naming the batch's rows and the error.
+    """
+    fmt = request.args.get('format')
+    if fmt is None:
+        content_type = request.mimetype
+        fmt = next((name for name, types in IMPORT_FORMATS.items() if content_type in types), 'ndjson')
+    if fmt not in IMPORT_FORMATS:
+        return jsonify({'error': f"format must be one of: {', '.join(IMPORT_FORMATS)}"}), 400
+
+    try:
+        dry_run = request.args.get('dry_run', 'false').lower() in ('1', 'true', 'yes')
+        report = ClaimImporter.from_env().run(request.stream, fmt, dry_run=dry_run)
+        return jsonify(report), 500 if 'stopped' in report else 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
 
 @web_api_bp.route('/api/claims/<claim_reference>', methods=['GET'])
 def get_claim(claim_reference):
-    db = next(get_db())
+    db = db_session()
     try:
         claim = db.query(Claim).filter(Claim.claim_reference == claim_reference).first()
         if not claim:
@@ -144,16 +160,152 @@ def get_claim(claim_reference):
         return jsonify(claim.to_dict()), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
-    finally:
-        db.close()
+
+CLAIMS_PAGE_SIZE = 50
+CLAIMS_MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(claim, by_flight_date):
+    """Encode the sort key of the last claim on a page as an opaque cursor"""
+    key = [claim.flight_date.isoformat(), claim.id] if by_flight_date else [claim.id]
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
+
+
+def decode_cursor(cursor, by_flight_date):
+    """Decode a cursor produced by encode_cursor; raises ValueError if malformed"""
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not isinstance(key, list):
+            raise ValueError('not a list')
+        if by_flight_date:
+            return datetime.fromisoformat(key[0]), int(key[1])
+        return int(key[0])
+    except (TypeError, IndexError, ValueError) as e:
+        raise ValueError(f'Invalid cursor: {e}')
+
+
+def parse_date_param(name):
+    value = request.args.get(name)
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, '%Y-%m-%d')
+    except ValueError:
+        raise ValueError(f'{name} must be YYYY-MM-DD')
+
 
 @web_api_bp.route('/api/users/<int:user_id>/claims', methods=['GET'])
 def get_user_claims(user_id):
-    db = next(get_db())
+    """
+    List a user's claims, newest first
+
+    Query params: status, airline, date_from, date_to (flight date,
+    inclusive), and limit/cursor for paging. Without limit or cursor every
+    matching claim is returned, as before paging existed. With either, one
+    page is returned (limit defaults to CLAIMS_PAGE_SIZE), read with keyset
+    pagination on the composite claim indexes, so latency does not grow
+    with the number of claims or the page number. The response body stays
+    a plain list; the cursor for the next page is returned in the
+    X-Next-Cursor header (absent on the last page).
+    """
+    db = db_session()
     try:
-        claims = db.query(Claim).filter(Claim.user_id == user_id).all()
-        return jsonify([c.to_dict() for c in claims]), 200
+        try:
+            paged = 'limit' in request.args or 'cursor' in request.args
+            limit = min(max(int(request.args.get('limit', CLAIMS_PAGE_SIZE)), 1), CLAIMS_MAX_PAGE_SIZE)
+            date_from = parse_date_param('date_from')
+            date_to = parse_date_param('date_to')
+            status = request.args.get('status')
+            if status:
+                status = ClaimStatus(status)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        query = db.query(Claim).filter(Claim.user_id == user_id)
+        if status:
+            query = query.filter(Claim.status == status)
+        if request.args.get('airline'):
+            query = query.filter(Claim.airline_name == request.args['airline'])
+        if date_from:
+            query = query.filter(Claim.flight_date >= date_from)
+        if date_to:
+            query = query.filter(Claim.flight_date < date_to + timedelta(days=1))
+
+        # A date range is served from (user_id, flight_date, id); otherwise walk by id
+        by_flight_date = bool(date_from or date_to)
+        cursor = request.args.get('cursor')
+        if cursor:
+            try:
+                position = decode_cursor(cursor, by_flight_date)
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            if by_flight_date:
+                last_date, last_id = position
+                query = query.filter(or_(
+                    Claim.flight_date < last_date,
+                    and_(Claim.flight_date == last_date, Claim.id < last_id)
+                ))
+            else:
+                query = query.filter(Claim.id < position)
+
+        if by_flight_date:
+            query = query.order_by(Claim.flight_date.desc(), Claim.id.desc())
+        else:
+            query = query.order_by(Claim.id.desc())
+
+        if not paged:
+            return jsonify([c.to_dict() for c in query.all()]), 200
+
+        # Fetch one extra row to know whether another page exists
+        claims = query.limit(limit + 1).all()
+        has_more = len(claims) > limit
+        claims = claims[:limit]
+
+        response = jsonify([c.to_dict() for c in claims])
+        if has_more:
+            response.headers['X-Next-Cursor'] = encode_cursor(claims[-1], by_flight_date)
+        return response, 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
-    finally:
-        db.close()
+
+
+@web_api_bp.route('/api/export/<table>', methods=['GET'])
+def export_table(table):
+    """
+    Stream a table (claims or claim_activities) as NDJSON or CSV
+
+    Query params: format (ndjson, the default, or csv), after_id, limit
+    and the table's filters - claims: status (comma list), airline,
+    user_id, flight_date_from/to, created_from/to; claim_activities:
+    claim_id, activity_type, created_from/to. Rows come in id order from
+    a server-side cursor and are sent as a chunked response, so the export
+    never sits in memory. To resume an interrupted export, pass the id of
+    the last row received as after_id.
+
+    The export carries passenger contact details, so it needs the
+    ADMIN_API_TOKEN secret in the X-Admin-Token header; without the secret
+    configured the endpoint is off and exports run from the CLI only.
+    """
+    admin_token = os.getenv('ADMIN_API_TOKEN')
+    if not admin_token:
+        return jsonify({'error': 'Export is disabled; use python -m backend.export'}), 404
+    if not hmac.compare_digest(request.headers.get('X-Admin-Token', '').encode(), admin_token.encode()):
+        return jsonify({'error': 'Admin token required'}), 401
+
+    if table not in EXPORT_TABLES:
+        return jsonify({'error': f'Unknown table: {table}'}), 404
+
+    fmt = request.args.get('format', 'ndjson')
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({'error': f"format must be one of: {', '.join(EXPORT_FORMATS)}"}), 400
+    try:
+        export = TableExport.from_params(table, request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    # The export opens its own session; the request's is released at teardown
+    return Response(
+        export.stream(fmt),
+        mimetype=EXPORT_FORMATS[fmt],
+        headers={'Content-Disposition': f'attachment; filename={table}.{fmt}'}
+    )
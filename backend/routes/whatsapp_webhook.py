@@ -6,21 +6,45 @@ Receives messages from WhatsApp and processes claims
 import os
 from flask import Blueprint, request
 from twilio.twiml.messaging_response import MessagingResponse
-from twilio.rest import Client
-from backend.agents.intake_agent import IntakeAgent
-from backend.agents.eligibility_agent import EligibilityAgent
+from backend.agents.registry import get_intake_agent, get_eligibility_agent
+from backend.utils.worker_pool import BoundedWorkerPool
+from backend.utils.conversation_store import ConversationStore
+from backend.utils.idempotency import IdempotencyStore
+from backend.utils.outbound_sender import OutboundQueue
+from backend.utils.status_events import StatusEventBuffer
+from backend.utils.templates import get_template_renderer
 
 # Create blueprint
 whatsapp_bp = Blueprint('whatsapp', __name__)
 
-# Initialize agents
-intake_agent = IntakeAgent()
-eligibility_agent = EligibilityAgent()
+# Reply texts live in backend/templates/whatsapp, compiled once
+templates = get_template_renderer()
 
-# Initialize Twilio client
-account_sid = os.getenv('TWILIO_ACCOUNT_SID')
-auth_token = os.getenv('TWILIO_AUTH_TOKEN')
-twilio_client = Client(account_sid, auth_token) if account_sid and auth_token else None
+# Outbound messages: persistent queue, rate limited per sender number
+outbound_queue = OutboundQueue.from_env()
+
+
+def apply_status_events(events):
+    """Advance outbound queue entries from a flushed batch of status callbacks"""
+    outbound_queue.apply_statuses(events)
+
+
+# Status callbacks: buffered and stored in batches, then applied to the queue
+status_events = StatusEventBuffer.from_env('WHATSAPP', on_flush=apply_status_events)
+
+# Partially extracted claims, carried between messages from the same number
+conversation_store = ConversationStore.from_env()
+
+# Twilio retries slow webhooks; each MessageSid is processed once
+idempotency_store = IdempotencyStore.from_env('WHATSAPP')
+
+# Async mode: acknowledge immediately and reply from a bounded worker pool
+ASYNC_PROCESSING = os.getenv('WHATSAPP_ASYNC', 'False') == 'True'
+whatsapp_pool = BoundedWorkerPool(
+    'whatsapp',
+    max_workers=int(os.getenv('WHATSAPP_WORKERS', 4)),
+    max_queue=int(os.getenv('WHATSAPP_QUEUE_SIZE', 100))
+)
 
 
 @whatsapp_bp.route('/webhook/whatsapp', methods=['POST'])
@@ -31,100 +55,154 @@ def whatsapp_webhook():
     # Get message details from Twilio
     incoming_msg = request.values.get('Body', '').strip()
     from_number = request.values.get('From', '')
+    message_sid = request.values.get('MessageSid')
     
+    # Retries of the same message get the first response; nothing is re-run.
+    # A retry that gives up waiting returns an empty TwiML (no extra reply).
+    return idempotency_store.run_once(
+        message_sid,
+        lambda: handle_message(incoming_msg, from_number),
+        timeout_response=str(MessagingResponse())
+    )
+
+
+def handle_message(incoming_msg: str, from_number: str) -> str:
+    """
+    Process one inbound message and return the TwiML response body
+    
+    Args:
+        incoming_msg: Stripped message body
+        from_number: Sender's WhatsApp number
+        
+    Returns:
+        TwiML string
+    """
     # Create Twilio response
     resp = MessagingResponse()
     msg = resp.message()
     
+    # Greetings and help are cheap - always answer inline
+    quick_reply = get_quick_reply(incoming_msg)
+    if quick_reply:
+        msg.body(quick_reply)
+        return str(resp)
+    
+    if ASYNC_PROCESSING:
+        # Acknowledge now, run the agents in the background, reply via REST API
+        if whatsapp_pool.submit(process_and_reply, from_number, incoming_msg):
+            msg.body(templates.render('whatsapp/processing.txt'))
+        else:
+            msg.body(templates.render('whatsapp/busy.txt'))
+        return str(resp)
+    
+    msg.body(build_reply(incoming_msg, from_number))
+    return str(resp)
+
+
+def get_quick_reply(incoming_msg: str):
+    """
+    Return canned replies for empty messages and help commands
+    
+    Args:
+        incoming_msg: Stripped message body
+        
+    Returns:
+        Reply text, or None if the message needs the agents
+    """
     # Handle empty message
     if not incoming_msg:
-        msg.body("👋 Welcome to FlyClaim AI!\n\n"
-                "I help you claim flight compensation automatically.\n\n"
-                "Just tell me about your delayed or cancelled flight.\n\n"
-                "Example: 'My IndiGo flight 6E-234 from Delhi to Mumbai on 28 Oct was delayed by 5 hours'")
-        return str(resp)
+        return templates.render('whatsapp/welcome.txt')
     
     # Handle commands
     if incoming_msg.lower() in ['help', 'start', 'hi', 'hello']:
-        msg.body("👋 Hi! I'm FlyClaim AI.\n\n"
-                "I can help you claim ₹5,000-₹20,000 compensation for:\n"
-                "• Flight delays (>2 hours)\n"
-                "• Flight cancellations\n"
-                "• Denied boarding\n\n"
-                "Just tell me:\n"
-                "1. Flight number\n"
-                "2. Date of travel\n"
-                "3. What happened (delay/cancellation)\n"
-                "4. How many hours delayed\n\n"
-                "Example: 'My IndiGo 6E-234 from Delhi to Mumbai on 28 Oct was delayed 5 hours'")
-        return str(resp)
+        return templates.render('whatsapp/help.txt')
+    
+    return None
+
+
+def build_reply(incoming_msg: str, from_number: str = None) -> str:
+    """
+    Run intake and eligibility for a message and build the reply text
     
+    Args:
+        incoming_msg: User's message describing their flight issue
+        from_number: Sender's WhatsApp number; enables multi-message claims
+        
+    Returns:
+        Reply text for the user
+    """
     try:
-        # Step 1: Extract flight details using Intake Agent
-        extracted_data = intake_agent.extract_flight_details(incoming_msg)
+        intake_agent = get_intake_agent()
+        eligibility_agent = get_eligibility_agent()
+        
+        # Step 1: Extract flight details, continuing an open conversation if any
+        conversation = conversation_store.get(from_number) if from_number else None
+        if conversation:
+            extracted_data = intake_agent.continue_extraction(
+                incoming_msg, conversation['fields'], conversation['pending']
+            )
+        else:
+            extracted_data = intake_agent.extract_flight_details(incoming_msg)
         
         # Check if extraction was successful
         if extracted_data.get('error'):
-            msg.body("❌ Sorry, I couldn't understand that.\n\n"
-                    "Please include:\n"
-                    "• Flight number (e.g., 6E-234)\n"
-                    "• Date\n"
-                    "• Delay duration\n\n"
-                    "Try again with more details.")
-            return str(resp)
+            return templates.render('whatsapp/not_understood.txt')
         
         # Validate extracted data
-        validation = intake_agent.validate_extracted_data(extracted_data)
+        validation = intake_agent.validate_extracted_data(extracted_data, require_delay_hours=True)
         
         if not validation['is_valid']:
             # Ask for missing information
             missing = validation['required_follow_up'][:2]  # Max 2 at a time
+            if from_number:
+                turns = conversation['turns'] + 1 if conversation else 1
+                conversation_store.save(from_number, extracted_data, missing, turns=turns)
             follow_up = '\n'.join([intake_agent.generate_follow_up_question(field) for field in missing])
-            msg.body(f"⚠️ I need some more information:\n\n{follow_up}")
-            return str(resp)
+            return templates.render('whatsapp/need_info.txt', follow_up=follow_up)
+        
+        if conversation:
+            conversation_store.clear(from_number)
         
         # Step 2: Check eligibility using Eligibility Agent
         eligibility_result = eligibility_agent.check_eligibility({
             'flight_number': extracted_data.get('flight_number'),
-            'flight_duration_hours': extracted_data.get('flight_duration_hours', 2.0),
+            'flight_date': extracted_data.get('flight_date'),
+            'departure': extracted_data.get('departure'),
+            'arrival': extracted_data.get('arrival'),
+            'flight_duration_hours': extracted_data.get('flight_duration_hours'),
             'delay_hours': extracted_data.get('delay_hours'),
             'disruption_type': extracted_data.get('disruption_type'),
-            'is_international': extracted_data.get('is_international', False)
+            'is_international': extracted_data.get('is_international')
         })
         
         # Step 3: Send result to user
         if eligibility_result.get('eligible'):
-            amount = eligibility_result['compensation_amount']
-            response_text = (
-                f"✅ Great News!\n\n"
-                f"You are eligible for ₹{amount:,} compensation!\n\n"
-                f"📋 Details:\n"
-                f"Flight: {extracted_data.get('flight_number')}\n"
-                f"Date: {extracted_data.get('flight_date')}\n"
-                f"Route: {extracted_data.get('departure')} → {extracted_data.get('arrival')}\n"
-                f"Issue: {extracted_data.get('disruption_type').title()}\n\n"
-                f"💼 Legal Basis:\n"
-                f"DGCA CAR Section 3\n\n"
-                f"🚀 Next Steps:\n"
-                f"Reply 'YES' to file the claim automatically, or 'INFO' for more details."
+            return templates.render(
+                'whatsapp/eligible.txt',
+                extracted_data,
+                amount=eligibility_result['compensation_amount']
             )
-            msg.body(response_text)
         else:
-            reason = eligibility_result.get('reason', 'Unknown reason')
-            response_text = (
-                f"❌ Eligibility Check\n\n"
-                f"Unfortunately, you may not be eligible for compensation.\n\n"
-                f"Reason: {reason}\n\n"
-                f"You can still contact the airline directly for goodwill compensation.\n\n"
-                f"Reply 'HELP' for more information."
+            return templates.render(
+                'whatsapp/not_eligible.txt',
+                reason=eligibility_result.get('reason', 'Unknown reason')
             )
-            msg.body(response_text)
         
     except Exception as e:
-        msg.body(f"❌ An error occurred: {str(e)}\n\n"
-                "Please try again or contact support.")
+        return templates.render('whatsapp/error.txt', error=str(e))
+
+
+def process_and_reply(to_number: str, incoming_msg: str):
+    """
+    Background task: build the reply and queue it for the Twilio REST API
     
-    return str(resp)
+    Args:
+        to_number: Sender's WhatsApp number
+        incoming_msg: User's message
+    """
+    reply = build_reply(incoming_msg, to_number)
+    if send_whatsapp_message(to_number, reply) is None:
+        raise RuntimeError(f"Failed to deliver reply to {to_number}")
 
 
 @whatsapp_bp.route('/webhook/whatsapp/status', methods=['POST'])
@@ -133,30 +211,36 @@ def whatsapp_status():
     message_sid = request.values.get('MessageSid')
     message_status = request.values.get('MessageStatus')
     
-    print(f"Message {message_sid} status: {message_status}")
+    if not message_sid or not message_status:
+        return '', 400
+    
+    # Only buffered here; the database write happens in the next batch
+    status_events.record(
+        message_sid,
+        message_status,
+        error_code=request.values.get('ErrorCode'),
+        to_number=request.values.get('To')
+    )
     
     return '', 200
 
 
 def send_whatsapp_message(to_number: str, message: str):
     """
-    Send a WhatsApp message via Twilio
+    Queue a WhatsApp message for delivery via Twilio
+    
+    The message is stored in the outbound queue and sent by its background
+    dispatcher, which retries transient Twilio failures.
     
     Args:
         to_number: Recipient's WhatsApp number (format: whatsapp:+919876543210)
         message: Message text to send
+        
+    Returns:
+        Outbound queue entry id, or None if Twilio is not configured
     """
-    if not twilio_client:
+    if not outbound_queue.enabled:
         print("Twilio client not initialized. Check your credentials.")
         return None
     
-    try:
-        message = twilio_client.messages.create(
-            from_=os.getenv('TWILIO_WHATSAPP_NUMBER'),
-            body=message,
-            to=to_number
-        )
-        return message.sid
-    except Exception as e:
-        print(f"Error sending WhatsApp message: {e}")
-        return None
+    return outbound_queue.enqueue(to_number, message)
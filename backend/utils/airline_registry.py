@@ -0,0 +1,227 @@
+"""
+Airline Registry - In-process airline directory backed by airline_nodal_officers
+The table is read once into an immutable map; readers never query the
+database, and the map is rebuilt when the table's version changes
+"""
+
+import os
+import json
+import time
+import threading
+from collections import namedtuple
+from types import MappingProxyType
+from typing import Callable, Dict, List, Mapping, Optional
+
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
+
+from backend.database.models import AirlineNodalOfficer
+
+
+DEFAULT_SEED_FILE = os.path.abspath(os.path.join(os.path.dirname(__file__), '../data/airlines.json'))
+
+Airline = namedtuple('Airline', [
+    'code', 'name', 'email', 'alternate_email', 'phone', 'office_address', 'nodal_officer_name'
+])
+
+
+def load_seed_airlines(path: str = DEFAULT_SEED_FILE) -> List[Dict]:
+    """Read the airline seed rows (column name -> value) from the data file"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)['airlines']
+
+
+# Bumped after any commit that touched an AirlineNodalOfficer row in this
+# process; registries compare it on every read (an int comparison)
+_generation = 0
+
+
+def _record_airline_changes(session, flush_context):
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, AirlineNodalOfficer):
+            session.info['airlines_changed'] = True
+            return
+
+
+def _bump_generation(session):
+    global _generation
+    if session.info.pop('airlines_changed', False):
+        _generation += 1
+
+
+def _discard_changes(session):
+    session.info.pop('airlines_changed', None)
+
+
+event.listen(Session, 'after_flush', _record_airline_changes)
+event.listen(Session, 'after_commit', _bump_generation)
+event.listen(Session, 'after_rollback', _discard_changes)
+
+
+class AirlineRegistry:
+    """
+    Immutable snapshot of the airline directory with versioned invalidation
+
+    The snapshot is a MappingProxyType of Airline tuples keyed by airline
+    code, layered over the seed file so codes not (yet) in the table still
+    resolve to a name. It is replaced wholesale, never mutated, so readers
+    need no lock. Two things trigger a rebuild:
+    - a commit in this process that touched an AirlineNodalOfficer row
+      (caught by a session event; seen on the next read)
+    - a change to the table's version (row count + latest updated_at),
+      checked at most once every check_interval seconds, which picks up
+      edits made by other workers or directly in the database
+    If the database cannot be read the previous snapshot (or the seed
+    data on first load) is kept and the load is retried at the next check.
+    """
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable] = None,
+        seed_path: str = DEFAULT_SEED_FILE,
+        check_interval: float = 60
+    ):
+        """
+        Args:
+            session_factory: Session factory (defaults to SessionLocal)
+            seed_path: Airline seed file used beneath the table rows
+            check_interval: Seconds between table version checks
+        """
+        if session_factory is None:
+            from backend.database.db_session import SessionLocal
+            session_factory = SessionLocal
+
+        self.session_factory = session_factory
+        self.seed_path = seed_path
+        self.check_interval = check_interval
+
+        self._airlines = None  # MappingProxyType, built on first read
+        self._table_version = None
+        self._generation = _generation
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+        self.version = 0  # Incremented on every rebuild
+        self.loaded_at = None
+        self.source = None
+        self._counters = {'reloads': 0, 'version_checks': 0, 'load_errors': 0}
+
+    @classmethod
+    def from_env(cls) -> 'AirlineRegistry':
+        return cls(
+            seed_path=os.getenv('AIRLINE_SEED_FILE', DEFAULT_SEED_FILE),
+            check_interval=float(os.getenv('AIRLINE_REGISTRY_CHECK_INTERVAL', 60))
+        )
+
+    def airlines(self) -> Mapping[str, Airline]:
+        """Return the current read-only map of airline code -> Airline"""
+        if self._generation != _generation or time.monotonic() >= self._next_check:
+            self._refresh()
+        return self._airlines
+
+    def get(self, airline_code: Optional[str]) -> Optional[Airline]:
+        if not airline_code:
+            return None
+        return self.airlines().get(airline_code.upper())
+
+    def name_for(self, airline_code: str) -> str:
+        """Airline name for a code; the code itself if unknown"""
+        airline = self.get(airline_code)
+        return airline.name if airline else airline_code
+
+    def email_for(self, airline_code: Optional[str]) -> Optional[str]:
+        """Nodal officer email for a code; None if unknown or not on file"""
+        airline = self.get(airline_code)
+        return airline.email if airline else None
+
+    def invalidate(self):
+        """Rebuild the snapshot on the next read"""
+        self._table_version = None
+        self._next_check = 0.0
+
+    def _refresh(self):
+        # Readers keep using the current snapshot while one thread reloads;
+        # only the very first load makes everyone wait
+        if not self._lock.acquire(blocking=self._airlines is None):
+            return
+        try:
+            if self._airlines is not None and self._generation == _generation \
+                    and time.monotonic() < self._next_check:
+                return  # Another thread refreshed while we waited
+            generation = _generation
+            try:
+                with self.session_factory() as session:
+                    self._counters['version_checks'] += 1
+                    table_version = tuple(session.execute(
+                        select(func.count(AirlineNodalOfficer.id), func.max(AirlineNodalOfficer.updated_at))
+                    ).one())
+                    if self._airlines is None or generation != self._generation \
+                            or table_version != self._table_version:
+                        rows = session.execute(select(AirlineNodalOfficer)).scalars().all()
+                        self._build(rows, 'database')
+                        self._table_version = table_version
+            except Exception as e:
+                self._counters['load_errors'] += 1
+                reason = str(e).splitlines()[0] if str(e) else type(e).__name__
+                print(f"Airline registry: could not read airline_nodal_officers ({reason}); using {self.source or 'seed'} data")
+                if self._airlines is None:
+                    self._build([], 'seed')
+            self._generation = generation
+            self._next_check = time.monotonic() + self.check_interval
+        finally:
+            self._lock.release()
+
+    def _build(self, rows: List[AirlineNodalOfficer], source: str):
+        airlines = {}
+        for seed in load_seed_airlines(self.seed_path):
+            airline = Airline(
+                code=seed['airline_code'].upper(),
+                name=seed['airline_name'],
+                email=seed.get('email') or None,
+                alternate_email=seed.get('alternate_email') or None,
+                phone=seed.get('phone'),
+                office_address=seed.get('office_address'),
+                nodal_officer_name=seed.get('nodal_officer_name')
+            )
+            airlines[airline.code] = airline
+        for row in rows:
+            airline = Airline(
+                code=row.airline_code.upper(),
+                name=row.airline_name,
+                email=row.email or None,
+                alternate_email=row.alternate_email or None,
+                phone=row.phone,
+                office_address=row.office_address,
+                nodal_officer_name=row.nodal_officer_name
+            )
+            airlines[airline.code] = airline
+
+        self._airlines = MappingProxyType(airlines)
+        self.version += 1
+        self.loaded_at = time.time()
+        self.source = source
+        self._counters['reloads'] += 1
+
+    def stats(self) -> Dict:
+        airlines = self._airlines or {}
+        return {
+            'version': self.version,
+            'source': self.source,
+            'airlines': len(airlines),
+            'with_email': sum(1 for airline in airlines.values() if airline.email),
+            'loaded_at': self.loaded_at,
+            **self._counters
+        }
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_airline_registry() -> AirlineRegistry:
+    """Return the shared airline registry configured from the environment"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = AirlineRegistry.from_env()
+    return _registry
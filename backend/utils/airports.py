@@ -0,0 +1,175 @@
+"""
+Airport Index - Offline airport lookup and route estimates
+Resolves free-text city/airport names to IATA codes from a bundled dataset
+and estimates block time and the domestic/international flag for a route
+"""
+
+import os
+import re
+import csv
+import math
+import difflib
+import threading
+from collections import namedtuple
+from functools import lru_cache
+from typing import Dict, Optional
+
+
+DEFAULT_AIRPORTS_FILE = os.path.abspath(os.path.join(os.path.dirname(__file__), '../data/airports.csv'))
+
+HOME_COUNTRY = 'IN'
+
+# Block-time model: great-circle distance stretched for airways routing,
+# flown at a typical narrow-body cruise speed, plus taxi/climb/descent
+ROUTING_FACTOR = 1.1
+CRUISE_SPEED_KMH = 800
+FIXED_OVERHEAD_HOURS = 0.5
+
+EARTH_RADIUS_KM = 6371.0
+
+Airport = namedtuple('Airport', ['iata', 'name', 'city', 'country', 'latitude', 'longitude'])
+
+# Words that do not help identify an airport ("Mumbai airport", "Delhi T3")
+_NOISE_WORDS = {'airport', 'international', 'intl', 'domestic', 'city', 'terminal', 'the', 't1', 't2', 't3'}
+_CODE_RE = re.compile(r'\b([A-Z]{3})\b')
+
+
+def _normalize(text: str) -> str:
+    words = re.sub(r'[^a-z ]+', ' ', text.lower()).split()
+    return ' '.join(word for word in words if word not in _NOISE_WORDS)
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two points in kilometres"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def estimate_block_hours(distance_km: float) -> float:
+    """Estimate scheduled gate-to-gate time for a great-circle distance"""
+    return round(distance_km * ROUTING_FACTOR / CRUISE_SPEED_KMH + FIXED_OVERHEAD_HOURS, 2)
+
+
+class AirportIndex:
+    """
+    In-memory airport index built once from the bundled CSV
+
+    Names resolve in order: IATA code, exact city/alias/airport name, a known
+    name inside a longer phrase, then closest spelling (difflib, among names
+    with the same first letter). Results are
+    memoized, so repeated lookups are dictionary reads.
+    """
+
+    def __init__(self, path: str = DEFAULT_AIRPORTS_FILE, fuzzy_cutoff: float = 0.85):
+        self.fuzzy_cutoff = fuzzy_cutoff
+        self.airports = {}  # iata -> Airport
+        self._names = {}    # normalized name/alias -> iata
+
+        with open(path, encoding='utf-8', newline='') as f:
+            for row in csv.DictReader(f):
+                airport = Airport(
+                    iata=row['iata'].upper(),
+                    name=row['name'],
+                    city=row['city'],
+                    country=row['country'].upper(),
+                    latitude=float(row['latitude']),
+                    longitude=float(row['longitude'])
+                )
+                self.airports[airport.iata] = airport
+
+                names = [airport.city, airport.name] + (row.get('aliases') or '').split('|')
+                for name in names:
+                    key = _normalize(name)
+                    if key:
+                        # First airport listed for a name wins (e.g. main city airport)
+                        self._names.setdefault(key, airport.iata)
+
+        # Fuzzy candidates bucketed by first letter; misspellings rarely change it
+        self._names_by_initial = {}
+        for name in sorted(self._names):
+            self._names_by_initial.setdefault(name[0], []).append(name)
+        self._max_name_words = max(len(name.split()) for name in self._names)
+        self.resolve = lru_cache(maxsize=4096)(self._resolve)
+        self.route_info = lru_cache(maxsize=4096)(self._route_info)
+
+    def _resolve(self, text: Optional[str]) -> Optional[Airport]:
+        if not text or not text.strip():
+            return None
+
+        # Explicit IATA code, e.g. "DEL" or "Delhi (DEL)"
+        for code in _CODE_RE.findall(text):
+            if code in self.airports:
+                return self.airports[code]
+
+        normalized = _normalize(text)
+        if not normalized:
+            return None
+        if len(normalized) == 3 and normalized.upper() in self.airports:
+            return self.airports[normalized.upper()]
+
+        iata = self._names.get(normalized)
+        if iata:
+            return self.airports[iata]
+
+        # Known name inside a longer phrase, longest span first
+        words = normalized.split()
+        for size in range(min(len(words), self._max_name_words), 0, -1):
+            for start in range(len(words) - size + 1):
+                iata = self._names.get(' '.join(words[start:start + size]))
+                if iata:
+                    return self.airports[iata]
+
+        # Misspellings: "Banglore", "Hydrabad", "Kolkatta"
+        candidates = self._names_by_initial.get(normalized[0], [])
+        matches = difflib.get_close_matches(normalized, candidates, n=1, cutoff=self.fuzzy_cutoff)
+        if matches:
+            return self.airports[self._names[matches[0]]]
+        return None
+
+    def _route_info(self, departure: Optional[str], arrival: Optional[str]) -> Optional[Dict]:
+        origin = self.resolve(departure)
+        destination = self.resolve(arrival)
+        if origin is None or destination is None:
+            return None
+
+        distance = haversine_km(origin.latitude, origin.longitude, destination.latitude, destination.longitude)
+        return {
+            'departure_airport': origin.iata,
+            'arrival_airport': destination.iata,
+            'distance_km': round(distance),
+            'flight_duration_hours': estimate_block_hours(distance),
+            'is_international': origin.country != HOME_COUNTRY or destination.country != HOME_COUNTRY
+        }
+
+    def estimate_route(self, departure: Optional[str], arrival: Optional[str]) -> Optional[Dict]:
+        """
+        Estimate duration and international flag for a route
+
+        Args:
+            departure: Departure city/airport as extracted (e.g. "Delhi", "BOM")
+            arrival: Arrival city/airport
+
+        Returns:
+            Dictionary with departure_airport, arrival_airport, distance_km,
+            flight_duration_hours and is_international, or None if either
+            end cannot be resolved
+        """
+        info = self.route_info(departure, arrival)
+        return dict(info) if info else None
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_airport_index() -> AirportIndex:
+    """Return the shared airport index, loading the dataset on first use"""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = AirportIndex(os.getenv('AIRPORTS_FILE', DEFAULT_AIRPORTS_FILE))
+    return _index
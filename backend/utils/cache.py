@@ -0,0 +1,296 @@
+"""
+Result Cache - Content-addressed TTL/LRU cache for expensive agent calls
+In-process LRU tier with an optional SQLite tier that survives restarts
+"""
+
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from datetime import date
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+
+# Words whose meaning depends on the day the message was sent
+RELATIVE_DATE_PATTERN = re.compile(
+    r'(?<!\w)(?:today|tonight|yesterday|tomorrow|ago|day before|last (?:night|week|month)'
+    r'|this (?:morning|afternoon|evening|week)|monday|tuesday|wednesday|thursday|friday'
+    r'|saturday|sunday|aaj|kal|parso|parson|आज|कल|परसों)(?!\w)'
+)
+
+
+def make_cache_key(message: str, context: Optional[Dict] = None, version: Optional[str] = None,
+                   today: Optional[date] = None) -> str:
+    """
+    Build a content-addressed key from a message and its context
+
+    Messages are normalized (case-folded, whitespace collapsed) so that
+    retries and trivially re-typed messages map to the same entry. The
+    current year is part of every key (dates without a year are read as
+    this year) and the current date is added when the message has a
+    relative date such as "yesterday", so an extraction is never reused
+    on a day it would resolve differently.
+
+    Args:
+        message: Raw user message
+        context: Optional conversation context
+        version: Model and prompt version the result was produced with
+        today: Date to resolve relative dates against (defaults to today)
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    normalized = ' '.join(message.split()).casefold()
+    today = today or date.today()
+    payload = {'message': normalized, 'context': context or None, 'version': version, 'year': today.year}
+    if RELATIVE_DATE_PATTERN.search(normalized):
+        payload['date'] = today.isoformat()
+    encoded = json.dumps(payload, sort_keys=True, default=str)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+class MemoryCache:
+    """
+    Thread-safe in-process cache with TTL expiry and LRU eviction
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 3600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteCache:
+    """
+    Persistent cache tier backed by a local SQLite file
+
+    Values are stored as JSON. Entries past their TTL are ignored on read and
+    the least recently used rows are pruned once the table exceeds max_entries.
+    The connection is opened on first use in each process, so a cache built
+    in the gunicorn master is never shared by the workers forked from it.
+    """
+
+    def __init__(self, path: str, max_entries: int = 100000, ttl_seconds: float = 86400):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._conn = None
+        self._pid = None
+        self._inherited = []
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+    def _connection(self) -> sqlite3.Connection:
+        """This process's connection (call with self._lock held)"""
+        if self._pid != os.getpid():
+            if self._conn is not None:
+                # Opened before a fork: closing it here could release the
+                # parent's file locks, so it is kept open and never used
+                self._inherited.append(self._conn)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS result_cache ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " expires_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_result_cache_accessed_at"
+                " ON result_cache (accessed_at)"
+            )
+            conn.commit()
+            self._conn = conn
+            self._pid = os.getpid()
+        return self._conn
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute(
+                "SELECT value, expires_at FROM result_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            value, expires_at = row
+            if expires_at < now:
+                conn.execute("DELETE FROM result_cache WHERE key = ?", (key,))
+                conn.commit()
+                return None
+
+            conn.execute(
+                "UPDATE result_cache SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            conn.commit()
+
+        return json.loads(value)
+
+    def set(self, key: str, value: Any) -> None:
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO result_cache (key, value, expires_at, accessed_at)"
+                " VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value, default=str), now + self.ttl_seconds, now)
+            )
+            self._writes += 1
+
+            # Prune periodically rather than on every write
+            if self._writes % 100 == 0:
+                self._prune(conn, now)
+
+            conn.commit()
+
+    def _prune(self, conn: sqlite3.Connection, now: float) -> None:
+        conn.execute("DELETE FROM result_cache WHERE expires_at < ?", (now,))
+        conn.execute(
+            "DELETE FROM result_cache WHERE key IN ("
+            " SELECT key FROM result_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,)
+        )
+
+    def clear(self) -> None:
+        with self._lock:
+            conn = self._connection()
+            conn.execute("DELETE FROM result_cache")
+            conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection().execute("SELECT COUNT(*) FROM result_cache").fetchone()[0]
+
+
+class TieredCache:
+    """
+    Two-tier cache: in-process LRU in front of an optional persistent tier
+
+    Values are JSON round-tripped on the way in and out so callers can
+    freely mutate what they get back without corrupting cached entries.
+    """
+
+    def __init__(self, memory: MemoryCache, persistent: Optional[SQLiteCache] = None):
+        self.memory = memory
+        self.persistent = persistent
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_env(cls, prefix: str) -> 'TieredCache':
+        """
+        Build a cache from <PREFIX>_CACHE_* environment variables
+
+        Args:
+            prefix: Variable prefix, e.g. 'INTAKE'
+
+        Returns:
+            Configured TieredCache
+        """
+        ttl = float(os.getenv(f'{prefix}_CACHE_TTL', 3600))
+        memory = MemoryCache(
+            max_entries=int(os.getenv(f'{prefix}_CACHE_SIZE', 1024)),
+            ttl_seconds=ttl
+        )
+
+        persistent = None
+        db_path = os.getenv(f'{prefix}_CACHE_DB')
+        if db_path:
+            persistent = SQLiteCache(
+                db_path,
+                max_entries=int(os.getenv(f'{prefix}_CACHE_DB_SIZE', 100000)),
+                ttl_seconds=ttl
+            )
+
+        return cls(memory, persistent)
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self.memory.get(key)
+        if value is not None:
+            self._count('hits')
+            return json.loads(value)
+
+        if self.persistent is not None:
+            stored = self.persistent.get(key)
+            if stored is not None:
+                self.memory.set(key, json.dumps(stored, default=str))
+                self._count('hits')
+                self._count('persistent_hits')
+                return stored
+
+        self._count('misses')
+        return None
+
+    def set(self, key: str, value: Any) -> None:
+        self.memory.set(key, json.dumps(value, default=str))
+        if self.persistent is not None:
+            self.persistent.set(key, value)
+
+    def clear(self) -> None:
+        self.memory.clear()
+        if self.persistent is not None:
+            self.persistent.clear()
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def stats(self) -> Dict:
+        """Return hit/miss counters and tier sizes"""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'persistent_hits': self.persistent_hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            'memory_entries': len(self.memory),
+            'memory_evictions': self.memory.evictions,
+            'persistent_enabled': self.persistent is not None
+        }
@@ -0,0 +1,55 @@
+"""
+Claim Documents - Claim letter text and airline submission email
+Shared by the API endpoints and the background claim jobs
+"""
+
+from backend.utils.airline_registry import get_airline_registry
+from backend.utils.templates import get_template_renderer
+
+
+# Recipient shown when no nodal officer email is on file for the airline
+UNKNOWN_AIRLINE_EMAIL = 'unknown@airline.com'
+
+
+def build_claim_letter(data: dict) -> str:
+    """
+    Build the DGCA claim letter text
+
+    Args:
+        data: Passenger, flight and compensation fields (see /api/claim/generate);
+              optional airline_code and language select a letter variant;
+              airline_name defaults to the registry name for airline_code
+
+    Returns:
+        Claim letter text
+    """
+    if not data.get('airline_name') and data.get('airline_code'):
+        data = dict(data, airline_name=get_airline_registry().name_for(data['airline_code']))
+    return get_template_renderer().render(
+        'claim_letter.txt',
+        data,
+        airline=data.get('airline_code'),
+        language=data.get('language')
+    )
+
+
+def prepare_submission(data: dict) -> dict:
+    """
+    Prepare the airline email for a generated claim letter
+
+    Args:
+        data: claim_letter, airline_code, passenger_email and claim_reference
+
+    Returns:
+        Dictionary with recipient, subject and body
+    """
+    airline_email = get_airline_registry().email_for(data.get('airline_code')) or UNKNOWN_AIRLINE_EMAIL
+
+    return {
+        'airline_email': airline_email,
+        'cc_email': data.get('passenger_email'),
+        'subject': f"Flight Compensation Claim - {data.get('claim_reference', 'DGCA CAR Section 3')}",
+        'body': data.get('claim_letter', ''),
+        'ready_to_send': True,
+        'agent': 'submission_agent'
+    }
@@ -0,0 +1,206 @@
+"""
+Claim Export - Streaming NDJSON/CSV export of claims and claim activities
+Rows are read in id order through a server-side cursor (yield_per) and
+written out one fetched batch at a time, so memory stays flat whatever the
+table size and an interrupted export resumes from the last id received
+"""
+
+import io
+import csv
+import json
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterator, List, Mapping, Optional
+
+from sqlalchemy import DateTime, Enum as SQLEnum, select
+
+from backend.database.models import Claim, ClaimActivity, ClaimStatus
+
+
+EXPORT_TABLES = {
+    'claims': Claim.__table__,
+    'claim_activities': ClaimActivity.__table__
+}
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv'
+}
+
+# Query parameters that are not filters
+EXPORT_OPTIONS = ('format', 'after_id', 'limit')
+
+
+def _day(value: str) -> datetime:
+    try:
+        return datetime.strptime(value, '%Y-%m-%d')
+    except ValueError:
+        raise ValueError(f'{value!r} is not a YYYY-MM-DD date')
+
+
+def _statuses(value: str):
+    return [ClaimStatus(status.strip()) for status in value.split(',') if status.strip()]
+
+
+# Filter name -> clause builder; dates are inclusive days, status takes a comma list
+EXPORT_FILTERS = {
+    'claims': {
+        'status': lambda v: Claim.status.in_(_statuses(v)),
+        'airline': lambda v: Claim.airline_name == v.strip(),
+        'user_id': lambda v: Claim.user_id == int(v),
+        'flight_date_from': lambda v: Claim.flight_date >= _day(v),
+        'flight_date_to': lambda v: Claim.flight_date < _day(v) + timedelta(days=1),
+        'created_from': lambda v: Claim.created_at >= _day(v),
+        'created_to': lambda v: Claim.created_at < _day(v) + timedelta(days=1)
+    },
+    'claim_activities': {
+        'claim_id': lambda v: ClaimActivity.claim_id == int(v),
+        'activity_type': lambda v: ClaimActivity.activity_type == v,
+        'created_from': lambda v: ClaimActivity.created_at >= _day(v),
+        'created_to': lambda v: ClaimActivity.created_at < _day(v) + timedelta(days=1)
+    }
+}
+
+
+def _converter(column) -> Optional[Callable]:
+    """Turn a column value into its JSON/CSV form (None when it already is one)"""
+    if isinstance(column.type, SQLEnum):
+        return lambda value: value.value if value is not None else None
+    if isinstance(column.type, DateTime):
+        return lambda value: value.isoformat() if value is not None else None
+    return None
+
+
+class TableExport:
+    """
+    One export of a table, ordered by id
+
+    Resuming is keyset based: after_id=N continues with the row after id N,
+    so a client that kept the id of the last row it received picks up
+    exactly where it stopped, without the database skipping over an
+    OFFSET. Every row carries its id (the first CSV column).
+    """
+
+    def __init__(
+        self,
+        table: str,
+        filters: Optional[Mapping[str, str]] = None,
+        after_id: Optional[int] = None,
+        limit: Optional[int] = None,
+        batch_size: int = 2000,
+        session_factory: Optional[Callable] = None
+    ):
+        """
+        Args:
+            table: Table name (a key of EXPORT_TABLES)
+            filters: Filter name -> value (see EXPORT_FILTERS)
+            after_id: Export rows with a greater id
+            limit: Stop after this many rows
+            batch_size: Rows fetched, and written out, per round trip
+            session_factory: Session factory (defaults to SessionLocal)
+
+        Raises:
+            ValueError: Unknown table or filter, or a malformed filter value
+        """
+        if table not in EXPORT_TABLES:
+            raise ValueError(f"Unknown export table {table!r} (known: {', '.join(EXPORT_TABLES)})")
+        if session_factory is None:
+            from backend.database.db_session import SessionLocal
+            session_factory = SessionLocal
+
+        self.table = EXPORT_TABLES[table]
+        self.name = table
+        self.after_id = after_id
+        self.limit = limit
+        self.batch_size = batch_size
+        self.session_factory = session_factory
+        self.columns = [column.name for column in self.table.columns]
+        self.clauses = self._parse_filters(filters or {})
+
+        self._converters = [
+            (position, convert)
+            for position, convert in ((i, _converter(c)) for i, c in enumerate(self.table.columns))
+            if convert is not None
+        ]
+        self.rows_exported = 0
+        self.last_id = after_id
+
+    @classmethod
+    def from_params(cls, table: str, params: Mapping[str, str], **kwargs) -> 'TableExport':
+        """Build an export from query parameters (after_id, limit and filters)"""
+        try:
+            after_id = int(params['after_id']) if params.get('after_id') else None
+            limit = int(params['limit']) if params.get('limit') else None
+        except ValueError:
+            raise ValueError('after_id and limit must be integers')
+        if limit is not None and limit < 1:
+            raise ValueError('limit must be positive')
+
+        filters = {key: value for key, value in params.items() if key not in EXPORT_OPTIONS}
+        return cls(table, filters=filters, after_id=after_id, limit=limit, **kwargs)
+
+    def _parse_filters(self, filters: Mapping[str, str]) -> List:
+        known = EXPORT_FILTERS[self.name]
+        clauses = []
+        for key, value in filters.items():
+            if key not in known:
+                raise ValueError(f"Unknown filter {key!r} for {self.name} (known: {', '.join(known)})")
+            try:
+                clauses.append(known[key](value))
+            except ValueError as e:
+                raise ValueError(f'Invalid {key}: {e}')
+        return clauses
+
+    def statement(self):
+        id_column = self.table.c.id
+        query = select(self.table).where(*self.clauses).order_by(id_column)
+        if self.after_id is not None:
+            query = query.where(id_column > self.after_id)
+        if self.limit is not None:
+            query = query.limit(self.limit)
+        return query
+
+    def batches(self) -> Iterator[List[list]]:
+        """Yield lists of up to batch_size rows, values converted for output"""
+        session = self.session_factory()
+        try:
+            result = session.execute(self.statement(), execution_options={'yield_per': self.batch_size})
+            for partition in result.partitions():
+                rows = [list(row) for row in partition]
+                for position, convert in self._converters:
+                    for row in rows:
+                        row[position] = convert(row[position])
+                self.rows_exported += len(rows)
+                self.last_id = rows[-1][0]
+                yield rows
+        finally:
+            session.close()
+
+    def ndjson(self) -> Iterator[str]:
+        columns = self.columns
+        encode = json.JSONEncoder(ensure_ascii=False).encode
+        for rows in self.batches():
+            yield ''.join(encode(dict(zip(columns, row))) + '\n' for row in rows)
+
+    def csv(self, header: bool = True) -> Iterator[str]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator='\n')
+        if header:
+            writer.writerow(self.columns)
+        for rows in self.batches():
+            writer.writerows(rows)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()  # Header of an empty export
+
+    def stream(self, fmt: str, **kwargs) -> Iterator[str]:
+        """Chunks of the export in fmt (a key of EXPORT_FORMATS)"""
+        if fmt == 'ndjson':
+            return self.ndjson()
+        if fmt == 'csv':
+            return self.csv(**kwargs)
+        raise ValueError(f"Unknown export format {fmt!r} (known: {', '.join(EXPORT_FORMATS)})")
+
+    def stats(self) -> Dict:
+        return {'table': self.name, 'rows_exported': self.rows_exported, 'last_id': self.last_id}
@@ -0,0 +1,325 @@
+"""
+Claim Import - Bulk claim import from JSON lines or CSV
+Rows are parsed and validated one at a time as the upload streams in and
+valid rows are inserted in batched multi-row INSERTs. Claim ids are
+reserved before the insert, so each claim is written once with its final
+claim_reference
+"""
+
+import io
+import os
+import csv
+import json
+import time
+from datetime import datetime
+from typing import Callable, Dict, IO, Iterator, List, Optional, Tuple
+
+from sqlalchemy import false, func, select, text, update
+
+from backend.database.models import (
+    Claim, ClaimStatus, DisruptionType, User, generate_claim_reference, parse_flight_number
+)
+from backend.utils.airline_registry import get_airline_registry
+
+
+IMPORT_FORMATS = {
+    'ndjson': ('application/x-ndjson', 'application/jsonl', 'application/json'),
+    'csv': ('text/csv',)
+}
+
+REQUIRED_FIELDS = ('user_id', 'flight_number', 'flight_date', 'reason')
+
+
+def parse_flight_date(value: str) -> datetime:
+    """Parse an ISO 8601 timestamp or a YYYY-MM-DD date"""
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        pass
+    try:
+        return datetime.strptime(value, '%Y-%m-%d')
+    except ValueError:
+        raise ValueError(f'Invalid flight_date: {value!r}')
+
+
+def disruption_type_for(reason: str) -> DisruptionType:
+    """Map a free-text reason to a disruption type (simplified)"""
+    reason = reason.lower()
+    if 'cancel' in reason:
+        return DisruptionType.CANCELLATION
+    if 'denied' in reason:
+        return DisruptionType.DENIED_BOARDING
+    return DisruptionType.DELAY
+
+
+def claim_values(data: Dict) -> Dict:
+    """
+    Validate a submitted claim and return its Claim column values
+
+    Args:
+        data: Claim fields as submitted (user_id, flight_number, flight_date,
+              reason; optionally airline_name, delay_hours, route_from, route_to)
+
+    Returns:
+        Column values, without claim_reference and status
+
+    Raises:
+        ValueError: Missing or malformed field
+    """
+    for field in REQUIRED_FIELDS:
+        if data.get(field) in (None, ''):
+            raise ValueError(f'Missing field: {field}')
+
+    # Airline name defaults to the registry entry for the flight's airline code
+    flight_number = str(data['flight_number']).strip()
+    airline_code, _ = parse_flight_number(flight_number)
+    airline = get_airline_registry().get(airline_code)
+    airline_name = data.get('airline_name') or (airline.name if airline else None)
+    if not airline_name:
+        raise ValueError('Missing field: airline_name')
+
+    try:
+        user_id = int(data['user_id'])
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid user_id: {data['user_id']!r}")
+    delay_hours = data.get('delay_hours')
+    if delay_hours in ('', None):
+        delay_hours = None
+    else:
+        try:
+            delay_hours = float(delay_hours)
+        except (TypeError, ValueError):
+            raise ValueError(f'Invalid delay_hours: {delay_hours!r}')
+
+    return {
+        'user_id': user_id,
+        'flight_number': flight_number,
+        'airline_code': airline.code if airline else airline_code,
+        'airline_name': airline_name,
+        'flight_date': parse_flight_date(str(data['flight_date'])),
+        'disruption_type': disruption_type_for(str(data['reason'])),
+        'delay_hours': delay_hours,
+        'route_from': data.get('route_from') or None,
+        'route_to': data.get('route_to') or None
+    }
+
+
+def reserve_claim_ids(session, count: int) -> List[int]:
+    """
+    Reserve count claim ids inside the session's transaction
+
+    Postgres draws them from the claims id sequence in one query. Elsewhere
+    the claims table is write-locked first (SQLite: a no-op UPDATE takes the
+    database write lock; MySQL: MAX ... FOR UPDATE), so the ids following
+    the current maximum stay free until the transaction commits.
+    """
+    dialect = session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        return list(session.execute(
+            text("SELECT nextval(pg_get_serial_sequence('claims', 'id')) FROM generate_series(1, :count)"),
+            {'count': count}
+        ).scalars())
+
+    if dialect == 'sqlite':
+        session.execute(update(Claim).where(false()).values(id=Claim.id),
+                        execution_options={'synchronize_session': False})
+    start = session.execute(select(func.max(Claim.id)).with_for_update()).scalar() or 0
+    return list(range(start + 1, start + count + 1))
+
+
+class ClaimImporter:
+    """
+    Streaming bulk import
+
+    The upload is read row by row, never held whole. Invalid rows are
+    reported by row number (the first data row is 1) and skipped; valid
+    rows are inserted batch_size at a time, each batch committed together
+    with the eligibility jobs for its claims, so a batch is imported
+    entirely or not at all. A batch that fails to commit stops the import:
+    the report still lists the claims already committed and names the
+    failed batch's rows, which a retry should start from. Jobs get a lower
+    priority than claims filed one by one, keeping interactive claims ahead
+    of a large import.
+    """
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable] = None,
+        batch_size: int = 1000,
+        max_rows: int = 100000,
+        max_errors: int = 1000,
+        priority: int = -10,
+        enqueue_jobs: bool = True,
+        queue=None
+    ):
+        """
+        Args:
+            session_factory: Session factory (defaults to SessionLocal)
+            batch_size: Claims per INSERT and transaction
+            max_rows: Rows read per import; later rows are not read
+            max_errors: Row errors listed in the report (all are counted)
+            priority: Priority of the claims' processing jobs
+            enqueue_jobs: Queue eligibility checks for the imported claims
+            queue: Job queue (defaults to the shared queue)
+        """
+        if session_factory is None:
+            from backend.database.db_session import SessionLocal
+            session_factory = SessionLocal
+
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.max_rows = max_rows
+        self.max_errors = max_errors
+        self.priority = priority
+        self.enqueue_jobs = enqueue_jobs
+        self.queue = queue
+
+    @classmethod
+    def from_env(cls) -> 'ClaimImporter':
+        return cls(
+            batch_size=int(os.getenv('BULK_IMPORT_BATCH_SIZE', 1000)),
+            max_rows=int(os.getenv('BULK_IMPORT_MAX_ROWS', 100000)),
+            priority=int(os.getenv('BULK_IMPORT_PRIORITY', -10))
+        )
+
+    def records(self, stream: IO[bytes], fmt: str) -> Iterator[Tuple[int, object]]:
+        """
+        Yield (row number, claim fields) from an upload; a row that cannot
+        be parsed is yielded as a ValueError instead of fields
+        """
+        lines = io.TextIOWrapper(io.BufferedReader(stream), encoding='utf-8-sig', newline='')
+        if fmt == 'csv':
+            reader = csv.DictReader(lines)
+            for row, record in enumerate(reader, 1):
+                if None in record:
+                    yield row, ValueError(f'Expected {len(reader.fieldnames)} columns, got more')
+                else:
+                    yield row, record
+            return
+
+        row = 0
+        for line in lines:
+            if not line.strip():
+                continue
+            row += 1
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield row, ValueError(f'Invalid JSON: {e}')
+                continue
+            yield row, record if isinstance(record, dict) else ValueError('Expected a JSON object')
+
+    def run(self, stream: IO[bytes], fmt: str = 'ndjson', dry_run: bool = False) -> Dict:
+        """
+        Import claims from an upload
+
+        Args:
+            stream: Binary upload stream
+            fmt: 'ndjson' (one JSON object per line) or 'csv' (with a header row)
+            dry_run: Validate only; nothing is written
+
+        Returns:
+            Report with counts, the imported claims' references by row, and
+            row errors; when a batch failed, 'stopped' holds its first and
+            last row and the error, and later rows were not read
+        """
+        started = time.perf_counter()
+        report = {'rows': 0, 'imported': 0, 'failed': 0, 'jobs_enqueued': 0,
+                  'claims': [], 'errors': [], 'dry_run': dry_run}
+        known_users = set()
+        batch = []
+
+        session = self.session_factory()
+        try:
+            try:
+                for row, record in self.records(stream, fmt):
+                    if row > self.max_rows:
+                        self._error(report, row, f'Row limit of {self.max_rows} reached; the rest was not read')
+                        break
+                    report['rows'] = row
+                    if isinstance(record, ValueError):
+                        self._error(report, row, str(record))
+                        continue
+                    try:
+                        batch.append((row, claim_values(record)))
+                    except ValueError as e:
+                        self._error(report, row, str(e))
+                        continue
+                    if len(batch) >= self.batch_size:
+                        flushed = self._flush(session, batch, known_users, report, dry_run)
+                        batch = []
+                        if not flushed:
+                            break
+            except (UnicodeDecodeError, csv.Error) as e:
+                self._error(report, report['rows'] + 1, f'Unreadable upload, import stopped: {e}')
+            self._flush(session, batch, known_users, report, dry_run)
+        finally:
+            session.close()
+
+        report['errors'].sort(key=lambda error: error['row'])  # Unknown users are found per batch
+        report['elapsed_ms'] = round((time.perf_counter() - started) * 1000, 1)
+        return report
+
+    def _error(self, report: Dict, row: int, error: str):
+        report['failed'] += 1
+        if len(report['errors']) < self.max_errors:
+            report['errors'].append({'row': row, 'error': error})
+
+    def _flush(self, session, batch: List[Tuple[int, Dict]], known_users: set, report: Dict,
+               dry_run: bool) -> bool:
+        """
+        Insert one batch of validated rows in a single transaction
+
+        Returns:
+            False if the batch failed (recorded in report['stopped'])
+        """
+        if not batch:
+            return True
+
+        try:
+            # Rows for users that do not exist fail here rather than breaking the INSERT
+            unseen = {values['user_id'] for _, values in batch} - known_users
+            if unseen:
+                known_users.update(session.execute(select(User.id).where(User.id.in_(unseen))).scalars())
+            valid = []
+            for row, values in batch:
+                if values['user_id'] in known_users:
+                    valid.append((row, values))
+                else:
+                    self._error(report, row, f"Unknown user_id: {values['user_id']}")
+            if dry_run:
+                report['imported'] += len(valid)  # Would be imported
+                return True
+            if not valid:
+                return True
+
+            ids = reserve_claim_ids(session, len(valid))
+            now = datetime.utcnow()
+            rows = []
+            for claim_id, (_, values) in zip(ids, valid):
+                values['id'] = claim_id
+                values['claim_reference'] = generate_claim_reference(claim_id, values['flight_number'])
+                values['status'] = ClaimStatus.INITIATED
+                values['created_at'] = now
+                values['updated_at'] = now
+                rows.append(values)
+            session.execute(Claim.__table__.insert(), rows)
+
+            if self.enqueue_jobs:
+                from backend.utils.claim_jobs import enqueue_claims_processing
+                report['jobs_enqueued'] += enqueue_claims_processing(
+                    ids, session=session, priority=self.priority, queue=self.queue
+                )
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            print(f"Bulk import stopped at rows {batch[0][0]}-{batch[-1][0]}: {e}")
+            report['stopped'] = {'first_row': batch[0][0], 'last_row': batch[-1][0], 'error': str(e)}
+            return False
+
+        report['imported'] += len(rows)
+        report['claims'].extend(
+            {'row': row, 'id': values['id'], 'claim_reference': values['claim_reference']}
+            for (row, _), values in zip(valid, rows)
+        )
+        return True
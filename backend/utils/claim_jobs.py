@@ -0,0 +1,310 @@
+"""
+Claim Jobs - Background steps that move a claim through ClaimStatus
+initiated -> eligibility_checked -> document_generated -> submitted_to_airline,
+one job per step; each step commits the status change together with the
+job for the next step
+"""
+
+import os
+import json
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from backend.database.models import Claim, ClaimActivity, ClaimStatus
+from backend.utils.job_queue import JobQueue, PermanentJobError, get_job_queue
+from backend.utils.airline_registry import get_airline_registry
+from backend.utils.claim_documents import build_claim_letter, prepare_submission
+from backend.utils.mailer import MailError, SmtpMailer
+
+
+CLAIM_ELIGIBILITY = 'claim.eligibility'
+CLAIM_LETTER = 'claim.letter'
+CLAIM_SUBMIT = 'claim.submit'
+
+# ClaimActivity recorded before the airline email is sent
+SUBMISSION_STARTED = 'submission_started'
+
+
+def enqueue_claim_processing(claim_id: int, session=None, priority: int = 0,
+                             queue: Optional[JobQueue] = None) -> int:
+    """
+    Queue the first processing step for a new claim
+
+    Args:
+        claim_id: Claim to process
+        session: Enqueue inside this session's transaction (commit is the caller's)
+        priority: Job priority, inherited by the later steps
+
+    Returns:
+        Job id
+    """
+    queue = queue or get_job_queue()
+    return queue.enqueue(CLAIM_ELIGIBILITY, {'claim_id': claim_id}, priority=priority,
+                         claim_id=claim_id, session=session)
+
+
+def enqueue_claims_processing(claim_ids: List[int], session=None, priority: int = 0,
+                              queue: Optional[JobQueue] = None) -> int:
+    """Queue the first processing step for many new claims in one INSERT"""
+    queue = queue or get_job_queue()
+    return queue.enqueue_many(CLAIM_ELIGIBILITY, [{'claim_id': claim_id} for claim_id in claim_ids],
+                              priority=priority, claim_ids=claim_ids, session=session)
+
+
+class ClaimProcessor:
+    """
+    Job handlers for the claim lifecycle
+
+    A step only acts on a claim in the status it expects, so re-running a
+    job (after a lost lease or a retry) is a no-op once the step has
+    committed. Ineligible claims stop after the eligibility check.
+    Submission emails the airline when email submission is enabled and SMTP
+    is configured; otherwise the claim stays at document_generated and the
+    prepared email is logged for n8n to send.
+    """
+
+    def __init__(
+        self,
+        queue: Optional[JobQueue] = None,
+        session_factory: Optional[Callable] = None,
+        mailer: Optional[SmtpMailer] = None,
+        email_submission: bool = True,
+        pdf_letters: bool = True,
+        response_days: int = 30
+    ):
+        """
+        Args:
+            queue: Queue for follow-up steps (defaults to the shared queue)
+            session_factory: Session factory (defaults to SessionLocal)
+            mailer: SMTP mailer for submissions
+            email_submission: Email claims to airlines (ENABLE_EMAIL_SUBMISSION)
+            pdf_letters: Render the letter as a PDF (ENABLE_PDF_GENERATION)
+            response_days: Days the airline has to respond (sets the deadline)
+        """
+        if session_factory is None:
+            from backend.database.db_session import SessionLocal
+            session_factory = SessionLocal
+
+        self.queue = queue or get_job_queue()
+        self.session_factory = session_factory
+        self.mailer = mailer
+        self.email_submission = email_submission
+        self.pdf_letters = pdf_letters
+        self.response_days = response_days
+
+    @classmethod
+    def from_env(cls, **kwargs) -> 'ClaimProcessor':
+        return cls(
+            mailer=SmtpMailer.from_env(),
+            email_submission=os.getenv('ENABLE_EMAIL_SUBMISSION', 'True') == 'True',
+            pdf_letters=os.getenv('ENABLE_PDF_GENERATION', 'True') == 'True',
+            response_days=int(os.getenv('AIRLINE_RESPONSE_DAYS', 30)),
+            **kwargs
+        )
+
+    def handlers(self) -> Dict[str, Callable[[Dict, Dict], None]]:
+        return {
+            CLAIM_ELIGIBILITY: self.check_eligibility,
+            CLAIM_LETTER: self.generate_letter,
+            CLAIM_SUBMIT: self.submit
+        }
+
+    def _load(self, session, payload: Dict, expected: ClaimStatus) -> Optional[Claim]:
+        claim = session.get(Claim, payload['claim_id'])
+        if claim is None:
+            raise PermanentJobError(f"claim {payload['claim_id']} does not exist")
+        if claim.status != expected:
+            return None  # Already past this step
+        return claim
+
+    def _advance(self, session, claim: Claim, status: ClaimStatus, description: str,
+                 metadata: Optional[Dict] = None, activity_type: str = 'status_change'):
+        previous = claim.status
+        claim.status = status
+        session.add(ClaimActivity(
+            claim_id=claim.id,
+            activity_type=activity_type,
+            description=description,
+            performed_by='system',
+            activity_metadata=json.dumps(dict(metadata or {}, **{'from': previous.value, 'to': status.value}))
+        ))
+
+    def check_eligibility(self, payload: Dict, job: Dict):
+        from backend.agents.registry import get_eligibility_agent
+
+        with self.session_factory() as session:
+            claim = self._load(session, payload, ClaimStatus.INITIATED)
+            if claim is None:
+                return
+
+            result = get_eligibility_agent().check_eligibility({
+                'flight_number': claim.flight_number,
+                'flight_date': claim.flight_date.strftime('%Y-%m-%d') if claim.flight_date else None,
+                'departure': claim.route_from,
+                'arrival': claim.route_to,
+                'flight_duration_hours': claim.flight_duration_hours,
+                'delay_hours': claim.delay_hours,
+                'disruption_type': claim.disruption_type.value,
+                'exemption_reason': claim.exemption_reason,
+                'cancellation_notice_days': claim.cancellation_notice_days
+            })
+            claim.is_eligible = result['eligible']
+            claim.compensation_amount = result['compensation_amount']
+            claim.calculation_reason = result['reason']
+            claim.exemption_applied = result['exemption_applied']
+            claim.rules_version = result['rules_version']
+            claim.flight_duration_hours = result['flight_duration_hours']
+            claim.is_international = result['is_international']
+
+            self._advance(session, claim, ClaimStatus.ELIGIBILITY_CHECKED, result['reason'], {
+                'eligible': result['eligible'],
+                'compensation_amount': result['compensation_amount']
+            })
+            if result['eligible']:
+                self.queue.enqueue(CLAIM_LETTER, payload, priority=job['priority'],
+                                   claim_id=claim.id, session=session)
+            session.commit()
+
+    def _letter_text(self, claim: Claim) -> str:
+        user = claim.user
+        return build_claim_letter({
+            'passenger_name': user.name or 'Passenger',
+            'passenger_email': user.email or 'N/A',
+            'passenger_phone': user.phone_number or 'N/A',
+            'pnr': 'N/A',
+            'flight_number': claim.flight_number,
+            'flight_date': claim.flight_date.strftime('%Y-%m-%d') if claim.flight_date else 'N/A',
+            'route_from': claim.route_from or 'N/A',
+            'route_to': claim.route_to or 'N/A',
+            'airline_name': claim.airline_name,
+            'airline_code': claim.airline_code,
+            'delay_hours': claim.delay_hours or 0,
+            'disruption_type': claim.disruption_type.value,
+            'compensation_amount': claim.compensation_amount or 0,
+            'claim_reference': claim.claim_reference,
+            'date': (claim.created_at or datetime.utcnow()).strftime('%Y-%m-%d')
+        })
+
+    def _store_letter_pdf(self, claim: Claim, letter: str) -> str:
+        """Render the letter and keep a copy outside the PDF cache; returns the cache key"""
+        from backend.utils.pdf_letters import get_pdf_cache
+
+        pdf_cache = get_pdf_cache()
+        pdf_file, cache_key = pdf_cache.open(letter, title=f"Compensation Claim {claim.claim_reference}")
+        with pdf_file:
+            claim.claim_letter_path = pdf_cache.store(pdf_file, claim.claim_reference)
+        return cache_key
+
+    def generate_letter(self, payload: Dict, job: Dict):
+        with self.session_factory() as session:
+            claim = self._load(session, payload, ClaimStatus.ELIGIBILITY_CHECKED)
+            if claim is None:
+                return
+
+            letter = self._letter_text(claim)
+            metadata = {'characters': len(letter)}
+            if self.pdf_letters:
+                metadata['pdf'] = self._store_letter_pdf(claim, letter)
+
+            self._advance(session, claim, ClaimStatus.DOCUMENT_GENERATED, 'Claim letter generated', metadata)
+            self.queue.enqueue(CLAIM_SUBMIT, payload, priority=job['priority'],
+                               claim_id=claim.id, session=session)
+            session.commit()
+
+    def submit(self, payload: Dict, job: Dict):
+        with self.session_factory() as session:
+            claim = self._load(session, payload, ClaimStatus.DOCUMENT_GENERATED)
+            if claim is None:
+                return
+
+            if not get_airline_registry().email_for(claim.airline_code):
+                raise PermanentJobError(f"no nodal officer email on file for airline {claim.airline_code!r}")
+            submission = prepare_submission({
+                'claim_letter': self._letter_text(claim),
+                'airline_code': claim.airline_code,
+                'passenger_email': claim.user.email,
+                'claim_reference': claim.claim_reference
+            })
+
+            if not (self.email_submission and self.mailer and self.mailer.configured):
+                session.add(ClaimActivity(
+                    claim_id=claim.id,
+                    activity_type='submission_prepared',
+                    description=f"Email to {submission['airline_email']} prepared (email submission not enabled)",
+                    activity_metadata=json.dumps({'to': submission['airline_email'], 'subject': submission['subject']})
+                ))
+                session.commit()
+                return
+
+            # An email that may already have left is never sent again: the
+            # marker is committed before sending and only removed when the
+            # send certainly failed, so a retry after a failed commit or an
+            # expired lease finds it and skips straight to the status change
+            message_id = self.mailer.message_id_for(claim.claim_reference)
+            marker = self._submission_marker(session, claim)
+            if marker is None:
+                if self.pdf_letters and claim.claim_letter_path and not os.path.exists(claim.claim_letter_path):
+                    # Claims from before letters were stored point into the PDF cache
+                    self._store_letter_pdf(claim, self._letter_text(claim))
+                marker = ClaimActivity(
+                    claim_id=claim.id,
+                    activity_type=SUBMISSION_STARTED,
+                    description=f"Sending claim email to {submission['airline_email']}",
+                    activity_metadata=json.dumps({'to': submission['airline_email'], 'message_id': message_id})
+                )
+                session.add(marker)
+                session.commit()
+
+                try:
+                    self.mailer.send(
+                        submission['airline_email'],
+                        submission['subject'],
+                        submission['body'],
+                        cc=submission['cc_email'],
+                        attachment_path=claim.claim_letter_path,
+                        message_id=message_id
+                    )
+                except MailError as e:
+                    session.delete(marker)
+                    session.commit()
+                    if e.retryable:
+                        raise
+                    raise PermanentJobError(str(e))
+                description = f"Claim emailed to {submission['airline_email']}"
+            else:
+                description = (f"Claim email to {submission['airline_email']} was started by an earlier "
+                               f"attempt; not sent again")
+
+            session.refresh(claim)
+            if claim.status != ClaimStatus.DOCUMENT_GENERATED:
+                return  # Another worker finished the submission meanwhile
+
+            now = datetime.utcnow()
+            claim.submitted_to_email = submission['airline_email']
+            claim.submitted_at = now
+            claim.airline_response_deadline = now + timedelta(days=self.response_days)
+            self._advance(session, claim, ClaimStatus.SUBMITTED_TO_AIRLINE, description,
+                          {'message_id': message_id}, activity_type='email_sent')
+            session.commit()
+
+    def _submission_marker(self, session, claim: Claim) -> Optional[ClaimActivity]:
+        return (
+            session.query(ClaimActivity)
+            .filter(ClaimActivity.claim_id == claim.id, ClaimActivity.activity_type == SUBMISSION_STARTED)
+            .first()
+        )
+
+
+_processor = None
+_processor_lock = threading.Lock()
+
+
+def get_claim_processor() -> ClaimProcessor:
+    """Return the shared claim processor configured from the environment"""
+    global _processor
+    if _processor is None:
+        with _processor_lock:
+            if _processor is None:
+                _processor = ClaimProcessor.from_env()
+    return _processor
@@ -0,0 +1,235 @@
+"""
+Conversation Store - Per-phone WhatsApp conversation state with TTL expiry
+Keeps the partially extracted claim between messages in an in-process tier
+backed by the whatsapp_conversations table
+"""
+
+import os
+import json
+import copy
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import func
+
+from backend.database.models import WhatsAppConversation
+from backend.utils.cache import MemoryCache
+
+
+# Extracted fields carried from one message to the next
+CONVERSATION_FIELDS = [
+    'flight_number', 'airline_name', 'flight_date', 'departure', 'arrival',
+    'disruption_type', 'delay_hours', 'passenger_name', 'flight_duration_hours'
+]
+
+
+def merge_fields(known: Dict, update: Dict) -> Dict:
+    """
+    Merge newly extracted fields into what is already known
+
+    Non-null values in update win (the user may correct a field); nulls
+    never erase a known value.
+    """
+    merged = {field: known.get(field) for field in CONVERSATION_FIELDS}
+    for field in CONVERSATION_FIELDS:
+        if update.get(field) not in (None, ''):
+            merged[field] = update[field]
+    return merged
+
+
+def compact_summary(fields: Dict, pending: List[str]) -> Dict:
+    """Minimal context for the LLM: known non-null fields and what was asked"""
+    summary = {'known': {field: value for field, value in fields.items() if value not in (None, '')}}
+    if pending:
+        summary['asked_for'] = list(pending)
+    return summary
+
+
+class ConversationStore:
+    """
+    Two-tier store of in-progress conversations keyed by phone number
+
+    The database row is authoritative and lasts for ttl_seconds of
+    inactivity. Every save bumps the row's version; the in-process tier
+    keeps the last conversation this worker read or wrote with its version,
+    and a read only uses it after checking that the row still has that
+    version. A save or clear from another worker is therefore seen on the
+    next message, and the in-process copy only saves decoding the row.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = 1800,
+        memory_ttl_seconds: float = 60,
+        max_memory_entries: int = 10000,
+        session_factory: Optional[Callable] = None
+    ):
+        if session_factory is None:
+            from backend.database.db_session import SessionLocal
+            session_factory = SessionLocal
+
+        self.ttl_seconds = ttl_seconds
+        self.session_factory = session_factory
+        self.memory = MemoryCache(max_entries=max_memory_entries, ttl_seconds=min(memory_ttl_seconds, ttl_seconds))
+        self._lock = threading.Lock()
+        self._counters = {'memory_hits': 0, 'db_hits': 0, 'misses': 0, 'saves': 0, 'cleared': 0}
+
+    @classmethod
+    def from_env(cls) -> 'ConversationStore':
+        return cls(
+            ttl_seconds=float(os.getenv('WHATSAPP_CONVERSATION_TTL', 1800)),
+            memory_ttl_seconds=float(os.getenv('WHATSAPP_CONVERSATION_MEMORY_TTL', 60)),
+            max_memory_entries=int(os.getenv('WHATSAPP_CONVERSATION_MEMORY_SIZE', 10000))
+        )
+
+    def get(self, phone_number: str) -> Optional[Dict]:
+        """
+        Return the active conversation for a phone number
+
+        Returns:
+            {'state', 'fields', 'pending', 'turns'} or None if there is no
+            conversation or it has expired
+        """
+        session = self.session_factory()
+        try:
+            current = (
+                session.query(WhatsAppConversation.version, WhatsAppConversation.expires_at)
+                .filter(WhatsAppConversation.phone_number == phone_number)
+                .first()
+            )
+            if current is None or (current.expires_at and current.expires_at <= datetime.utcnow()):
+                self.memory.delete(phone_number)  # Cleared or expired, possibly by another worker
+                self._count('misses')
+                return None
+
+            cached = self.memory.get(phone_number)
+            if cached is not None and cached['version'] == current.version:
+                self._count('memory_hits')
+                return copy.deepcopy(cached['conversation'])
+
+            row = (
+                session.query(WhatsAppConversation)
+                .filter(WhatsAppConversation.phone_number == phone_number)
+                .first()
+            )
+            if row is None:
+                self._count('misses')
+                return None
+            conversation = {
+                'state': row.state,
+                'fields': json.loads(row.fields or '{}'),
+                'pending': json.loads(row.pending_fields or '[]'),
+                'turns': row.turns or 0
+            }
+            version = row.version
+        finally:
+            session.close()
+
+        self._count('db_hits')
+        self.memory.set(phone_number, {'version': version, 'conversation': conversation})
+        return copy.deepcopy(conversation)
+
+    def save(self, phone_number: str, fields: Dict, pending: List[str], turns: int = 1,
+             state: str = 'collecting_info') -> Dict:
+        """
+        Store the merged fields and the fields just asked for
+
+        Args:
+            phone_number: Sender's WhatsApp number
+            fields: Merged extracted fields (only CONVERSATION_FIELDS are kept)
+            pending: Fields the user was just asked for
+            turns: Number of messages in this conversation so far
+            state: Conversation state
+
+        Returns:
+            The stored conversation
+        """
+        conversation = {
+            'state': state,
+            'fields': {field: fields.get(field) for field in CONVERSATION_FIELDS},
+            'pending': list(pending),
+            'turns': turns
+        }
+        now = datetime.utcnow()
+
+        session = self.session_factory()
+        try:
+            row = (
+                session.query(WhatsAppConversation)
+                .filter(WhatsAppConversation.phone_number == phone_number)
+                .first()
+            )
+            if row is None:
+                row = WhatsAppConversation(phone_number=phone_number, version=1)
+                session.add(row)
+            else:
+                # Incremented in SQL so concurrent saves never share a version
+                row.version = func.coalesce(WhatsAppConversation.version, 0) + 1
+
+            row.state = state
+            row.fields = json.dumps(conversation['fields'], default=str)
+            row.pending_fields = json.dumps(conversation['pending'])
+            row.turns = turns
+            row.updated_at = now
+            row.expires_at = now + timedelta(seconds=self.ttl_seconds)
+            session.flush()
+            session.refresh(row, ['version'])
+            version = row.version
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+        self.memory.set(phone_number, {'version': version, 'conversation': conversation})
+        if self._count('saves') % 100 == 0:
+            self.purge_expired()  # Abandoned conversations
+        return copy.deepcopy(conversation)
+
+    def clear(self, phone_number: str) -> None:
+        """End the conversation for a phone number"""
+        self.memory.delete(phone_number)
+        session = self.session_factory()
+        try:
+            (
+                session.query(WhatsAppConversation)
+                .filter(WhatsAppConversation.phone_number == phone_number)
+                .delete(synchronize_session=False)
+            )
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+        self._count('cleared')
+
+    def purge_expired(self) -> int:
+        """Delete expired conversation rows; returns the number removed"""
+        session = self.session_factory()
+        try:
+            removed = (
+                session.query(WhatsAppConversation)
+                .filter(WhatsAppConversation.expires_at <= datetime.utcnow())
+                .delete(synchronize_session=False)
+            )
+            session.commit()
+            return removed
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    def _count(self, name: str) -> int:
+        with self._lock:
+            self._counters[name] += 1
+            return self._counters[name]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            counters = dict(self._counters)
+        counters['memory_entries'] = len(self.memory)
+        return counters
@@ -0,0 +1,212 @@
+"""
+DGCA CAR Section 3 - Vectorized batch evaluator
+Scores many claims at once from columnar arrays. Mirrors
+DGCARulesEngine.calculate_compensation exactly, for back-office re-scoring
+"""
+
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+from backend.utils.dgca_rules import DGCARulesEngine, DisruptionType, ExemptionReason
+from backend.utils.dgca_ruleset import MEETS_THRESHOLD, get_active_rules
+
+
+# Integer codes used for the disruption column
+DISRUPTION_CODES = {
+    DisruptionType.DELAY.value: 0,
+    DisruptionType.CANCELLATION.value: 1,
+    DisruptionType.DENIED_BOARDING.value: 2,
+    DisruptionType.DOWNGRADE.value: 3,
+}
+
+# Column names accepted by score_claims_batch (same keys as check_eligibility input)
+BATCH_COLUMNS = [
+    'flight_duration_hours',
+    'delay_hours',
+    'is_international',
+    'disruption_type',
+    'cancellation_notice_days',
+    'alternative_offered_hours',
+    'exemption_reason',
+    'fare_paid',
+]
+
+
+def _float_column(values: Optional[Sequence], size: int) -> np.ndarray:
+    if values is None:
+        return np.full(size, np.nan)
+    return np.asarray([np.nan if v is None else v for v in values], dtype=np.float64)
+
+
+def calculate_compensation_batch(
+    flight_duration_hours: Sequence[float],
+    delay_hours: Optional[Sequence[Optional[float]]] = None,
+    is_international: Optional[Sequence[bool]] = None,
+    disruption_type: Optional[Sequence[str]] = None,
+    notification_days: Optional[Sequence[Optional[int]]] = None,
+    alternative_offered_within_hours: Optional[Sequence[Optional[float]]] = None,
+    exemption_reason: Optional[Sequence[Optional[str]]] = None,
+    fare_paid: Optional[Sequence[Optional[float]]] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Calculate compensation for many claims using whole-array operations
+
+    Missing values may be passed as None (or NaN). Unknown disruption types
+    are treated as delays, like EligibilityAgent does.
+
+    Args:
+        flight_duration_hours: Scheduled flight durations in hours
+        delay_hours: Hours of delay per claim
+        is_international: International flag per claim
+        disruption_type: 'delay', 'cancellation', 'denied_boarding' or 'downgrade'
+        notification_days: Days of cancellation notice per claim
+        alternative_offered_within_hours: Hours within which an alternative was offered
+        exemption_reason: Free-text disruption reason per claim
+        fare_paid: Fare paid per claim (downgrades only)
+
+    Returns:
+        Dictionary of arrays: eligible, compensation_amount, exemption_applied,
+        exemption_reason, plus the rules_version used
+    """
+    # One rule set reference for the whole batch
+    rules = get_active_rules()
+
+    duration = _float_column(flight_duration_hours, 0)
+    size = duration.shape[0]
+
+    duration = np.where(np.isnan(duration), 2.0, duration)
+    delay = _float_column(delay_hours, size)
+    notice = _float_column(notification_days, size)
+    alternative = _float_column(alternative_offered_within_hours, size)
+    fare = _float_column(fare_paid, size)
+
+    if is_international is None:
+        international = np.zeros(size, dtype=bool)
+    else:
+        international = np.asarray([bool(v) for v in is_international], dtype=bool)
+
+    if disruption_type is None:
+        disruption = np.zeros(size, dtype=np.int8)
+    else:
+        disruption = np.asarray(
+            [DISRUPTION_CODES.get(getattr(v, 'value', v), 0) for v in disruption_type],
+            dtype=np.int8
+        )
+
+    # Reason-based exemptions: evaluate each distinct reason string once
+    exemption_codes = np.full(size, None, dtype=object)
+    if exemption_reason is not None:
+        reasons = np.asarray(['' if v is None else str(v) for v in exemption_reason], dtype=object)
+        unique_reasons, inverse = np.unique(reasons, return_inverse=True)
+        unique_codes = np.full(unique_reasons.shape[0], None, dtype=object)
+        for index, reason in enumerate(unique_reasons):
+            if reason:
+                is_exempt, exemption = DGCARulesEngine.check_exemption(DisruptionType.DELAY, reason, rules=rules)
+                if is_exempt:
+                    unique_codes[index] = exemption.value
+        exemption_codes = unique_codes[inverse]
+
+    is_cancellation = disruption == DISRUPTION_CODES['cancellation']
+    with np.errstate(invalid='ignore'):
+        early_notice = is_cancellation & (notice >= rules.min_notice_days)
+        quick_alternative = (
+            is_cancellation & ~early_notice & (alternative != 0) & (alternative <= rules.max_alternative_hours)
+        )
+
+    exemption_codes = np.where(
+        (exemption_codes == None) & early_notice,  # noqa: E711 - element-wise
+        ExemptionReason.EARLY_NOTIFICATION.value,
+        exemption_codes
+    )
+    exemption_codes = np.where(
+        (exemption_codes == None) & quick_alternative,  # noqa: E711 - element-wise
+        ExemptionReason.ALTERNATIVE_OFFERED.value,
+        exemption_codes
+    )
+    exempt = exemption_codes != None  # noqa: E711 - element-wise
+
+    # Flight category as an index into dgca_ruleset.CATEGORIES
+    category = np.where(duration < 1, 0, np.where(duration <= 2, 1, 2))
+    category = np.where(international, 3, category)
+
+    # Per-category columns of the compiled decision table
+    thresholds = np.asarray(rules.column('delay', 'threshold', MEETS_THRESHOLD), dtype=np.float64)
+    delay_amounts = np.asarray(rules.column('delay', 'compensation', MEETS_THRESHOLD), dtype=np.int64)
+    cancellation_applies = np.asarray(rules.column('cancellation', 'eligible'), dtype=bool)
+    cancellation_amounts = np.asarray(rules.column('cancellation', 'compensation'), dtype=np.int64)
+    denied_amounts = np.asarray(rules.column('denied_boarding', 'compensation'), dtype=np.int64)
+    refund_percentage = np.where(
+        international,
+        rules.downgrade_refund_percentage["international"],
+        rules.downgrade_refund_percentage["domestic"]
+    )
+
+    with np.errstate(invalid='ignore'):
+        delay_eligible = (disruption == DISRUPTION_CODES['delay']) & (delay >= thresholds[category])
+    cancellation_eligible = is_cancellation & cancellation_applies[category]
+    denied_eligible = disruption == DISRUPTION_CODES['denied_boarding']
+    has_fare = ~np.isnan(fare) & (fare != 0)
+    downgrade_eligible = (disruption == DISRUPTION_CODES['downgrade']) & has_fare
+
+    eligible = (delay_eligible | cancellation_eligible | denied_eligible | downgrade_eligible) & ~exempt
+
+    downgrade_amounts = np.trunc(np.where(has_fare, fare, 0.0) * refund_percentage / 100).astype(np.int64)
+    compensation = np.select(
+        [delay_eligible, cancellation_eligible, denied_eligible, downgrade_eligible],
+        [delay_amounts[category], cancellation_amounts[category], denied_amounts[category], downgrade_amounts],
+        default=0
+    )
+    compensation = np.where(eligible, compensation, 0).astype(np.int64)
+
+    return {
+        'eligible': eligible,
+        'compensation_amount': compensation,
+        'exemption_applied': exempt,
+        'exemption_reason': exemption_codes,
+        'rules_version': rules.version
+    }
+
+
+def score_claims_batch(columns: Dict[str, Sequence]) -> Dict:
+    """
+    Score claims supplied as a dictionary of equal-length columns
+
+    Args:
+        columns: Column name -> list of values (see BATCH_COLUMNS)
+
+    Returns:
+        JSON-serializable dictionary of result lists plus totals
+
+    Raises:
+        ValueError: If no columns are given or their lengths differ
+    """
+    lengths = {name: len(columns[name]) for name in BATCH_COLUMNS if columns.get(name) is not None}
+    if not lengths:
+        raise ValueError(f"At least one of {', '.join(BATCH_COLUMNS)} is required")
+    if len(set(lengths.values())) != 1:
+        raise ValueError(f"Columns must have equal length, got {lengths}")
+
+    size = next(iter(lengths.values()))
+    result = calculate_compensation_batch(
+        flight_duration_hours=columns.get('flight_duration_hours') or [None] * size,
+        delay_hours=columns.get('delay_hours'),
+        is_international=columns.get('is_international'),
+        disruption_type=columns.get('disruption_type'),
+        notification_days=columns.get('cancellation_notice_days'),
+        alternative_offered_within_hours=columns.get('alternative_offered_hours'),
+        exemption_reason=columns.get('exemption_reason'),
+        fare_paid=columns.get('fare_paid')
+    )
+
+    return {
+        'count': size,
+        'eligible': result['eligible'].tolist(),
+        'compensation_amount': result['compensation_amount'].tolist(),
+        'exemption_applied': result['exemption_applied'].tolist(),
+        'exemption_reason': result['exemption_reason'].tolist(),
+        'eligible_count': int(result['eligible'].sum()),
+        'total_compensation': int(result['compensation_amount'].sum()),
+        'currency': 'INR',
+        'rules_version': result['rules_version']
+    }
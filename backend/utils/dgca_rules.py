@@ -6,9 +6,13 @@ Reference: https://www.dgca.gov.in/digigov-portal/jsp/dgca/homePage/homePage.jsp
 """
 
 from datetime import datetime, timedelta
-from typing import Dict, Optional, Tuple
+from types import MappingProxyType
+from typing import Callable, Dict, Optional, Tuple
 from enum import Enum
 
+from backend.utils.dgca_ruleset import CATEGORIES, MEETS_THRESHOLD, CompiledRuleSet, get_active_rules
+from backend.utils.templates import get_template_renderer
+
 
 class DisruptionType(Enum):
     """Types of flight disruptions"""
@@ -29,50 +33,42 @@ class ExemptionReason(Enum):
     PASSENGER_FAULT = "passenger_late_or_docs_issue"
 
 
+class _ActiveRulesView:
+    """Read-only class attribute computed from the active rule set on access"""
+
+    def __init__(self, build: Callable[[CompiledRuleSet], Dict]):
+        self.build = build
+
+    def __get__(self, instance, owner):
+        return MappingProxyType(self.build(get_active_rules()))
+
+
+def _compensation_matrix(rules: CompiledRuleSet) -> Dict:
+    return {
+        category: MappingProxyType({
+            "delay_threshold": rules.delay_thresholds[category],
+            "compensation": rules.table[('delay', category, MEETS_THRESHOLD)].compensation,
+            "applies_to_cancellation": rules.table[('cancellation', category, 0)].eligible
+        })
+        for category in CATEGORIES
+    }
+
+
 class DGCARulesEngine:
     """
     Engine to calculate flight compensation based on DGCA rules
     """
     
-    # Compensation matrix (in INR)
-    COMPENSATION_MATRIX = {
-        # Flight duration in hours: (delay_threshold_hours, compensation_amount)
-        "domestic_short": {  # < 1 hour flight
-            "delay_threshold": 2,
-            "compensation": 5000,
-            "applies_to_cancellation": True
-        },
-        "domestic_medium": {  # 1-2 hours flight
-            "delay_threshold": 2,
-            "compensation": 7500,
-            "applies_to_cancellation": True
-        },
-        "domestic_long": {  # > 2 hours flight
-            "delay_threshold": 2,
-            "compensation": 10000,
-            "applies_to_cancellation": True
-        },
-        "international": {  # International flights
-            "delay_threshold": 4,
-            "compensation": 20000,
-            "applies_to_cancellation": True
-        }
-    }
-    
-    # Denied boarding compensation
-    DENIED_BOARDING_COMPENSATION = {
-        "domestic_short": 10000,
-        "domestic_medium": 10000,
-        "domestic_long": 10000,
-        "international": 20000
-    }
-    
-    # Downgrade compensation (refund of fare difference)
-    DOWNGRADE_REFUND_PERCENTAGE = {
-        "domestic": 75,  # 75% of fare difference
-        "international": 50  # 50% of fare difference
-    }
-    
+    # Compensation amounts, delay thresholds and obligation limits live in the
+    # versioned rules file (backend/data/dgca_rules.json) and are compiled into
+    # flat lookup tables by backend.utils.dgca_ruleset. The tables below are
+    # read-only views of the active rule set, kept for existing callers.
+    COMPENSATION_MATRIX = _ActiveRulesView(_compensation_matrix)
+    DENIED_BOARDING_COMPENSATION = _ActiveRulesView(
+        lambda rules: dict(zip(CATEGORIES, rules.column('denied_boarding', 'compensation')))
+    )
+    DOWNGRADE_REFUND_PERCENTAGE = _ActiveRulesView(lambda rules: dict(rules.downgrade_refund_percentage))
+
     @staticmethod
     def calculate_flight_duration_category(
         flight_duration_hours: float,
@@ -103,7 +99,8 @@ class DGCARulesEngine:
         disruption_type: DisruptionType,
         reason: Optional[str] = None,
         notification_days: Optional[int] = None,
-        alternative_offered_within_hours: Optional[float] = None
+        alternative_offered_within_hours: Optional[float] = None,
+        rules: Optional[CompiledRuleSet] = None
     ) -> Tuple[bool, Optional[ExemptionReason]]:
         """
         Check if the disruption qualifies for exemption from compensation
@@ -113,36 +110,27 @@ class DGCARulesEngine:
             reason: Reason for disruption (weather, security, etc.)
             notification_days: Days before flight passenger was notified
             alternative_offered_within_hours: Hours within which alternative was offered
+            rules: Rule set to apply (defaults to the active one)
             
         Returns:
             Tuple of (is_exempt, exemption_reason)
         """
-        # Check extraordinary circumstances
-        exempt_reasons = [
-            "weather", "extraordinary weather", "cyclone", "storm",
-            "security", "security threat", "terrorism",
-            "atc strike", "air traffic control strike",
-            "political instability", "riots", "civil unrest"
-        ]
+        rules = rules or get_active_rules()
         
-        if reason and any(exempt in reason.lower() for exempt in exempt_reasons):
-            if "weather" in reason.lower():
-                return True, ExemptionReason.WEATHER
-            elif "security" in reason.lower():
-                return True, ExemptionReason.SECURITY
-            elif "atc" in reason.lower() or "strike" in reason.lower():
-                return True, ExemptionReason.ATC_STRIKE
-            elif "political" in reason.lower() or "riot" in reason.lower():
-                return True, ExemptionReason.POLITICAL_INSTABILITY
+        # Check extraordinary circumstances (one pass over the reason text
+        # using the rule set's exemption vocabulary, incl. Hindi/Hinglish terms)
+        exemption_code = rules.exemption_matcher.match(reason)
+        if exemption_code:
+            return True, ExemptionReason(exemption_code)
         
         # Check cancellation-specific exemptions
         if disruption_type == DisruptionType.CANCELLATION:
             # Passenger notified >= 2 weeks before
-            if notification_days and notification_days >= 14:
+            if notification_days and notification_days >= rules.min_notice_days:
                 return True, ExemptionReason.EARLY_NOTIFICATION
             
             # Alternative flight offered within 1 hour
-            if alternative_offered_within_hours and alternative_offered_within_hours <= 1:
+            if alternative_offered_within_hours and alternative_offered_within_hours <= rules.max_alternative_hours:
                 return True, ExemptionReason.ALTERNATIVE_OFFERED
         
         return False, None
@@ -176,8 +164,12 @@ class DGCARulesEngine:
             downgrade_class_to: Downgraded class
             
         Returns:
-            Dictionary with compensation details
+            Dictionary with compensation details, including the rules_version
+            that scored it
         """
+        # Take one rule set reference for the whole evaluation
+        rules = get_active_rules()
+        
         result = {
             "eligible": False,
             "compensation_amount": 0,
@@ -185,7 +177,8 @@ class DGCARulesEngine:
             "disruption_type": disruption_type.value,
             "reason": "",
             "exemption_applied": False,
-            "exemption_reason": None
+            "exemption_reason": None,
+            "rules_version": rules.version
         }
         
         # Check for exemptions first
@@ -193,7 +186,8 @@ class DGCARulesEngine:
             disruption_type,
             exemption_reason,
             notification_days,
-            alternative_offered_within_hours
+            alternative_offered_within_hours,
+            rules
         )
         
         if is_exempt:
@@ -214,34 +208,34 @@ class DGCARulesEngine:
                 result["reason"] = "Delay duration not provided"
                 return result
             
-            rules = DGCARulesEngine.COMPENSATION_MATRIX[category]
+            outcome = rules.table[("delay", category, rules.delay_bucket(category, delay_hours))]
             
-            if delay_hours >= rules["delay_threshold"]:
+            if outcome.eligible:
                 result["eligible"] = True
-                result["compensation_amount"] = rules["compensation"]
+                result["compensation_amount"] = outcome.compensation
                 result["reason"] = (
                     f"Delay of {delay_hours} hours exceeds threshold of "
-                    f"{rules['delay_threshold']} hours for {category} flight"
+                    f"{outcome.threshold} hours for {category} flight"
                 )
             else:
                 result["reason"] = (
                     f"Delay of {delay_hours} hours does not meet minimum threshold of "
-                    f"{rules['delay_threshold']} hours"
+                    f"{outcome.threshold} hours"
                 )
         
         elif disruption_type == DisruptionType.CANCELLATION:
-            rules = DGCARulesEngine.COMPENSATION_MATRIX[category]
+            outcome = rules.table[("cancellation", category, 0)]
             
-            if rules["applies_to_cancellation"]:
+            if outcome.eligible:
                 result["eligible"] = True
-                result["compensation_amount"] = rules["compensation"]
+                result["compensation_amount"] = outcome.compensation
                 result["reason"] = f"Flight cancellation without adequate notice or alternative"
             else:
                 result["reason"] = "Cancellation does not qualify for compensation"
         
         elif disruption_type == DisruptionType.DENIED_BOARDING:
             result["eligible"] = True
-            result["compensation_amount"] = DGCARulesEngine.DENIED_BOARDING_COMPENSATION[category]
+            result["compensation_amount"] = rules.table[("denied_boarding", category, 0)].compensation
             result["reason"] = "Denied boarding despite valid confirmed ticket"
         
         elif disruption_type == DisruptionType.DOWNGRADE:
@@ -250,9 +244,9 @@ class DGCARulesEngine:
                 return result
             
             refund_percentage = (
-                DGCARulesEngine.DOWNGRADE_REFUND_PERCENTAGE["international"]
+                rules.downgrade_refund_percentage["international"]
                 if is_international
-                else DGCARulesEngine.DOWNGRADE_REFUND_PERCENTAGE["domestic"]
+                else rules.downgrade_refund_percentage["domestic"]
             )
             
             # Simplified calculation - in real scenario, need fare difference
@@ -277,26 +271,13 @@ class DGCARulesEngine:
         Returns:
             Dictionary of obligations
         """
-        obligations = {
-            "meals_and_refreshments": False,
-            "hotel_accommodation": False,
-            "communication": False,  # 2 phone calls/emails
-            "refund_option": False
-        }
-        
+        rules = get_active_rules()
         category = DGCARulesEngine.calculate_flight_duration_category(flight_duration_hours)
         
-        # For delays >= 2 hours
-        if delay_hours >= 2:
-            obligations["meals_and_refreshments"] = True
-            obligations["communication"] = True
-        
-        # For significant delays (>= 6 hours for domestic, >= 12 for international)
-        delay_threshold = 6 if "domestic" in category else 12
-        
-        if delay_hours >= delay_threshold:
-            obligations["hotel_accommodation"] = True
-            obligations["refund_option"] = True
+        # Meals/communication from 2 hours; hotel/refund from 6 hours (domestic)
+        # or 12 hours (international) under the bundled rule set
+        bucket = rules.obligation_bucket(category, delay_hours)
+        obligations = dict(rules.obligation_table[(category, bucket)])
         
         return obligations
     
@@ -323,34 +304,15 @@ class DGCARulesEngine:
         Returns:
             Formatted claim text
         """
-        claim_text = f"""
-FLIGHT COMPENSATION CLAIM UNDER DGCA CAR SECTION 3
-
-Passenger Name: {passenger_name}
-Flight Number: {flight_number}
-Flight Date: {flight_date}
-Route: {route}
-Disruption Type: {disruption_type.value.upper()}
-
-ELIGIBILITY STATUS: {'ELIGIBLE' if compensation_result['eligible'] else 'NOT ELIGIBLE'}
-Compensation Amount: ₹{compensation_result['compensation_amount']:,}
-
-Reason: {compensation_result['reason']}
-"""
-        
-        if compensation_result.get('exemption_applied'):
-            claim_text += f"\nExemption Applied: {compensation_result['exemption_reason']}"
-        
-        claim_text += """
-
-LEGAL BASIS:
-This claim is filed under DGCA Civil Aviation Requirements (CAR) Section 3, 
-Series M, Part IV, which mandates airlines to compensate passengers for 
-flight delays, cancellations, and denied boarding, except in cases of 
-extraordinary circumstances beyond the airline's control.
-"""
-        
-        return claim_text
+        return get_template_renderer().render(
+            'claim_details.txt',
+            passenger_name=passenger_name,
+            flight_number=flight_number,
+            flight_date=flight_date,
+            route=route,
+            disruption_type=disruption_type,
+            compensation_result=compensation_result
+        )
 
 
 # Helper functions for easy use
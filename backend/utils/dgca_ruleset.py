@@ -0,0 +1,190 @@
+"""
+DGCA Rule Sets - Versioned rules compiled into flat lookup tables
+Rules live in a JSON data file, are compiled once, and are hot-swapped
+atomically when the file changes
+"""
+
+import os
+import json
+import time
+import threading
+from collections import namedtuple
+from types import MappingProxyType
+from typing import Dict, Optional
+
+from backend.utils.exemption_matcher import ExemptionMatcher
+
+
+DEFAULT_RULES_FILE = os.path.abspath(os.path.join(os.path.dirname(__file__), '../data/dgca_rules.json'))
+
+# Fixed category order; batch evaluators index arrays by position
+CATEGORIES = ("domestic_short", "domestic_medium", "domestic_long", "international")
+
+# Bucket indexes for the decision table
+BELOW_THRESHOLD = 0
+MEETS_THRESHOLD = 1
+
+# Obligation buckets, by delay: < meals threshold, >= meals, >= hotel
+OBLIGATION_NONE = 0
+OBLIGATION_MEALS = 1
+OBLIGATION_HOTEL = 2
+
+Outcome = namedtuple('Outcome', ['eligible', 'compensation', 'threshold'])
+
+
+class CompiledRuleSet:
+    """
+    Immutable, pre-compiled form of one rule set version
+
+    `table` is keyed by (disruption, category, bucket). Delay entries use
+    BELOW_THRESHOLD/MEETS_THRESHOLD buckets; other disruptions use bucket 0.
+    """
+
+    def __init__(self, rules: Dict, source_path: Optional[str] = None):
+        self.version = str(rules['version'])
+        self.effective_from = rules.get('effective_from')
+        self.source_path = source_path
+
+        table = {}
+        delay_thresholds = {}
+        for category in CATEGORIES:
+            delay = rules['delay'][category]
+            threshold = delay['threshold_hours']
+            delay_thresholds[category] = threshold
+            table[('delay', category, BELOW_THRESHOLD)] = Outcome(False, 0, threshold)
+            table[('delay', category, MEETS_THRESHOLD)] = Outcome(True, int(delay['compensation']), threshold)
+
+            cancellation = rules['cancellation'][category]
+            applies = bool(cancellation['applies'])
+            table[('cancellation', category, 0)] = Outcome(
+                applies, int(cancellation['compensation']) if applies else 0, None
+            )
+
+            table[('denied_boarding', category, 0)] = Outcome(
+                True, int(rules['denied_boarding'][category]), None
+            )
+
+        self.table = MappingProxyType(table)
+        self.delay_thresholds = MappingProxyType(delay_thresholds)
+        self.downgrade_refund_percentage = MappingProxyType(dict(rules['downgrade_refund_percentage']))
+
+        self.exemption_matcher = ExemptionMatcher(rules['exemption_vocabulary'])
+
+        exemptions = rules['cancellation_exemptions']
+        self.min_notice_days = exemptions['min_notice_days']
+        self.max_alternative_hours = exemptions['max_alternative_hours']
+
+        obligations = rules['obligations']
+        self.meals_min_delay_hours = obligations['meals_min_delay_hours']
+        self.hotel_min_delay_hours = MappingProxyType(dict(obligations['hotel_min_delay_hours']))
+
+        obligation_table = {}
+        for category in CATEGORIES:
+            for bucket in (OBLIGATION_NONE, OBLIGATION_MEALS, OBLIGATION_HOTEL):
+                obligation_table[(category, bucket)] = MappingProxyType({
+                    "meals_and_refreshments": bucket >= OBLIGATION_MEALS,
+                    "hotel_accommodation": bucket >= OBLIGATION_HOTEL,
+                    "communication": bucket >= OBLIGATION_MEALS,  # 2 phone calls/emails
+                    "refund_option": bucket >= OBLIGATION_HOTEL
+                })
+        self.obligation_table = MappingProxyType(obligation_table)
+
+    def delay_bucket(self, category: str, delay_hours: float) -> int:
+        return MEETS_THRESHOLD if delay_hours >= self.delay_thresholds[category] else BELOW_THRESHOLD
+
+    def obligation_bucket(self, category: str, delay_hours: float) -> int:
+        scope = "domestic" if "domestic" in category else "international"
+        if delay_hours >= self.hotel_min_delay_hours[scope]:
+            return OBLIGATION_HOTEL
+        if delay_hours >= self.meals_min_delay_hours:
+            return OBLIGATION_MEALS
+        return OBLIGATION_NONE
+
+    def column(self, disruption: str, field: str, bucket: int = 0) -> tuple:
+        """Return one Outcome field for every category, in CATEGORIES order"""
+        return tuple(getattr(self.table[(disruption, category, bucket)], field) for category in CATEGORIES)
+
+    def __repr__(self):
+        return f"<CompiledRuleSet(version={self.version})>"
+
+
+def load_rule_set(path: str) -> CompiledRuleSet:
+    """
+    Load and compile a rule set from a JSON data file
+
+    Args:
+        path: Path to the rules file
+
+    Returns:
+        CompiledRuleSet
+    """
+    with open(path, encoding='utf-8') as f:
+        return CompiledRuleSet(json.load(f), source_path=path)
+
+
+class RuleSetRegistry:
+    """
+    Holds the active rule set and hot-swaps it when the data file changes
+
+    The file's mtime is checked at most once per check_interval seconds, so
+    every worker process picks up an edited file without a restart. A new
+    version is fully compiled before the reference is swapped, and callers
+    take one reference per evaluation, so no claim is scored against a
+    half-applied update.
+    """
+
+    def __init__(self, path: str = DEFAULT_RULES_FILE, check_interval: float = 5.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._active = load_rule_set(path)
+        self._mtime = os.path.getmtime(path)
+        self._checked_at = time.monotonic()
+
+    def current(self) -> CompiledRuleSet:
+        if time.monotonic() - self._checked_at >= self.check_interval:
+            self._maybe_reload()
+        return self._active
+
+    def _maybe_reload(self):
+        if not self._lock.acquire(blocking=False):
+            return  # Another thread is already checking
+
+        try:
+            self._checked_at = time.monotonic()
+            mtime = os.path.getmtime(self.path)
+            if mtime != self._mtime:
+                self.reload()
+        except OSError as e:
+            print(f"DGCA rules file unavailable, keeping version {self._active.version}: {e}")
+        finally:
+            self._lock.release()
+
+    def reload(self) -> CompiledRuleSet:
+        """
+        Recompile the rules file and swap it in
+
+        If the file fails to parse, the previous version stays active.
+        """
+        mtime = os.path.getmtime(self.path)
+        try:
+            compiled = load_rule_set(self.path)
+        except (ValueError, KeyError, TypeError) as e:
+            print(f"Invalid DGCA rules file, keeping version {self._active.version}: {e}")
+            self._mtime = mtime
+            return self._active
+
+        self._mtime = mtime
+        self._active = compiled
+        return compiled
+
+
+rules_registry = RuleSetRegistry(
+    os.getenv('DGCA_RULES_FILE', DEFAULT_RULES_FILE),
+    check_interval=float(os.getenv('DGCA_RULES_CHECK_INTERVAL', 5))
+)
+
+
+def get_active_rules() -> CompiledRuleSet:
+    """Return the currently active compiled rule set"""
+    return rules_registry.current()
@@ -0,0 +1,228 @@
+"""
+Escalation - Deadline-driven escalation of unanswered claims
+Claims the airline has not answered by airline_response_deadline go to
+AirSewa; claims still open a set number of days after that go to DGCA.
+Due claims are found with indexed range scans and escalated in batches
+"""
+
+import os
+import json
+import time
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import select, update
+
+from backend.database.models import Claim, ClaimActivity, ClaimStatus
+
+
+# Databases whose SELECT ... FOR UPDATE supports SKIP LOCKED
+SKIP_LOCKED_DIALECTS = ('postgresql', 'mysql', 'mariadb')
+
+# Claims waiting on the airline
+AWAITING_AIRLINE = (ClaimStatus.SUBMITTED_TO_AIRLINE, ClaimStatus.AWAITING_RESPONSE)
+
+
+class EscalationScheduler:
+    """
+    Periodic escalation pass, safe to run in several processes at once
+
+    Each stage reads due claim ids in deadline order from a
+    (status, date) index - ix_claims_status_response_deadline and
+    ix_claims_status_airsewa_date - so a tick touches only due rows, never
+    the whole table. A claim is taken with an UPDATE that re-checks its
+    status and date (after FOR UPDATE SKIP LOCKED on Postgres), and its
+    ClaimActivity row is written in the same transaction, so when
+    schedulers overlap each claim is escalated exactly once. The re-check
+    is one UPDATE ... RETURNING per batch where the database supports it.
+    """
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable] = None,
+        airsewa_days: int = 30,
+        batch_size: int = 200,
+        max_batches: int = 50,
+        interval: float = 300
+    ):
+        """
+        Args:
+            session_factory: Session factory (defaults to SessionLocal)
+            airsewa_days: Days after the AirSewa escalation before going to DGCA
+            batch_size: Claims escalated per transaction
+            max_batches: Cap on batches per stage in one tick
+            interval: Seconds between ticks in run()
+        """
+        if session_factory is None:
+            from backend.database.db_session import SessionLocal
+            session_factory = SessionLocal
+
+        self.session_factory = session_factory
+        self.airsewa_days = airsewa_days
+        self.batch_size = batch_size
+        self.max_batches = max_batches
+        self.interval = interval
+
+        self._stopped = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._counters = {'ticks': 0, 'escalated_airsewa': 0, 'escalated_dgca': 0, 'lost_races': 0}
+        self._last_tick = None
+
+    @classmethod
+    def from_env(cls) -> 'EscalationScheduler':
+        return cls(
+            airsewa_days=int(os.getenv('AIRSEWA_RESPONSE_DAYS', 30)),
+            batch_size=int(os.getenv('ESCALATION_BATCH_SIZE', 200)),
+            max_batches=int(os.getenv('ESCALATION_MAX_BATCHES', 50)),
+            interval=float(os.getenv('ESCALATION_INTERVAL', 300))
+        )
+
+    def stages(self, now: datetime) -> List[Dict]:
+        """Escalation stages: which claims are due and what happens to them"""
+        return [
+            {
+                'name': 'airsewa',
+                'at': now,
+                'due': [Claim.status.in_(AWAITING_AIRLINE), Claim.airline_response_deadline <= now],
+                'order_by': Claim.airline_response_deadline,
+                'values': {
+                    'status': ClaimStatus.ESCALATED_AIRSEWA,
+                    'escalated_to_airsewa': True,
+                    'airsewa_escalation_date': now
+                },
+                'description': 'No airline response by the deadline; escalated to AirSewa'
+            },
+            {
+                'name': 'dgca',
+                'at': now,
+                'due': [
+                    Claim.status == ClaimStatus.ESCALATED_AIRSEWA,
+                    Claim.airsewa_escalation_date <= now - timedelta(days=self.airsewa_days)
+                ],
+                'order_by': Claim.airsewa_escalation_date,
+                'values': {
+                    'status': ClaimStatus.ESCALATED_DGCA,
+                    'escalated_to_dgca': True,
+                    'dgca_escalation_date': now
+                },
+                'description': f'Unresolved {self.airsewa_days} days after AirSewa escalation; escalated to DGCA'
+            }
+        ]
+
+    def tick(self, now: Optional[datetime] = None) -> Dict[str, int]:
+        """
+        Escalate every claim that is due
+
+        Returns:
+            Claims escalated per stage
+        """
+        now = now or datetime.utcnow()
+        escalated = {}
+        for stage in self.stages(now):
+            total = 0
+            for _ in range(self.max_batches):
+                done, seen = self._escalate_batch(stage)
+                total += done
+                if seen < self.batch_size:
+                    break  # Nothing more is due
+            escalated[stage['name']] = total
+
+        with self._lock:
+            self._counters['ticks'] += 1
+            self._counters['escalated_airsewa'] += escalated['airsewa']
+            self._counters['escalated_dgca'] += escalated['dgca']
+            self._last_tick = now
+        return escalated
+
+    def _escalate_batch(self, stage: Dict):
+        """Returns (claims escalated, due claims seen)"""
+        session = self.session_factory()
+        try:
+            due_ids = (
+                select(Claim.id)
+                .where(*stage['due'])
+                .order_by(stage['order_by'], Claim.id)
+                .limit(self.batch_size)
+            )
+            if session.get_bind().dialect.name in SKIP_LOCKED_DIALECTS:
+                # Claims locked by another scheduler's batch are left to it
+                due_ids = due_ids.with_for_update(skip_locked=True)
+            candidates = list(session.execute(due_ids).scalars())
+
+            escalate = update(Claim).values(**stage['values'])
+            if not candidates:
+                escalated = []
+            elif session.get_bind().dialect.update_returning:
+                escalated = list(session.execute(
+                    escalate.where(Claim.id.in_(candidates), *stage['due']).returning(Claim.id),
+                    execution_options={'synchronize_session': False}
+                ).scalars())
+            else:
+                escalated = [
+                    claim_id for claim_id in candidates
+                    if session.execute(
+                        escalate.where(Claim.id == claim_id, *stage['due']),
+                        execution_options={'synchronize_session': False}
+                    ).rowcount
+                ]
+
+            if escalated:
+                target = stage['values']['status'].value
+                metadata = json.dumps({'stage': stage['name'], 'to': target})
+                session.execute(ClaimActivity.__table__.insert(), [
+                    {
+                        'claim_id': claim_id,
+                        'activity_type': 'escalation',
+                        'description': stage['description'],
+                        'performed_by': 'system',
+                        'activity_metadata': metadata,
+                        'created_at': stage['at']
+                    }
+                    for claim_id in escalated
+                ])
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+        lost = len(candidates) - len(escalated)
+        if lost:
+            with self._lock:
+                self._counters['lost_races'] += lost
+        return len(escalated), len(candidates)
+
+    def start(self):
+        """Run tick() every interval seconds on a background thread"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self.run, name='escalation-scheduler', daemon=True)
+            self._thread.start()
+
+    def run(self):
+        while not self._stopped.is_set():
+            started = time.monotonic()
+            try:
+                escalated = self.tick()
+                if any(escalated.values()):
+                    print(f"[escalation] escalated {escalated}")
+            except Exception as e:
+                print(f"[escalation] tick failed: {e}")
+            self._stopped.wait(max(0.0, self.interval - (time.monotonic() - started)))
+
+    def stop(self, timeout: float = 5):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            counters = dict(self._counters)
+            counters['last_tick'] = self._last_tick.isoformat() if self._last_tick else None
+        counters['interval'] = self.interval
+        return counters
@@ -0,0 +1,64 @@
+"""
+Exemption Matcher - Single-pass multi-pattern matcher for disruption reasons
+Maps free-text reasons ("heavy fog", "ATC strike", "kharab mausam") to an
+exemption code using one precompiled regex
+"""
+
+import re
+from typing import Dict, List, Optional
+
+
+class ExemptionMatcher:
+    """
+    Precompiled matcher built from an exemption vocabulary
+
+    The vocabulary maps exemption codes to lists of terms. Its order is the
+    priority order used when a reason mentions several categories, e.g.
+    "storm and security alert" resolves to the first listed code. Terms are
+    matched case-insensitively as whole words or phrases, so "atc strike"
+    matches "ATC  strike" but "storm" does not match "brainstorm" and
+    "strike" on its own is not a term; list inflections ("riots") as terms.
+    """
+
+    def __init__(self, vocabulary: Dict[str, List[str]]):
+        self.codes = list(vocabulary)
+        self._priority = {code: index for index, code in enumerate(self.codes)}
+        self._group_codes = {}
+
+        alternatives = []
+        for index, (code, terms) in enumerate(vocabulary.items()):
+            if not terms:
+                continue
+            group = f"c{index}"
+            self._group_codes[group] = code
+            # Longest terms first so "air traffic control" wins over "air"
+            ordered = sorted({term.strip() for term in terms if term.strip()}, key=len, reverse=True)
+            patterns = [r'\s+'.join(re.escape(word) for word in term.split()) for term in ordered]
+            alternatives.append(f"(?P<{group}>{'|'.join(patterns)})")
+
+        self._pattern = (
+            re.compile(r'(?<!\w)(?:' + '|'.join(alternatives) + r')(?!\w)', re.IGNORECASE)
+            if alternatives else None
+        )
+
+    def match(self, reason: Optional[str]) -> Optional[str]:
+        """
+        Find the highest-priority exemption code mentioned in a reason
+
+        Args:
+            reason: Free-text disruption reason
+
+        Returns:
+            Exemption code, or None if no term matches
+        """
+        if not reason or self._pattern is None:
+            return None
+
+        best = None
+        for match in self._pattern.finditer(reason):
+            code = self._group_codes[match.lastgroup]
+            if best is None or self._priority[code] < self._priority[best]:
+                best = code
+                if self._priority[code] == 0:
+                    break
+        return best
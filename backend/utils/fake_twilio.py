@@ -0,0 +1,163 @@
+"""
+Fake Twilio - Local stand-in for the Twilio Messages API
+Accepts message creation requests, can inject latency, 5xx errors and 429
+throttling, and posts sent/delivered status callbacks, so the outbound
+queue can be exercised without a Twilio account
+
+Usage: python backend/utils/fake_twilio.py [port]
+Then set TWILIO_API_BASE_URL=http://127.0.0.1:<port>
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs
+
+import requests
+
+
+class FakeTwilioServer:
+    """
+    In-process HTTP server speaking the subset of the Twilio API we use
+
+    Args:
+        port: Port to bind (0 picks a free one)
+        latency: Seconds to wait before answering each create request
+        error_rate: Fraction of create requests answered with a 500
+        max_per_second: Requests beyond this rate get a 429 (None = unlimited)
+        delivery_delay: Seconds between 'sent' and 'delivered' callbacks
+    """
+
+    def __init__(self, port: int = 0, latency: float = 0.0, error_rate: float = 0.0,
+                 max_per_second: Optional[float] = None, delivery_delay: float = 0.2):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.max_per_second = max_per_second
+        self.delivery_delay = delivery_delay
+        self.messages: List[Dict] = []
+        self.requests = 0
+        self.rejected = 0
+        self._window = []
+        self._lock = threading.Lock()
+        self._callbacks = requests.Session()
+        self._server = ThreadingHTTPServer(('127.0.0.1', port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'FakeTwilioServer':
+        self._thread = threading.Thread(target=self._server.serve_forever, name='fake-twilio', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _admit(self) -> Optional[int]:
+        """Return an error status for this request, or None to accept it"""
+        with self._lock:
+            self.requests += 1
+            if self.max_per_second:
+                now = time.monotonic()
+                self._window = [t for t in self._window if now - t < 1.0]
+                if len(self._window) >= self.max_per_second:
+                    self.rejected += 1
+                    return 429
+                self._window.append(now)
+            if self.error_rate and random.random() < self.error_rate:
+                self.rejected += 1
+                return 500
+        return None
+
+    def _create_message(self, form: Dict) -> Dict:
+        message = {
+            'sid': 'SM' + uuid.uuid4().hex,
+            'from': form.get('From'),
+            'to': form.get('To'),
+            'body': form.get('Body'),
+            'status': 'queued',
+            'status_callback': form.get('StatusCallback'),
+            'created': time.time()
+        }
+        with self._lock:
+            self.messages.append(message)
+        if message['status_callback']:
+            threading.Thread(target=self._send_callbacks, args=(message,), daemon=True).start()
+        return message
+
+    def _send_callbacks(self, message: Dict):
+        for status, delay in (('sent', 0.0), ('delivered', self.delivery_delay)):
+            time.sleep(delay)
+            message['status'] = status
+            try:
+                self._callbacks.post(
+                    message['status_callback'],
+                    data={'MessageSid': message['sid'], 'MessageStatus': status, 'To': message['to']},
+                    timeout=5
+                )
+            except requests.RequestException as e:
+                print(f"[fake-twilio] status callback failed: {e}")
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'  # keep-alive, like the real API
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                form = {key: values[0] for key, values in parse_qs(self.rfile.read(length).decode()).items()}
+
+                if not self.path.endswith('/Messages.json'):
+                    return self._reply(404, {'code': 20404, 'message': 'Not found'})
+                if not form.get('To') or not form.get('Body'):
+                    return self._reply(400, {'code': 21604, 'message': "A 'To' and 'Body' are required"})
+
+                if server.latency:
+                    time.sleep(server.latency)
+                error = server._admit()
+                if error == 429:
+                    return self._reply(429, {'code': 20429, 'message': 'Too Many Requests'})
+                if error:
+                    return self._reply(500, {'code': 20500, 'message': 'Internal Server Error'})
+
+                message = server._create_message(form)
+                self._reply(201, {key: message[key] for key in ('sid', 'from', 'to', 'body', 'status')})
+
+            def _reply(self, status: int, payload: Dict):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+if __name__ == '__main__':
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else int(os.getenv('FAKE_TWILIO_PORT', 8099))
+    server = FakeTwilioServer(
+        port=port,
+        latency=float(os.getenv('FAKE_TWILIO_LATENCY', 0.05)),
+        error_rate=float(os.getenv('FAKE_TWILIO_ERROR_RATE', 0.0))
+    )
+    print(f"Fake Twilio listening on {server.url}")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
@@ -0,0 +1,393 @@
+"""
+Flight Verification - Provider lookups cached in the FlightVerification table
+Checks the table first, expires rows by flight status, coalesces concurrent
+lookups for the same flight and evicts expired rows in the background
+"""
+
+import os
+import abc
+import json
+import time
+import threading
+from datetime import datetime, timedelta, date
+from typing import Callable, Dict, Optional
+
+import requests
+
+from backend.database.models import FlightVerification, parse_flight_number
+
+
+# Cache lifetime by flight status. None = final state, never expires.
+STATUS_TTL_SECONDS = {
+    'landed': None,
+    'cancelled': None,
+    'diverted': None,
+    'active': 15 * 60,
+    'delayed': 10 * 60,
+    'scheduled': 5 * 60,
+    'not_found': 30 * 60,
+}
+DEFAULT_TTL_SECONDS = 5 * 60
+
+
+def normalize_flight_number(flight_number: str) -> str:
+    """'6e 234' / '6E234' -> '6E-234'; unparseable numbers are upper-cased as-is"""
+    code, number = parse_flight_number(flight_number.strip())
+    if code and number:
+        return f"{code}-{number}"
+    return flight_number.strip().upper()
+
+
+def normalize_flight_date(flight_date) -> datetime:
+    """Accept a date, datetime or 'YYYY-MM-DD' string and return midnight of that day"""
+    if isinstance(flight_date, str):
+        flight_date = datetime.strptime(flight_date[:10], '%Y-%m-%d')
+    if isinstance(flight_date, date):
+        return datetime(flight_date.year, flight_date.month, flight_date.day)
+    raise ValueError(f"Invalid flight date: {flight_date!r}")
+
+
+def _parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        # Stored naive, in the airport's local time as reported by the provider
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).replace(tzinfo=None)
+    except ValueError:
+        return None
+
+
+class FlightDataProvider(abc.ABC):
+    """
+    Source of flight status data
+
+    fetch() returns a dict with any of: status, scheduled_departure,
+    actual_departure, scheduled_arrival, actual_arrival (ISO strings),
+    delay_minutes, departure_airport, arrival_airport, raw. It returns
+    None when the provider has no record of the flight.
+    """
+
+    name = 'base'
+
+    @abc.abstractmethod
+    def fetch(self, flight_number: str, flight_date: datetime) -> Optional[Dict]:
+        """Look up a flight (number normalized as '6E-234', date at midnight)"""
+
+
+class AviationStackProvider(FlightDataProvider):
+    """AviationStack /flights endpoint"""
+
+    name = 'aviationstack'
+
+    def __init__(self, api_key: str, base_url: str = 'http://api.aviationstack.com/v1', timeout: float = 10):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def fetch(self, flight_number: str, flight_date: datetime) -> Optional[Dict]:
+        response = self.session.get(
+            f"{self.base_url}/flights",
+            params={
+                'access_key': self.api_key,
+                'flight_iata': flight_number.replace('-', ''),
+                'flight_date': flight_date.strftime('%Y-%m-%d')
+            },
+            timeout=self.timeout
+        )
+        response.raise_for_status()
+        payload = response.json()
+        if payload.get('error'):
+            raise RuntimeError(f"AviationStack error: {payload['error']}")
+
+        flights = payload.get('data') or []
+        if not flights:
+            return None
+
+        flight = flights[0]
+        departure = flight.get('departure') or {}
+        arrival = flight.get('arrival') or {}
+        return {
+            'status': flight.get('flight_status'),
+            'scheduled_departure': departure.get('scheduled'),
+            'actual_departure': departure.get('actual'),
+            'scheduled_arrival': arrival.get('scheduled'),
+            'actual_arrival': arrival.get('actual'),
+            'delay_minutes': arrival.get('delay') if arrival.get('delay') is not None else departure.get('delay'),
+            'departure_airport': departure.get('iata'),
+            'arrival_airport': arrival.get('iata'),
+            'raw': flight
+        }
+
+
+class FileFlightProvider(FlightDataProvider):
+    """
+    Local stand-in provider backed by a JSON file, for development and tests
+
+    The file holds a list of records in the fetch() format, each with
+    flight_number and flight_date ('YYYY-MM-DD') keys.
+    """
+
+    name = 'file'
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, encoding='utf-8') as f:
+            records = json.load(f)
+        self._records = {
+            (normalize_flight_number(r['flight_number']), normalize_flight_date(r['flight_date'])): r
+            for r in records
+        }
+        self.calls = 0
+
+    def fetch(self, flight_number: str, flight_date: datetime) -> Optional[Dict]:
+        self.calls += 1
+        record = self._records.get((flight_number, flight_date))
+        if record is None:
+            return None
+        return dict(record, raw=record)
+
+
+class _PendingLookup:
+    """A provider call in flight that other callers can wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class FlightVerificationService:
+    """
+    Read-through cache over the FlightVerification table
+
+    Concurrent lookups for the same flight/date within a process share one
+    provider call. Rows expire according to STATUS_TTL_SECONDS; a daemon
+    thread deletes expired rows every evict_interval seconds once the
+    service is first used.
+    """
+
+    def __init__(
+        self,
+        provider: FlightDataProvider,
+        session_factory: Optional[Callable] = None,
+        evict_interval: float = 600,
+        wait_timeout: float = 30
+    ):
+        if session_factory is None:
+            from backend.database.db_session import SessionLocal
+            session_factory = SessionLocal
+
+        self.provider = provider
+        self.session_factory = session_factory
+        self.evict_interval = evict_interval
+        self.wait_timeout = wait_timeout
+
+        self._lock = threading.Lock()
+        self._pending = {}  # (flight_number, flight_date) -> _PendingLookup
+        self._evictor = None
+        self._counters = {
+            'hits': 0,
+            'misses': 0,
+            'coalesced': 0,
+            'provider_errors': 0,
+            'evicted': 0
+        }
+
+    def verify(self, flight_number: str, flight_date) -> Optional[Dict]:
+        """
+        Return verified flight data, from the table if fresh, else the provider
+
+        Args:
+            flight_number: Flight number, e.g. '6E-234' or '6E234'
+            flight_date: Date of travel (date, datetime or 'YYYY-MM-DD')
+
+        Returns:
+            Verification dictionary (see FlightVerification.to_dict) with a
+            'source' of 'cache' or the provider name. Flights the provider
+            does not know have status 'not_found'.
+
+        Raises:
+            Exception: Provider errors are re-raised to every waiting caller
+        """
+        self._ensure_evictor()
+        key = (normalize_flight_number(flight_number), normalize_flight_date(flight_date))
+
+        cached = self._load(*key)
+        if cached is not None:
+            self._count('hits')
+            return dict(cached, source='cache')
+
+        with self._lock:
+            pending = self._pending.get(key)
+            leader = pending is None
+            if leader:
+                pending = self._pending[key] = _PendingLookup()
+                self._counters['misses'] += 1
+            else:
+                self._counters['coalesced'] += 1
+
+        if not leader:
+            if not pending.done.wait(self.wait_timeout):
+                raise TimeoutError(f"Timed out waiting for verification of {key[0]} on {key[1]:%Y-%m-%d}")
+            if pending.error is not None:
+                raise pending.error
+            return pending.result
+
+        try:
+            # A previous leader may have stored the row after our first check
+            cached = self._load(*key)
+            if cached is not None:
+                pending.result = dict(cached, source='cache')
+            else:
+                pending.result = dict(self._refresh(*key), source=self.provider.name)
+            return pending.result
+        except Exception as e:
+            self._count('provider_errors')
+            pending.error = e
+            raise
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+            pending.done.set()
+
+    def _load(self, flight_number: str, flight_date: datetime) -> Optional[Dict]:
+        session = self.session_factory()
+        try:
+            row = (
+                session.query(FlightVerification)
+                .filter(
+                    FlightVerification.flight_number == flight_number,
+                    FlightVerification.flight_date == flight_date
+                )
+                .order_by(FlightVerification.verified_at.desc())
+                .first()
+            )
+            if row is None or (row.expires_at is not None and row.expires_at <= datetime.utcnow()):
+                return None
+            return row.to_dict()
+        finally:
+            session.close()
+
+    def _refresh(self, flight_number: str, flight_date: datetime) -> Dict:
+        data = self.provider.fetch(flight_number, flight_date) or {'status': 'not_found'}
+        status = (data.get('status') or 'scheduled').lower()
+        ttl = STATUS_TTL_SECONDS.get(status, DEFAULT_TTL_SECONDS)
+        now = datetime.utcnow()
+
+        session = self.session_factory()
+        try:
+            row = (
+                session.query(FlightVerification)
+                .filter(
+                    FlightVerification.flight_number == flight_number,
+                    FlightVerification.flight_date == flight_date
+                )
+                .first()
+            )
+            if row is None:
+                row = FlightVerification(flight_number=flight_number, flight_date=flight_date)
+                session.add(row)
+
+            row.status = status
+            row.scheduled_departure = _parse_timestamp(data.get('scheduled_departure'))
+            row.actual_departure = _parse_timestamp(data.get('actual_departure'))
+            row.scheduled_arrival = _parse_timestamp(data.get('scheduled_arrival'))
+            row.actual_arrival = _parse_timestamp(data.get('actual_arrival'))
+            row.delay_minutes = data.get('delay_minutes')
+            row.departure_airport = data.get('departure_airport')
+            row.arrival_airport = data.get('arrival_airport')
+            row.raw_response = json.dumps(data['raw'], default=str) if data.get('raw') is not None else None
+            row.verified_at = now
+            row.expires_at = now + timedelta(seconds=ttl) if ttl is not None else None
+
+            session.commit()
+            return row.to_dict()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    def evict_expired(self) -> int:
+        """Delete expired rows; returns the number removed"""
+        session = self.session_factory()
+        try:
+            removed = (
+                session.query(FlightVerification)
+                .filter(
+                    FlightVerification.expires_at.isnot(None),
+                    FlightVerification.expires_at <= datetime.utcnow()
+                )
+                .delete(synchronize_session=False)
+            )
+            session.commit()
+            self._count('evicted', removed)
+            return removed
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    def _ensure_evictor(self):
+        if self._evictor is not None or not self.evict_interval:
+            return
+        with self._lock:
+            if self._evictor is None:
+                self._evictor = threading.Thread(
+                    target=self._evict_loop, name='flight-verification-evictor', daemon=True
+                )
+                self._evictor.start()
+
+    def _evict_loop(self):
+        while True:
+            time.sleep(self.evict_interval)
+            try:
+                self.evict_expired()
+            except Exception as e:
+                print(f"Flight verification eviction failed: {e}")
+
+    def _count(self, name: str, amount: int = 1):
+        with self._lock:
+            self._counters[name] += amount
+
+    def stats(self) -> Dict:
+        with self._lock:
+            counters = dict(self._counters)
+            counters['in_flight'] = len(self._pending)
+        lookups = counters['hits'] + counters['misses'] + counters['coalesced']
+        counters['provider'] = self.provider.name
+        counters['hit_rate'] = round(counters['hits'] / lookups, 3) if lookups else 0.0
+        return counters
+
+
+def create_provider_from_env() -> FlightDataProvider:
+    """Build the provider selected by FLIGHT_DATA_PROVIDER ('aviationstack' or 'file')"""
+    provider = os.getenv('FLIGHT_DATA_PROVIDER', 'aviationstack').lower()
+    if provider == 'file':
+        default_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../data/flights_sample.json'))
+        return FileFlightProvider(os.getenv('FLIGHT_DATA_FILE', default_path))
+
+    return AviationStackProvider(
+        api_key=os.getenv('AVIATIONSTACK_API_KEY', ''),
+        base_url=os.getenv('AVIATIONSTACK_BASE_URL', 'http://api.aviationstack.com/v1'),
+        timeout=float(os.getenv('FLIGHT_DATA_TIMEOUT', 10))
+    )
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_verification_service() -> FlightVerificationService:
+    """Return the process-wide verification service, creating it on first use"""
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = FlightVerificationService(
+                    create_provider_from_env(),
+                    evict_interval=float(os.getenv('FLIGHT_VERIFICATION_EVICT_INTERVAL', 600))
+                )
+    return _service
@@ -0,0 +1,227 @@
+"""
+Idempotency - Run a webhook once per provider message id
+Duplicate deliveries get the first delivery's response; duplicates that
+arrive while it is still running wait for it instead of re-running
+"""
+
+import os
+import time
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional
+
+from sqlalchemy.exc import IntegrityError
+
+from backend.database.models import WebhookDelivery
+from backend.utils.cache import MemoryCache
+
+
+class _InFlight:
+    """A delivery being processed in this process"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.response = None
+
+
+class IdempotencyStore:
+    """
+    Records processed message ids with a TTL
+
+    Within a process, duplicates wait on an in-flight event and completed
+    responses are served from memory. Across workers, the first delivery
+    claims the id with a unique insert into webhook_deliveries. Later
+    deliveries read the stored response, polling while it is still being
+    processed. A claim whose TTL has lapsed (e.g. its worker died) can be
+    taken over.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = 600,
+        wait_timeout: float = 10,
+        poll_interval: float = 0.1,
+        session_factory: Optional[Callable] = None
+    ):
+        if session_factory is None:
+            from backend.database.db_session import SessionLocal
+            session_factory = SessionLocal
+
+        self.ttl_seconds = ttl_seconds
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+        self.session_factory = session_factory
+
+        self.completed = MemoryCache(max_entries=10000, ttl_seconds=ttl_seconds)
+        self._in_flight = {}  # key -> _InFlight
+        self._lock = threading.Lock()
+        self._counters = {
+            'processed': 0,
+            'duplicates_cached': 0,
+            'duplicates_waited': 0,
+            'duplicates_timed_out': 0
+        }
+
+    @classmethod
+    def from_env(cls, prefix: str) -> 'IdempotencyStore':
+        prefix = prefix.upper()
+        return cls(
+            ttl_seconds=float(os.getenv(f'{prefix}_IDEMPOTENCY_TTL', 600)),
+            wait_timeout=float(os.getenv(f'{prefix}_IDEMPOTENCY_WAIT', 10))
+        )
+
+    def run_once(self, key: Optional[str], fn: Callable[[], str], timeout_response: str = '') -> str:
+        """
+        Run fn for the first delivery of key; return the same response for duplicates
+
+        Args:
+            key: Provider message id (e.g. Twilio MessageSid); None disables de-duplication
+            fn: Produces the response body for this delivery
+            timeout_response: Returned to a duplicate whose original is still
+                running after wait_timeout; fn is never re-run for it
+
+        Returns:
+            Response body
+        """
+        if not key:
+            return fn()
+
+        cached = self.completed.get(key)
+        if cached is not None:
+            self._count('duplicates_cached')
+            return cached
+
+        with self._lock:
+            in_flight = self._in_flight.get(key)
+            leader = in_flight is None
+            if leader:
+                in_flight = self._in_flight[key] = _InFlight()
+
+        if not leader:
+            if in_flight.done.wait(self.wait_timeout) and in_flight.response is not None:
+                self._count('duplicates_waited')
+                return in_flight.response
+            self._count('duplicates_timed_out')
+            return timeout_response
+
+        try:
+            if not self._claim(key):
+                # Another worker has (or had) this delivery
+                response = self._wait_for_stored(key)
+                if response is None:
+                    self._count('duplicates_timed_out')
+                    return timeout_response
+                self._count('duplicates_cached')
+                in_flight.response = response
+                return response
+
+            try:
+                response = fn()
+            except Exception:
+                self._release(key)  # Let the provider's retry run it again
+                raise
+
+            self._store(key, response)
+            self.completed.set(key, response)
+            in_flight.response = response
+            return response
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+            in_flight.done.set()
+
+    def _claim(self, key: str) -> bool:
+        now = datetime.utcnow()
+        expires_at = now + timedelta(seconds=self.ttl_seconds)
+
+        session = self.session_factory()
+        try:
+            session.add(WebhookDelivery(message_sid=key, status='processing', created_at=now, expires_at=expires_at))
+            try:
+                session.commit()
+                return True
+            except IntegrityError:
+                session.rollback()
+
+            # Take over a claim whose TTL has lapsed
+            taken = (
+                session.query(WebhookDelivery)
+                .filter(WebhookDelivery.message_sid == key, WebhookDelivery.expires_at <= now)
+                .update(
+                    {'status': 'processing', 'response': None, 'created_at': now, 'expires_at': expires_at},
+                    synchronize_session=False
+                )
+            )
+            session.commit()
+            return taken == 1
+        finally:
+            session.close()
+
+    def _wait_for_stored(self, key: str) -> Optional[str]:
+        deadline = time.monotonic() + self.wait_timeout
+        while True:
+            session = self.session_factory()
+            try:
+                row = session.query(WebhookDelivery).filter(WebhookDelivery.message_sid == key).first()
+                if row is not None and row.status == 'done':
+                    self.completed.set(key, row.response)
+                    return row.response
+            finally:
+                session.close()
+
+            if time.monotonic() >= deadline:
+                return None
+            time.sleep(self.poll_interval)
+
+    def _store(self, key: str, response: str):
+        session = self.session_factory()
+        try:
+            (
+                session.query(WebhookDelivery)
+                .filter(WebhookDelivery.message_sid == key)
+                .update({'status': 'done', 'response': response}, synchronize_session=False)
+            )
+            session.commit()
+        finally:
+            session.close()
+
+        if self._count('processed') % 100 == 0:
+            self.purge_expired()
+
+    def _release(self, key: str):
+        session = self.session_factory()
+        try:
+            (
+                session.query(WebhookDelivery)
+                .filter(WebhookDelivery.message_sid == key, WebhookDelivery.status == 'processing')
+                .delete(synchronize_session=False)
+            )
+            session.commit()
+        finally:
+            session.close()
+
+    def purge_expired(self) -> int:
+        """Delete expired delivery records; returns the number removed"""
+        session = self.session_factory()
+        try:
+            removed = (
+                session.query(WebhookDelivery)
+                .filter(WebhookDelivery.expires_at <= datetime.utcnow())
+                .delete(synchronize_session=False)
+            )
+            session.commit()
+            return removed
+        finally:
+            session.close()
+
+    def _count(self, name: str) -> int:
+        with self._lock:
+            self._counters[name] += 1
+            return self._counters[name]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            counters = dict(self._counters)
+            counters['in_flight'] = len(self._in_flight)
+        counters['remembered'] = len(self.completed)
+        return counters
@@ -0,0 +1,483 @@
+"""
+Job Queue - Durable background jobs in the jobs table
+Jobs are claimed with SELECT ... FOR UPDATE SKIP LOCKED where the database
+supports it (conditional-update leases elsewhere), retried with backoff and
+dead-lettered after max_attempts; any number of worker processes can share
+one queue
+"""
+
+import os
+import json
+import time
+import random
+import signal
+import socket
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional
+
+from sqlalchemy import func, select, update
+
+from backend.database.models import Job
+
+
+# Databases whose SELECT ... FOR UPDATE supports SKIP LOCKED
+SKIP_LOCKED_DIALECTS = ('postgresql', 'mysql', 'mariadb')
+
+# Extra rows read per claim where rows cannot be locked, in case other
+# workers take the first ones
+SPARE_CANDIDATES = 8
+
+
+class PermanentJobError(Exception):
+    """A job failed in a way retrying cannot fix; it is dead-lettered at once"""
+
+
+class JobQueue:
+    """
+    Producer/consumer API over the jobs table
+
+    A job is claimable when its status is 'queued' (or 'running' with an
+    expired lease) and run_at has passed. Claiming sets status 'running',
+    bumps attempts and moves run_at to the end of the lease, so a job whose
+    worker died is picked up again once the lease runs out; leases must
+    therefore be longer than the slowest job. complete() and fail() only
+    apply while the caller still holds the lease.
+    """
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable] = None,
+        lease_seconds: float = 300,
+        max_attempts: int = 5,
+        backoff_base: float = 5,
+        backoff_max: float = 600
+    ):
+        """
+        Args:
+            session_factory: Session factory (defaults to SessionLocal)
+            lease_seconds: How long a claimed job stays with its worker
+            max_attempts: Default attempts before a job is dead-lettered
+            backoff_base: First retry delay in seconds (doubles per attempt, full jitter)
+            backoff_max: Cap on the retry delay
+        """
+        if session_factory is None:
+            from backend.database.db_session import SessionLocal
+            session_factory = SessionLocal
+
+        self.session_factory = session_factory
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self._lock = threading.Lock()
+        self._counters = {
+            'enqueued': 0,
+            'claimed': 0,
+            'succeeded': 0,
+            'retried': 0,
+            'dead': 0,
+            'lost_leases': 0
+        }
+
+    @classmethod
+    def from_env(cls) -> 'JobQueue':
+        return cls(
+            lease_seconds=float(os.getenv('JOB_LEASE_SECONDS', 300)),
+            max_attempts=int(os.getenv('JOB_MAX_ATTEMPTS', 5)),
+            backoff_base=float(os.getenv('JOB_BACKOFF_BASE', 5)),
+            backoff_max=float(os.getenv('JOB_BACKOFF_MAX', 600))
+        )
+
+    def enqueue(self, kind: str, payload: Optional[Dict] = None, priority: int = 0,
+                claim_id: Optional[int] = None, delay_seconds: float = 0,
+                max_attempts: Optional[int] = None, session=None) -> int:
+        """
+        Add a job
+
+        Args:
+            kind: Handler name
+            payload: JSON-serializable handler arguments
+            priority: Higher runs first
+            claim_id: Claim the job belongs to, if any
+            delay_seconds: Do not run before this many seconds from now
+            max_attempts: Override the queue default
+            session: Add the job in this session's transaction (the caller
+                     commits), so it exists only if the surrounding change does
+
+        Returns:
+            Job id
+        """
+        job = Job(
+            kind=kind,
+            payload=json.dumps(payload or {}),
+            priority=priority,
+            status='queued',
+            max_attempts=max_attempts or self.max_attempts,
+            run_at=datetime.utcnow() + timedelta(seconds=delay_seconds),
+            claim_id=claim_id
+        )
+        if session is not None:
+            session.add(job)
+            session.flush()
+            job_id = job.id
+        else:
+            own_session = self.session_factory()
+            try:
+                own_session.add(job)
+                own_session.commit()
+                job_id = job.id
+            except Exception:
+                own_session.rollback()
+                raise
+            finally:
+                own_session.close()
+
+        self._count('enqueued')
+        return job_id
+
+    def enqueue_many(self, kind: str, payloads: List[Dict], priority: int = 0,
+                     claim_ids: Optional[List[int]] = None, session=None) -> int:
+        """
+        Add one job per payload in a single batched INSERT
+
+        Args:
+            kind: Handler name
+            payloads: JSON-serializable handler arguments, one per job
+            priority: Higher runs first
+            claim_ids: Claim each job belongs to (parallel to payloads)
+            session: Add the jobs in this session's transaction (the caller commits)
+
+        Returns:
+            Number of jobs added
+        """
+        if not payloads:
+            return 0
+        now = datetime.utcnow()
+        claim_ids = claim_ids or [None] * len(payloads)
+        rows = [
+            {
+                'kind': kind,
+                'payload': json.dumps(payload),
+                'priority': priority,
+                'status': 'queued',
+                'attempts': 0,
+                'max_attempts': self.max_attempts,
+                'run_at': now,
+                'claim_id': claim_id,
+                'created_at': now,
+                'updated_at': now
+            }
+            for payload, claim_id in zip(payloads, claim_ids)
+        ]
+
+        own_session = session is None
+        session = session or self.session_factory()
+        try:
+            session.execute(Job.__table__.insert(), rows)
+            if own_session:
+                session.commit()
+        except Exception:
+            if own_session:
+                session.rollback()
+            raise
+        finally:
+            if own_session:
+                session.close()
+
+        self._count('enqueued', len(rows))
+        return len(rows)
+
+    def claim(self, worker_id: str, kinds: Optional[Iterable[str]] = None, limit: int = 1) -> List[Dict]:
+        """
+        Lease up to limit due jobs to worker_id, highest priority first
+
+        Returns:
+            Claimed jobs as dicts (id, kind, payload, priority, attempts,
+            max_attempts, claim_id)
+        """
+        now = datetime.utcnow()
+        lease_until = now + timedelta(seconds=self.lease_seconds)
+        claimable = [Job.status.in_(('queued', 'running')), Job.run_at <= now]
+        if kinds is not None:
+            claimable.append(Job.kind.in_(list(kinds)))
+        lease = {
+            'status': 'running',
+            'attempts': Job.attempts + 1,
+            'run_at': lease_until,
+            'locked_by': worker_id,
+            'locked_at': now
+        }
+
+        session = self.session_factory()
+        try:
+            candidates = (
+                select(Job.id)
+                .where(*claimable)
+                .order_by(Job.priority.desc(), Job.run_at, Job.id)
+                .limit(limit)
+            )
+            if session.get_bind().dialect.name in SKIP_LOCKED_DIALECTS:
+                # Rows locked by other workers' claims are skipped, not waited on
+                claimed_ids = list(session.execute(candidates.with_for_update(skip_locked=True)).scalars())
+                if claimed_ids:
+                    session.execute(
+                        update(Job).where(Job.id.in_(claimed_ids)).values(**lease),
+                        execution_options={'synchronize_session': False}
+                    )
+            else:
+                # No row locks (SQLite): each candidate is taken with an UPDATE
+                # that re-checks it is still claimable. A worker that lost
+                # the race updates nothing and tries the next spare candidate
+                claimed_ids = []
+                for job_id in session.execute(candidates.limit(limit + SPARE_CANDIDATES)).scalars().all():
+                    result = session.execute(
+                        update(Job).where(Job.id == job_id, *claimable).values(**lease),
+                        execution_options={'synchronize_session': False}
+                    )
+                    if result.rowcount:
+                        claimed_ids.append(job_id)
+                        if len(claimed_ids) == limit:
+                            break
+            session.commit()
+
+            if not claimed_ids:
+                return []
+            rows = session.execute(select(Job).where(Job.id.in_(claimed_ids))).scalars().all()
+            jobs = [
+                {'id': row.id, 'kind': row.kind, 'payload': json.loads(row.payload or '{}'),
+                 'priority': row.priority, 'attempts': row.attempts,
+                 'max_attempts': row.max_attempts, 'claim_id': row.claim_id}
+                for row in rows
+            ]
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+        jobs.sort(key=lambda job: (-job['priority'], job['id']))
+        self._count('claimed', len(jobs))
+        return jobs
+
+    def complete(self, job: Dict, worker_id: str) -> bool:
+        """Mark a claimed job done; False if the lease was lost meanwhile"""
+        done = self._finish(job['id'], worker_id, {
+            'status': 'succeeded',
+            'finished_at': datetime.utcnow(),
+            'locked_by': None
+        })
+        self._count('succeeded' if done else 'lost_leases')
+        return done
+
+    def fail(self, job: Dict, worker_id: str, error: Exception) -> str:
+        """
+        Record a failed attempt: retry later with backoff, or dead-letter
+
+        Returns:
+            The job's new status ('queued' or 'dead'), or 'lost' if the
+            lease had already passed to another worker
+        """
+        message = f"{type(error).__name__}: {error}"[:2000]
+        retry = not isinstance(error, PermanentJobError) and job['attempts'] < job['max_attempts']
+        if retry:
+            delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** job['attempts']))
+            values = {
+                'status': 'queued',
+                'run_at': datetime.utcnow() + timedelta(seconds=delay),
+                'last_error': message,
+                'locked_by': None
+            }
+        else:
+            values = {
+                'status': 'dead',
+                'finished_at': datetime.utcnow(),
+                'last_error': message,
+                'locked_by': None
+            }
+
+        if not self._finish(job['id'], worker_id, values):
+            self._count('lost_leases')
+            return 'lost'
+        if retry:
+            self._count('retried')
+            return 'queued'
+        self._count('dead')
+        print(f"[jobs] dead-lettered job {job['id']} ({job['kind']}) after {job['attempts']} attempt(s): {message}")
+        return 'dead'
+
+    def _finish(self, job_id: int, worker_id: str, values: Dict) -> bool:
+        session = self.session_factory()
+        try:
+            result = session.execute(
+                update(Job)
+                .where(Job.id == job_id, Job.status == 'running', Job.locked_by == worker_id)
+                .values(**values),
+                execution_options={'synchronize_session': False}
+            )
+            session.commit()
+            return bool(result.rowcount)
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    def requeue_dead(self, kind: Optional[str] = None, job_ids: Optional[List[int]] = None) -> int:
+        """
+        Put dead-lettered jobs back on the queue with a fresh attempt count
+
+        Returns:
+            Number of jobs requeued
+        """
+        conditions = [Job.status == 'dead']
+        if kind:
+            conditions.append(Job.kind == kind)
+        if job_ids:
+            conditions.append(Job.id.in_(job_ids))
+        session = self.session_factory()
+        try:
+            result = session.execute(
+                update(Job).where(*conditions).values(
+                    status='queued', attempts=0, run_at=datetime.utcnow(), finished_at=None
+                ),
+                execution_options={'synchronize_session': False}
+            )
+            session.commit()
+            return result.rowcount
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    def counts(self) -> Dict[str, int]:
+        """Jobs per status, from the table (one grouped query)"""
+        session = self.session_factory()
+        try:
+            rows = session.execute(select(Job.status, func.count()).group_by(Job.status)).all()
+            return {status: count for status, count in rows}
+        finally:
+            session.close()
+
+    def _count(self, name: str, amount: int = 1):
+        with self._lock:
+            self._counters[name] += amount
+
+    def stats(self) -> Dict:
+        with self._lock:
+            counters = dict(self._counters)
+        try:
+            counters['jobs'] = self.counts()
+        except Exception as e:
+            counters['jobs'] = {'error': str(e)}
+        return counters
+
+
+class JobWorker:
+    """
+    Runs job handlers in a loop: claim, run, complete or fail
+
+    Handlers are called as handler(payload, job) and signal failure by
+    raising; PermanentJobError dead-letters the job immediately, anything
+    else is retried until max_attempts. Each of the concurrency threads
+    claims one job at a time, so a process never holds leases it is not
+    working on. Run more processes (python -m backend.worker) to scale out.
+    """
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        handlers: Dict[str, Callable[[Dict, Dict], None]],
+        concurrency: int = 1,
+        poll_interval: float = 1.0,
+        worker_id: Optional[str] = None
+    ):
+        self.queue = queue
+        self.handlers = handlers
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self._stopped = threading.Event()
+
+    def run_once(self, thread_id: str = None) -> bool:
+        """
+        Claim and run one job
+
+        Returns:
+            True if a job was run (successfully or not)
+        """
+        worker_id = f"{self.worker_id}:{thread_id}" if thread_id else self.worker_id
+        jobs = self.queue.claim(worker_id, kinds=self.handlers.keys(), limit=1)
+        if not jobs:
+            return False
+
+        job = jobs[0]
+        started = time.perf_counter()
+        try:
+            if job['attempts'] > job['max_attempts']:
+                # Claimed again after its lease ran out on every attempt
+                raise PermanentJobError(f"lease expired on all {job['max_attempts']} attempts")
+            self.handlers[job['kind']](job['payload'], job)
+        except Exception as e:
+            if self.queue.fail(job, worker_id, e) == 'queued':
+                print(f"[jobs] {job['kind']} #{job['id']} failed (attempt {job['attempts']}), will retry: {e}")
+        else:
+            self.queue.complete(job, worker_id)
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            if elapsed_ms > self.queue.lease_seconds * 1000 * 0.8:
+                print(f"[jobs] {job['kind']} #{job['id']} took {elapsed_ms:.0f} ms, close to the lease")
+        return True
+
+    def _loop(self, thread_id: str, drain: bool = False):
+        while not self._stopped.is_set():
+            try:
+                ran = self.run_once(thread_id)
+            except Exception as e:
+                print(f"[jobs] claim failed: {e}")
+                ran = False
+            if not ran:
+                if drain:
+                    return
+                self._stopped.wait(self.poll_interval)
+
+    def run(self, drain: bool = False):
+        """
+        Process jobs until stop() (or SIGTERM/SIGINT in the main thread)
+
+        Args:
+            drain: Return once no job is due instead of polling forever
+        """
+        if threading.current_thread() is threading.main_thread():
+            for sig in (signal.SIGTERM, signal.SIGINT):
+                signal.signal(sig, lambda signum, frame: self.stop())
+
+        threads = [
+            threading.Thread(target=self._loop, args=(str(i), drain), name=f'job-worker-{i}', daemon=True)
+            for i in range(self.concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        # Jobs in progress finish before the process exits
+        while any(thread.is_alive() for thread in threads):
+            for thread in threads:
+                thread.join(0.5)
+
+    def stop(self):
+        self._stopped.set()
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> JobQueue:
+    """Return the shared job queue configured from the environment"""
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                _queue = JobQueue.from_env()
+    return _queue
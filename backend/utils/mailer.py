@@ -0,0 +1,95 @@
+"""
+Mailer - Claim submission emails over SMTP
+Configured from the SMTP_* settings; errors are classified as retryable or
+permanent so the job queue knows whether to try again
+"""
+
+import os
+import smtplib
+import socket
+from email.message import EmailMessage
+from email.utils import formataddr
+from typing import Optional
+
+
+class MailError(Exception):
+    """The email could not be sent"""
+
+    def __init__(self, message: str, retryable: bool):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+class SmtpMailer:
+    """Sends one email per call over a fresh STARTTLS connection"""
+
+    def __init__(self, server: str, port: int, username: Optional[str], password: Optional[str],
+                 from_name: str = 'FlyClaim AI', timeout: float = 30):
+        self.server = server
+        self.port = port
+        self.username = username
+        self.password = password
+        self.from_name = from_name
+        self.timeout = timeout
+
+    @classmethod
+    def from_env(cls) -> 'SmtpMailer':
+        return cls(
+            server=os.getenv('SMTP_SERVER', 'smtp.gmail.com'),
+            port=int(os.getenv('SMTP_PORT', 587)),
+            username=os.getenv('SMTP_EMAIL'),
+            password=os.getenv('SMTP_PASSWORD'),
+            from_name=os.getenv('SMTP_FROM_NAME', 'FlyClaim AI'),
+            timeout=float(os.getenv('SMTP_TIMEOUT', 30))
+        )
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.server and self.username and self.password)
+
+    def message_id_for(self, key: str) -> str:
+        """Deterministic Message-ID for an email identified by key (e.g. a claim reference)"""
+        return f"<{key}@{(self.username or 'flyclaim.local').split('@')[-1]}>"
+
+    def send(self, to: str, subject: str, body: str, cc: Optional[str] = None,
+             attachment_path: Optional[str] = None, message_id: Optional[str] = None) -> str:
+        """
+        Send an email, optionally with a PDF attachment
+
+        Args:
+            message_id: Message-ID header to use (random if not given); a
+                        fixed one lets recipients spot a repeated email
+
+        Returns:
+            The Message-ID header of the sent email
+
+        Raises:
+            MailError: retryable for connection problems and 4xx replies,
+                       permanent for rejected recipients, auth and 5xx replies
+        """
+        message = EmailMessage()
+        message['From'] = formataddr((self.from_name, self.username))
+        message['To'] = to
+        if cc:
+            message['Cc'] = cc
+        message['Subject'] = subject
+        message['Message-ID'] = message_id or self.message_id_for(os.urandom(12).hex())
+        message.set_content(body)
+        if attachment_path:
+            with open(attachment_path, 'rb') as f:
+                message.add_attachment(f.read(), maintype='application', subtype='pdf',
+                                       filename=os.path.basename(attachment_path))
+
+        try:
+            with smtplib.SMTP(self.server, self.port, timeout=self.timeout) as smtp:
+                smtp.starttls()
+                smtp.login(self.username, self.password)
+                smtp.send_message(message)
+        except (smtplib.SMTPAuthenticationError, smtplib.SMTPRecipientsRefused,
+                smtplib.SMTPSenderRefused) as e:
+            raise MailError(f"SMTP rejected the message: {e}", retryable=False)
+        except smtplib.SMTPResponseException as e:
+            raise MailError(f"SMTP error {e.smtp_code}: {e.smtp_error!r}", retryable=400 <= e.smtp_code < 500)
+        except (smtplib.SMTPException, socket.timeout, OSError) as e:
+            raise MailError(f"SMTP unavailable: {e}", retryable=True)
+        return message['Message-ID']
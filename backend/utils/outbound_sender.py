@@ -0,0 +1,571 @@
+"""
+Outbound Sender - Persistent, rate-limited WhatsApp delivery through Twilio
+Replies are queued in the outbound_messages table and sent by a background
+dispatcher that paces requests with a token bucket, reuses HTTP connections
+and retries transient failures with backoff
+"""
+
+import os
+import time
+import random
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from sqlalchemy import bindparam, func
+
+from backend.database.models import MessageStatusEvent, OutboundMessage
+from backend.utils.percentiles import percentiles
+
+
+# Status progression; callbacks may arrive out of order and never move a
+# message backwards. failed/undelivered are final.
+STATUS_RANK = {'queued': 0, 'sending': 1, 'sent': 2, 'delivered': 3, 'read': 4}
+FINAL_STATUSES = ('failed', 'undelivered')
+
+
+class TwilioSendError(Exception):
+    """Twilio rejected a message or could not be reached"""
+
+    def __init__(self, message: str, retryable: bool, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.retryable = retryable
+        self.status_code = status_code
+
+
+class TokenBucket:
+    """
+    Token bucket rate limiter
+
+    Refills at rate tokens per second up to capacity; acquire() blocks
+    until a token is available.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """
+        Take one token, waiting for a refill if needed
+
+        Returns:
+            True when a token was taken, False if timeout passed first
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+
+            if deadline is not None:
+                if now + wait > deadline:
+                    return False
+            time.sleep(wait)
+
+
+class TwilioRestClient:
+    """
+    Minimal Twilio Messages API client on a pooled requests Session
+
+    base_url can point at a local stand-in server (see fake_twilio.py).
+    """
+
+    def __init__(self, account_sid: str, auth_token: str, base_url: str = 'https://api.twilio.com',
+                 timeout: float = 10, pool_size: int = 10):
+        self.account_sid = account_sid
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.auth = (account_sid, auth_token)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def send(self, from_number: str, to_number: str, body: str, status_callback: Optional[str] = None) -> str:
+        """
+        Create a message
+
+        Returns:
+            Twilio message SID
+
+        Raises:
+            TwilioSendError: retryable for network errors, 429 and 5xx
+        """
+        data = {'From': from_number, 'To': to_number, 'Body': body}
+        if status_callback:
+            data['StatusCallback'] = status_callback
+
+        try:
+            response = self.session.post(
+                f"{self.base_url}/2010-04-01/Accounts/{self.account_sid}/Messages.json",
+                data=data,
+                timeout=self.timeout
+            )
+        except requests.RequestException as e:
+            raise TwilioSendError(f"Twilio request failed: {e}", retryable=True)
+
+        if response.status_code >= 400:
+            try:
+                detail = response.json().get('message', response.text)
+            except ValueError:
+                detail = response.text
+            retryable = response.status_code == 429 or response.status_code >= 500
+            raise TwilioSendError(f"Twilio {response.status_code}: {detail}", retryable, response.status_code)
+
+        return response.json()['sid']
+
+
+class OutboundQueue:
+    """
+    Database-backed outbound message queue with a background dispatcher
+
+    enqueue() only writes a row, so the caller never waits on Twilio. The
+    dispatcher claims due rows in batches with a conditional update (safe
+    with several app workers), sends them on a small thread pool paced by
+    the token bucket, and reschedules transient failures with full-jitter
+    exponential backoff. A claim doubles as a lease: a row stuck in
+    'sending' (its worker died) becomes due again after lease_seconds.
+    Call start() when a worker boots, so rows left queued or leased by an
+    earlier process are sent without waiting for a new enqueue().
+    """
+
+    def __init__(
+        self,
+        client: Optional[TwilioRestClient],
+        from_number: str,
+        status_callback_url: Optional[str] = None,
+        rate_per_second: float = 10,
+        burst: float = 10,
+        send_concurrency: int = 4,
+        batch_size: int = 50,
+        max_attempts: int = 5,
+        backoff_base: float = 2,
+        backoff_max: float = 300,
+        lease_seconds: float = 120,
+        poll_interval: float = 1.0,
+        session_factory: Optional[Callable] = None
+    ):
+        if session_factory is None:
+            from backend.database.db_session import SessionLocal
+            session_factory = SessionLocal
+
+        self.client = client
+        self.from_number = from_number
+        self.status_callback_url = status_callback_url
+        self.bucket = TokenBucket(rate_per_second, burst)
+        self.send_concurrency = send_concurrency
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.session_factory = session_factory
+
+        self._executor = ThreadPoolExecutor(max_workers=send_concurrency, thread_name_prefix='whatsapp-send')
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._send_latencies = deque(maxlen=1000)
+        self._delivery_latencies = deque(maxlen=1000)
+        self._counters = {
+            'enqueued': 0,
+            'sent': 0,
+            'retried': 0,
+            'failed': 0,
+            'delivered': 0,
+            'status_callbacks': 0,
+            'early_callbacks': 0
+        }
+
+    @classmethod
+    def from_env(cls) -> 'OutboundQueue':
+        account_sid = os.getenv('TWILIO_ACCOUNT_SID')
+        auth_token = os.getenv('TWILIO_AUTH_TOKEN')
+        client = None
+        if account_sid and auth_token:
+            client = TwilioRestClient(
+                account_sid,
+                auth_token,
+                base_url=os.getenv('TWILIO_API_BASE_URL', 'https://api.twilio.com'),
+                timeout=float(os.getenv('TWILIO_TIMEOUT', 10))
+            )
+        return cls(
+            client,
+            from_number=os.getenv('TWILIO_WHATSAPP_NUMBER'),
+            status_callback_url=os.getenv('TWILIO_STATUS_CALLBACK_URL') or None,
+            rate_per_second=float(os.getenv('TWILIO_MESSAGES_PER_SECOND', 10)),
+            burst=float(os.getenv('TWILIO_MESSAGES_BURST', 10)),
+            send_concurrency=int(os.getenv('TWILIO_SEND_CONCURRENCY', 4)),
+            max_attempts=int(os.getenv('TWILIO_SEND_MAX_ATTEMPTS', 5))
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.client is not None
+
+    def enqueue(self, to_number: str, body: str) -> int:
+        """
+        Queue a message for delivery
+
+        Args:
+            to_number: Recipient (format: whatsapp:+919876543210)
+            body: Message text
+
+        Returns:
+            Queue entry id
+        """
+        session = self.session_factory()
+        try:
+            row = OutboundMessage(to_number=to_number, body=body, status='queued', next_attempt_at=datetime.utcnow())
+            session.add(row)
+            session.commit()
+            message_id = row.id
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+        self._count('enqueued')
+        self.start()
+        self._wake.set()
+        return message_id
+
+    def start(self):
+        """Start the dispatcher thread if it is not running (no-op without a Twilio client)"""
+        if not self.enabled:
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._run, name='whatsapp-dispatcher', daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5):
+        self._stopped.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                dispatched = self.dispatch_once()
+            except Exception as e:
+                print(f"[outbound] dispatch failed: {e}")
+                dispatched = 0
+            if not dispatched:
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+
+    def dispatch_once(self) -> int:
+        """
+        Claim and send one batch of due messages
+
+        Returns:
+            Number of messages attempted
+        """
+        if not self.enabled:
+            return 0
+        batch = self._claim_batch()
+        if batch:
+            list(self._executor.map(self._deliver, batch))
+        return len(batch)
+
+    def _claim_batch(self) -> List[Dict]:
+        now = datetime.utcnow()
+        lease_until = now + timedelta(seconds=self.lease_seconds)
+        session = self.session_factory()
+        try:
+            candidates = (
+                session.query(OutboundMessage.id, OutboundMessage.status)
+                .filter(
+                    OutboundMessage.status.in_(('queued', 'sending')),
+                    OutboundMessage.next_attempt_at <= now
+                )
+                .order_by(OutboundMessage.next_attempt_at, OutboundMessage.id)
+                .limit(self.batch_size)
+                .all()
+            )
+
+            claimed_ids = []
+            for message_id, status in candidates:
+                claimed = (
+                    session.query(OutboundMessage)
+                    .filter(
+                        OutboundMessage.id == message_id,
+                        OutboundMessage.status == status,
+                        OutboundMessage.next_attempt_at <= now
+                    )
+                    .update(
+                        {
+                            'status': 'sending',
+                            'attempts': OutboundMessage.attempts + 1,
+                            'next_attempt_at': lease_until
+                        },
+                        synchronize_session=False
+                    )
+                )
+                if claimed:
+                    claimed_ids.append(message_id)
+            session.commit()
+
+            if not claimed_ids:
+                return []
+            rows = (
+                session.query(OutboundMessage)
+                .filter(OutboundMessage.id.in_(claimed_ids))
+                .order_by(OutboundMessage.id)
+                .all()
+            )
+            return [
+                {'id': row.id, 'to_number': row.to_number, 'body': row.body,
+                 'attempts': row.attempts, 'created_at': row.created_at}
+                for row in rows
+            ]
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    def _deliver(self, message: Dict):
+        self.bucket.acquire()
+        try:
+            sid = self.client.send(self.from_number, message['to_number'], message['body'], self.status_callback_url)
+        except TwilioSendError as e:
+            self._record_failure(message, e)
+            return
+
+        now = datetime.utcnow()
+        self._update(message['id'], {'status': 'sent', 'provider_sid': sid, 'sent_at': now, 'last_error': None})
+        with self._lock:
+            self._counters['sent'] += 1
+            self._send_latencies.append((now - message['created_at']).total_seconds())
+        self._apply_early_status(sid)
+
+    def _record_failure(self, message: Dict, error: TwilioSendError):
+        if error.retryable and message['attempts'] < self.max_attempts:
+            delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** message['attempts']))
+            self._update(message['id'], {
+                'status': 'queued',
+                'next_attempt_at': datetime.utcnow() + timedelta(seconds=delay),
+                'last_error': str(error)
+            })
+            self._count('retried')
+        else:
+            self._update(message['id'], {'status': 'failed', 'last_error': str(error)})
+            self._count('failed')
+            print(f"[outbound] giving up on message {message['id']} to {message['to_number']}: {error}")
+
+    def _update(self, message_id: int, values: Dict):
+        session = self.session_factory()
+        try:
+            (
+                session.query(OutboundMessage)
+                .filter(OutboundMessage.id == message_id)
+                .update(values, synchronize_session=False)
+            )
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    def record_status(self, provider_sid: str, status: str, error_code: Optional[str] = None,
+                      received_at: Optional[datetime] = None) -> bool:
+        """
+        Apply one Twilio status callback to its queue entry (see apply_statuses)
+
+        Args:
+            provider_sid: MessageSid from the callback
+            status: MessageStatus (sent, delivered, read, failed, undelivered, ...)
+            error_code: ErrorCode from the callback, if any
+            received_at: When the callback arrived (defaults to now)
+
+        Returns:
+            True if a queue entry was updated
+        """
+        return self.apply_statuses([{
+            'message_sid': provider_sid,
+            'status': status,
+            'error_code': error_code,
+            'received_at': received_at or datetime.utcnow()
+        }]) > 0
+
+    def apply_statuses(self, events: List[Dict]) -> int:
+        """
+        Apply a batch of Twilio status callbacks to their queue entries
+
+        Callbacks reach here after StatusEventBuffer has stored them in
+        message_status_events. One that beats the dispatcher's write of its
+        SID matches no entry yet; whichever worker sends the message reads
+        it back from that table once the SID is stored (_apply_early_status).
+
+        Args:
+            events: Dicts with message_sid, status, error_code and received_at
+
+        Returns:
+            Number of queue entries updated
+        """
+        with self._lock:
+            self._counters['status_callbacks'] += len(events)
+        return self._apply_statuses(events, count_early=True)
+
+    def _apply_statuses(self, events: List[Dict], count_early: bool = False) -> int:
+        """
+        One SELECT for every SID in the batch, then one UPDATE per resulting
+        status and one executemany for delivered_at. Each UPDATE only
+        matches rows still in a lower status, so a concurrent writer that
+        got further first is never moved backwards.
+        """
+        by_sid = {}
+        for event in events:
+            if event['message_sid'] and event['status']:
+                by_sid.setdefault(event['message_sid'], []).append(event)
+        if not by_sid:
+            return 0
+
+        session = self.session_factory()
+        try:
+            rows = (
+                session.query(OutboundMessage.id, OutboundMessage.provider_sid, OutboundMessage.status,
+                              OutboundMessage.created_at, OutboundMessage.delivered_at)
+                .filter(OutboundMessage.provider_sid.in_(list(by_sid)))
+                .all()
+            )
+
+            changes = {}  # (status, last_error) -> ids
+            delivered = []
+            for row in rows:
+                status, last_error, delivered_at = row.status, None, row.delivered_at
+                for event in sorted(by_sid[row.provider_sid], key=lambda e: (_rank(e['status']), e['received_at'])):
+                    if status in FINAL_STATUSES:
+                        break
+                    if event['status'] in FINAL_STATUSES:
+                        status = event['status']
+                        last_error = f"Twilio error {event['error_code']}" if event['error_code'] else status
+                    elif STATUS_RANK.get(event['status'], -1) > STATUS_RANK.get(status, -1):
+                        status = event['status']
+                    else:
+                        continue
+                    if event['status'] in ('delivered', 'read') and delivered_at is None:
+                        delivered_at = event['received_at']
+                        delivered.append({'b_id': row.id, 'b_delivered_at': delivered_at,
+                                          'latency': (delivered_at - row.created_at).total_seconds()})
+                if status != row.status:
+                    changes.setdefault((status, last_error), []).append(row.id)
+
+            updated = 0
+            failed = 0
+            for (status, last_error), ids in changes.items():
+                values = {'status': status}
+                if status in FINAL_STATUSES:
+                    values['last_error'] = last_error
+                    lower = list(STATUS_RANK)
+                else:
+                    lower = [name for name, rank in STATUS_RANK.items() if rank < STATUS_RANK[status]]
+                count = (
+                    session.query(OutboundMessage)
+                    .filter(OutboundMessage.id.in_(ids), OutboundMessage.status.in_(lower))
+                    .update(values, synchronize_session=False)
+                )
+                updated += count
+                if status in FINAL_STATUSES:
+                    failed += count
+            if delivered:
+                table = OutboundMessage.__table__
+                session.execute(
+                    table.update()
+                    .where(table.c.id == bindparam('b_id'), table.c.delivered_at.is_(None))
+                    .values(delivered_at=bindparam('b_delivered_at')),
+                    [{'b_id': d['b_id'], 'b_delivered_at': d['b_delivered_at']} for d in delivered]
+                )
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+        with self._lock:
+            self._counters['delivered'] += len(delivered)
+            self._counters['failed'] += failed
+            self._delivery_latencies.extend(d['latency'] for d in delivered)
+            if count_early:
+                self._counters['early_callbacks'] += len(by_sid) - len(rows)
+        return updated
+
+    def _apply_early_status(self, provider_sid: str):
+        """
+        Apply callbacks stored before the SID was written
+
+        The callback's event row is committed before apply_statuses looks
+        for the SID, and the SID is committed before this reads the events,
+        so every callback is applied by at least one side; applying one
+        twice is a no-op as statuses only move forward.
+        """
+        session = self.session_factory()
+        try:
+            events = (
+                session.query(MessageStatusEvent.message_sid, MessageStatusEvent.status,
+                              MessageStatusEvent.error_code, MessageStatusEvent.received_at)
+                .filter(MessageStatusEvent.message_sid == provider_sid)
+                .all()
+            )
+        finally:
+            session.close()
+        if events:
+            self._apply_statuses([event._asdict() for event in events])
+
+    def depth(self) -> Dict:
+        """Count queue entries by status"""
+        session = self.session_factory()
+        try:
+            rows = (
+                session.query(OutboundMessage.status, func.count(OutboundMessage.id))
+                .group_by(OutboundMessage.status)
+                .all()
+            )
+            return {status: count for status, count in rows}
+        finally:
+            session.close()
+
+    def _count(self, name: str) -> int:
+        with self._lock:
+            self._counters[name] += 1
+            return self._counters[name]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            counters = dict(self._counters)
+            send_latencies = list(self._send_latencies)
+            delivery_latencies = list(self._delivery_latencies)
+        counters['enabled'] = self.enabled
+        counters['rate_per_second'] = self.bucket.rate
+        counters['dispatcher_running'] = self._thread is not None and self._thread.is_alive()
+        counters['by_status'] = self.depth()
+        counters['queued_to_sent_seconds'] = percentiles(send_latencies)
+        counters['queued_to_delivered_seconds'] = percentiles(delivery_latencies)
+        return counters
+
+
+def _rank(status: str) -> int:
+    return len(STATUS_RANK) if status in FINAL_STATUSES else STATUS_RANK.get(status, -1)
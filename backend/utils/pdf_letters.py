@@ -0,0 +1,358 @@
+"""
+PDF Letters - Claim letter PDFs rendered on a process pool and cached on disk
+PDFs are keyed by a hash of the letter text, written once, served straight
+from the file and evicted oldest-first when the cache grows past its size cap.
+A claim's own letter is copied out of the cache into the letter directory,
+which is never evicted
+"""
+
+import os
+import re
+import time
+import shutil
+import hashlib
+import tempfile
+import threading
+import multiprocessing
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Optional, Tuple
+
+
+# Bump when the page layout changes so cached PDFs are regenerated
+PDF_LAYOUT_VERSION = 1
+
+DEFAULT_CACHE_DIR = os.path.join(tempfile.gettempdir(), 'flyclaim-pdf-cache')
+
+# Letters kept for their claims (Claim.claim_letter_path)
+DEFAULT_LETTER_DIR = 'letters'
+
+# Fonts with the rupee sign; the first one found is used
+FONT_CANDIDATES = [
+    '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf',
+    '/usr/share/fonts/dejavu/DejaVuSans.ttf',
+    '/usr/share/fonts/truetype/noto/NotoSans-Regular.ttf',
+    '/Library/Fonts/Arial Unicode.ttf',
+    'C:\\Windows\\Fonts\\arial.ttf'
+]
+
+
+def find_font(font_path: Optional[str] = None) -> Optional[str]:
+    """Return the TTF font to embed, or None to fall back to Helvetica"""
+    for candidate in ([font_path] if font_path else []) + FONT_CANDIDATES:
+        if candidate and os.path.exists(candidate):
+            return candidate
+    return None
+
+
+_registered_font = None
+
+
+def _font_name(font_path: Optional[str]) -> str:
+    global _registered_font
+    if not font_path:
+        return 'Helvetica'
+    if _registered_font != font_path:
+        from reportlab.pdfbase import pdfmetrics
+        from reportlab.pdfbase.ttfonts import TTFont
+        pdfmetrics.registerFont(TTFont('LetterFont', font_path))
+        _registered_font = font_path
+    return 'LetterFont'
+
+
+def render_letter_pdf(letter_text: str, path: str, title: str = 'Claim Letter',
+                      font_path: Optional[str] = None) -> int:
+    """
+    Render a plain-text letter to a PDF file
+
+    Runs in a worker process. The file is written under a temporary name
+    and renamed into place, so readers never see a partial PDF.
+
+    Args:
+        letter_text: Letter text (blank lines separate paragraphs)
+        path: Destination file
+        title: PDF document title
+        font_path: TTF font to embed; Helvetica (rupee sign spelled 'Rs.') if None
+
+    Returns:
+        Size of the written file in bytes
+    """
+    from xml.sax.saxutils import escape
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import ParagraphStyle
+    from reportlab.lib.units import mm
+    from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer
+
+    font = _font_name(font_path)
+    if font == 'Helvetica':
+        letter_text = letter_text.replace('₹', 'Rs. ')
+
+    style = ParagraphStyle('letter', fontName=font, fontSize=10.5, leading=14)
+    story = []
+    for line in letter_text.strip('\n').split('\n'):
+        if line.strip():
+            story.append(Paragraph(escape(line), style))
+        else:
+            story.append(Spacer(1, 7))
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    doc = SimpleDocTemplate(
+        tmp_path,
+        pagesize=A4,
+        title=title,
+        author='FlyClaim AI',
+        leftMargin=20 * mm,
+        rightMargin=20 * mm,
+        topMargin=18 * mm,
+        bottomMargin=18 * mm
+    )
+    doc.build(story)
+    os.replace(tmp_path, path)
+    return os.path.getsize(path)
+
+
+class PdfLetterCache:
+    """
+    Content-addressed PDF cache backed by a directory
+
+    The key is a SHA-256 of the letter text (which already reflects every
+    input and template), the title, the font and PDF_LAYOUT_VERSION.
+    Misses are rendered on a process pool so reportlab never holds the GIL
+    in a request thread; concurrent requests for the same key share one
+    render. Hits refresh the file's mtime, and when the directory grows
+    past max_bytes the least recently used PDFs are deleted down to 90%.
+    Cached paths can vanish at any time, so a path that must outlive the
+    cache (a claim's letter) comes from store().
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = DEFAULT_CACHE_DIR,
+        letter_dir: str = DEFAULT_LETTER_DIR,
+        max_bytes: int = 256 * 1024 * 1024,
+        max_workers: int = 2,
+        render_timeout: float = 30,
+        font_path: Optional[str] = None
+    ):
+        self.cache_dir = cache_dir
+        self.letter_dir = letter_dir
+        self.max_bytes = max_bytes
+        self.max_workers = max_workers
+        self.render_timeout = render_timeout
+        self.font_path = find_font(font_path)
+        os.makedirs(cache_dir, exist_ok=True)
+
+        self._executor = None  # Started on the first miss
+        self._pending = {}     # key -> Future
+        self._lock = threading.Lock()
+        self._bytes = None     # Directory size, scanned on first use
+        self._render_times = deque(maxlen=500)
+        self._counters = {'hits': 0, 'misses': 0, 'coalesced': 0, 'rendered': 0, 'evicted': 0}
+
+    @classmethod
+    def from_env(cls) -> 'PdfLetterCache':
+        return cls(
+            cache_dir=os.getenv('PDF_CACHE_DIR', DEFAULT_CACHE_DIR),
+            letter_dir=os.getenv('PDF_LETTER_DIR', DEFAULT_LETTER_DIR),
+            max_bytes=int(float(os.getenv('PDF_CACHE_MAX_MB', 256)) * 1024 * 1024),
+            max_workers=int(os.getenv('PDF_WORKERS', 2)),
+            render_timeout=float(os.getenv('PDF_RENDER_TIMEOUT', 30)),
+            font_path=os.getenv('PDF_FONT_PATH')
+        )
+
+    def key_for(self, letter_text: str, title: str = 'Claim Letter') -> str:
+        digest = hashlib.sha256()
+        for part in (str(PDF_LAYOUT_VERSION), self.font_path or 'Helvetica', title, letter_text):
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.pdf")
+
+    def open(self, letter_text: str, title: str = 'Claim Letter') -> Tuple[object, str]:
+        """
+        Return an open binary file for the letter's PDF, rendering it on a miss
+
+        The file is opened before returning so a concurrent eviction cannot
+        remove it between lookup and streaming; the caller must close it
+        (Flask's send_file does).
+
+        Returns:
+            (file object, cache key)
+
+        Raises:
+            TimeoutError: Rendering took longer than render_timeout
+        """
+        key = self.key_for(letter_text, title)
+        path = self.path_for(key)
+
+        try:
+            pdf_file = open(path, 'rb')
+        except FileNotFoundError:
+            pdf_file = None
+        if pdf_file is not None:
+            try:
+                os.utime(path)  # Recently used; evict last
+            except FileNotFoundError:
+                pdf_file.close()  # Evicted between open and utime; render it again
+            else:
+                self._count('hits')
+                return pdf_file, key
+
+        with self._lock:
+            future = self._pending.get(key)
+            leader = future is None
+            if leader:
+                future = self._pending[key] = self._submit(letter_text, path, title)
+                self._counters['misses'] += 1
+            else:
+                self._counters['coalesced'] += 1
+
+        started = time.perf_counter()
+        try:
+            size = future.result(timeout=self.render_timeout)
+        except Exception as e:
+            if leader:
+                with self._lock:
+                    self._pending.pop(key, None)
+                    if isinstance(e, BrokenProcessPool):
+                        self._executor = None  # A worker died; start a fresh pool next time
+            raise
+
+        pdf_file = open(path, 'rb')
+        if leader:
+            with self._lock:
+                self._pending.pop(key, None)
+                self._counters['rendered'] += 1
+                self._render_times.append(time.perf_counter() - started)
+            self._added(size, keep=path)
+        return pdf_file, key
+
+    def store(self, pdf_file, name: str) -> str:
+        """
+        Copy an open PDF from open() into the letter directory
+
+        The copy is written under a temporary name and renamed into place;
+        pdf_file is rewound afterwards so it can still be streamed.
+
+        Args:
+            pdf_file: File object returned by open()
+            name: File name without extension (the claim reference)
+
+        Returns:
+            Path of the stored letter
+        """
+        os.makedirs(self.letter_dir, exist_ok=True)
+        path = os.path.join(self.letter_dir, re.sub(r'[^A-Za-z0-9_.-]', '_', name) + '.pdf')
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        pdf_file.seek(0)
+        with open(tmp_path, 'wb') as out:
+            shutil.copyfileobj(pdf_file, out)
+        os.replace(tmp_path, path)
+        pdf_file.seek(0)
+        return path
+
+    def _submit(self, letter_text: str, path: str, title: str) -> Future:
+        if self._executor is None:
+            # spawn: forking a threaded web worker can deadlock the child.
+            # Each worker imports the __main__ module once, so entry-point
+            # scripts need the usual if __name__ == '__main__' guard.
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return self._executor.submit(render_letter_pdf, letter_text, path, title, self.font_path)
+
+    def _added(self, size: int, keep: str):
+        with self._lock:
+            if self._bytes is None:
+                self._bytes = self._scan()[0]
+            else:
+                self._bytes += size
+            over = self._bytes > self.max_bytes
+        if over:
+            self.evict(keep=keep)
+
+    def _scan(self):
+        total = 0
+        entries = []
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if entry.name.endswith('.pdf'):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue  # Evicted by another worker
+                    total += stat.st_size
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return total, entries
+
+    def evict(self, target_bytes: Optional[int] = None, keep: Optional[str] = None) -> int:
+        """
+        Delete least recently used PDFs until the cache fits target_bytes
+
+        Args:
+            target_bytes: Size to shrink to (default 90% of max_bytes)
+            keep: A file never to delete (the one just written)
+
+        Returns:
+            Number of files removed
+        """
+        target = int(self.max_bytes * 0.9) if target_bytes is None else target_bytes
+        total, entries = self._scan()
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= target:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass  # Evicted by another worker
+            except OSError:
+                continue  # Still open elsewhere (Windows); it stays on disk
+            total -= size
+            removed += 1
+
+        with self._lock:
+            self._bytes = total
+            self._counters['evicted'] += removed
+        return removed
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _count(self, name: str):
+        with self._lock:
+            self._counters[name] += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            counters = dict(self._counters)
+            render_times = sorted(self._render_times)
+            counters['cache_bytes'] = self._bytes
+        counters['max_bytes'] = self.max_bytes
+        counters['rendering'] = len(self._pending)
+        counters['font'] = os.path.basename(self.font_path) if self.font_path else 'Helvetica'
+        if render_times:
+            counters['render_ms_p50'] = round(render_times[len(render_times) // 2] * 1000, 1)
+            counters['render_ms_max'] = round(render_times[-1] * 1000, 1)
+        return counters
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_pdf_cache() -> PdfLetterCache:
+    """Return the shared PDF cache configured from the environment"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = PdfLetterCache.from_env()
+    return _cache
@@ -0,0 +1,28 @@
+"""
+Percentiles - p50/p95/max summary of latency samples for stats() endpoints
+"""
+
+from typing import Dict, Iterable, Optional
+
+
+def percentiles(samples: Iterable[float], scale: float = 1, digits: int = 3) -> Optional[Dict]:
+    """
+    Summarize samples as p50, p95 and max (nearest rank)
+
+    Args:
+        samples: Sample values, in any order
+        scale: Multiplier applied to each value (1000 turns seconds into ms)
+        digits: Decimal places to round to
+
+    Returns:
+        {'p50', 'p95', 'max'}, or None when there are no samples
+    """
+    samples = sorted(samples)
+    if not samples:
+        return None
+
+    def pick(fraction: float) -> float:
+        index = min(len(samples) - 1, int(fraction * len(samples)))
+        return round(samples[index] * scale, digits)
+
+    return {'p50': pick(0.50), 'p95': pick(0.95), 'max': pick(1.0)}
@@ -0,0 +1,275 @@
+"""
+Resilience - Bulkhead, deadlines, retry and circuit breaker for remote calls
+Keeps a slow or failing dependency (the Gemini API) from tying up every
+request thread, and lets callers fail fast into a degraded response
+"""
+
+import os
+import time
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Callable, Dict, Optional, Tuple, Type
+
+
+class ResilienceError(Exception):
+    """Base class for calls rejected or abandoned by a ResilientCaller"""
+
+
+class CircuitOpenError(ResilienceError):
+    """The circuit breaker is open; the dependency is not being called"""
+
+
+class BulkheadFullError(ResilienceError):
+    """All concurrency slots for the dependency are taken"""
+
+
+class DeadlineExceededError(ResilienceError):
+    """The call (including retries) ran past its deadline"""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker
+
+    closed: calls pass; failure_threshold consecutive failures open it.
+    open: calls are rejected until reset_timeout has passed.
+    half_open: one trial call passes; success closes, failure re-opens.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self.times_opened = 0
+        self.short_circuited = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+            self._trial_in_flight = False
+        return self._state
+
+    def allow(self) -> bool:
+        """Return True if a call may proceed now"""
+        with self._lock:
+            state = self._current_state()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            self.short_circuited += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._state = self.CLOSED
+            self._trial_in_flight = False
+
+    def cancel_trial(self):
+        """Give back a half-open trial slot when the call never reached the dependency"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self.times_opened += 1
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._trial_in_flight = False
+
+    def stats(self) -> Dict:
+        with self._lock:
+            state = self._current_state()
+            retry_in = max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at)) if state == self.OPEN else 0.0
+            return {
+                'state': state,
+                'consecutive_failures': self._failures,
+                'times_opened': self.times_opened,
+                'short_circuited': self.short_circuited,
+                'retry_in_seconds': round(retry_in, 1)
+            }
+
+
+class ResilientCaller:
+    """
+    Runs calls to one dependency behind a bulkhead, deadline, retry and breaker
+
+    Each attempt runs on a dedicated executor sized to the bulkhead, so a
+    call that overruns its timeout is abandoned by the caller but keeps its
+    slot until it really finishes. Work piling up behind a slow dependency
+    therefore stays bounded at max_concurrent threads. Pass timeout_kwargs
+    so the client itself gives up at the attempt's timeout and the slot is
+    freed, rather than held by a call that hangs.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_concurrent: int = 4,
+        acquire_timeout: float = 0.5,
+        attempt_timeout: float = 15,
+        deadline: float = 30,
+        max_attempts: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 4,
+        breaker: Optional[CircuitBreaker] = None,
+        transient_errors: Tuple[Type[BaseException], ...] = (TimeoutError, ConnectionError),
+        timeout_kwargs: Optional[Callable[[float], Dict]] = None
+    ):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.acquire_timeout = acquire_timeout
+        self.attempt_timeout = attempt_timeout
+        self.deadline = deadline
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker or CircuitBreaker()
+        self.transient_errors = transient_errors
+        # Attempt timeout (seconds) -> extra keyword arguments for fn
+        self.timeout_kwargs = timeout_kwargs
+
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrent, thread_name_prefix=f"{name}-call")
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._counters = {
+            'calls': 0,
+            'succeeded': 0,
+            'failed': 0,
+            'retries': 0,
+            'timeouts': 0,
+            'rejected_bulkhead': 0,
+            'rejected_breaker': 0
+        }
+
+    @classmethod
+    def from_env(cls, name: str, prefix: str, **kwargs) -> 'ResilientCaller':
+        """
+        Build a caller configured from <PREFIX>_MAX_CONCURRENCY, _BULKHEAD_WAIT,
+        _TIMEOUT, _DEADLINE, _MAX_ATTEMPTS, _BACKOFF_BASE, _BACKOFF_MAX,
+        _BREAKER_THRESHOLD and _BREAKER_RESET
+        """
+        prefix = prefix.upper()
+        return cls(
+            name,
+            max_concurrent=int(os.getenv(f'{prefix}_MAX_CONCURRENCY', 4)),
+            acquire_timeout=float(os.getenv(f'{prefix}_BULKHEAD_WAIT', 0.5)),
+            attempt_timeout=float(os.getenv(f'{prefix}_TIMEOUT', 15)),
+            deadline=float(os.getenv(f'{prefix}_DEADLINE', 30)),
+            max_attempts=int(os.getenv(f'{prefix}_MAX_ATTEMPTS', 3)),
+            backoff_base=float(os.getenv(f'{prefix}_BACKOFF_BASE', 0.5)),
+            backoff_max=float(os.getenv(f'{prefix}_BACKOFF_MAX', 4)),
+            breaker=CircuitBreaker(
+                failure_threshold=int(os.getenv(f'{prefix}_BREAKER_THRESHOLD', 5)),
+                reset_timeout=float(os.getenv(f'{prefix}_BREAKER_RESET', 30))
+            ),
+            **kwargs
+        )
+
+    def call(self, fn: Callable, *args, **kwargs):
+        """
+        Call fn(*args, **kwargs) with the configured protections
+
+        Transient errors are retried with full-jitter exponential backoff
+        while the deadline allows. Only transient failures count against
+        the circuit breaker; any other error means the dependency answered.
+
+        Raises:
+            CircuitOpenError: Breaker open, fn was not called
+            BulkheadFullError: No free slot within acquire_timeout
+            DeadlineExceededError: Attempts timed out or the deadline ran out
+            Exception: The last non-transient error raised by fn
+        """
+        self._count('calls')
+        started = time.monotonic()
+        attempt = 0
+
+        while True:
+            if not self.breaker.allow():
+                self._count('rejected_breaker')
+                raise CircuitOpenError(f"{self.name} circuit is open")
+
+            remaining = self.deadline - (time.monotonic() - started)
+            try:
+                result = self._attempt(fn, args, kwargs, min(self.attempt_timeout, remaining))
+            except BulkheadFullError:
+                self.breaker.cancel_trial()
+                raise
+            except Exception as e:
+                transient = isinstance(e, self.transient_errors)
+                if transient:
+                    self.breaker.record_failure()
+                else:
+                    self.breaker.cancel_trial()
+                attempt += 1
+                delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+                out_of_time = time.monotonic() - started + delay >= self.deadline
+
+                if not transient or attempt >= self.max_attempts or out_of_time:
+                    self._count('failed')
+                    if isinstance(e, TimeoutError) or (transient and out_of_time):
+                        raise DeadlineExceededError(f"{self.name} call failed within {self.deadline}s: {e}") from e
+                    raise
+
+                self._count('retries')
+                time.sleep(delay)
+                continue
+
+            self.breaker.record_success()
+            self._count('succeeded')
+            return result
+
+    def _attempt(self, fn: Callable, args, kwargs, timeout: float):
+        if not self._slots.acquire(timeout=self.acquire_timeout):
+            self._count('rejected_bulkhead')
+            raise BulkheadFullError(f"{self.name}: {self.max_concurrent} calls already in flight")
+
+        if self.timeout_kwargs is not None:
+            kwargs = {**kwargs, **self.timeout_kwargs(max(timeout, 0))}
+        with self._lock:
+            self._in_flight += 1
+        future = self._executor.submit(fn, *args, **kwargs)
+        future.add_done_callback(self._release)
+
+        try:
+            return future.result(timeout=max(timeout, 0))
+        except FutureTimeoutError:
+            self._count('timeouts')
+            raise TimeoutError(f"{self.name} call exceeded {timeout:.1f}s")
+
+    def _release(self, future):
+        with self._lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+    def _count(self, name: str):
+        with self._lock:
+            self._counters[name] += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            counters = dict(self._counters)
+            counters['in_flight'] = self._in_flight
+        counters['max_concurrent'] = self.max_concurrent
+        counters['circuit'] = self.breaker.stats()
+        return counters
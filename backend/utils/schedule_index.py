@@ -0,0 +1,203 @@
+"""
+Schedule Index - Offline flight schedule lookup by flight number
+Ingests an SSIM-like CSV into sorted, array-backed columns so a flight
+number and date resolve to the scheduled route and block time without
+an LLM or external API call
+"""
+
+import os
+import csv
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime
+from typing import Dict, Optional
+
+from backend.database.models import parse_flight_number
+
+
+DEFAULT_SCHEDULE_FILE = os.path.abspath(os.path.join(os.path.dirname(__file__), '../data/schedules.csv'))
+
+_BASE36 = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+_MAX_FLIGHT_NUMBER = 10000  # SSIM flight numbers have at most 4 digits
+
+
+def flight_key(flight_number: str) -> Optional[int]:
+    """
+    Pack a flight number into an integer key
+
+    The airline designator (2 alphanumerics) and numeric part come from
+    parse_flight_number, so '6E-234', '6e234' and '6E 0234' share a key.
+
+    Returns:
+        Integer key, or None if the flight number cannot be parsed
+    """
+    code, number = parse_flight_number(flight_number.strip())
+    if not code or not number or int(number) >= _MAX_FLIGHT_NUMBER:
+        return None
+    designator = _BASE36.index(code[0]) * 36 + _BASE36.index(code[1])
+    return designator * _MAX_FLIGHT_NUMBER + int(number)
+
+
+def _days_mask(days_of_operation: str) -> int:
+    """SSIM days of operation ('1234567', '1.3.5.7', '12345  ') -> bitmask, bit 0 = Monday"""
+    mask = 0
+    for char in days_of_operation:
+        if char in '1234567':
+            mask |= 1 << (int(char) - 1)
+    return mask
+
+
+def _to_date(value) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+class ScheduleIndex:
+    """
+    Immutable schedule index held in parallel typed arrays
+
+    Rows are sorted by flight key, so all periods of one flight number are
+    adjacent and found with two binary searches; the few candidate rows are
+    then checked for day of week and effective date range. Airports are
+    stored once in a code table and referenced by position.
+    """
+
+    def __init__(self, rows):
+        """
+        Args:
+            rows: Iterable of (key, departure, arrival, departure_minutes,
+                  block_minutes, days_mask, effective_from, effective_to) with
+                  dates as ordinals
+        """
+        rows = sorted(rows, key=lambda row: (row[0], row[6]))
+        airport_codes = {}
+
+        self.keys = array('I')
+        self.departure = array('H')
+        self.arrival = array('H')
+        self.departure_minutes = array('H')
+        self.block_minutes = array('H')
+        self.days = array('B')
+        self.effective_from = array('I')
+        self.effective_to = array('I')
+
+        for key, departure, arrival, departure_minutes, block_minutes, days, start, end in rows:
+            self.keys.append(key)
+            self.departure.append(airport_codes.setdefault(departure, len(airport_codes)))
+            self.arrival.append(airport_codes.setdefault(arrival, len(airport_codes)))
+            self.departure_minutes.append(departure_minutes)
+            self.block_minutes.append(block_minutes)
+            self.days.append(days)
+            self.effective_from.append(start)
+            self.effective_to.append(end)
+
+        self.airports = tuple(airport_codes)
+
+    @classmethod
+    def from_csv(cls, path: str) -> 'ScheduleIndex':
+        """
+        Ingest a schedule CSV
+
+        Columns: airline, flight_number, departure, arrival, departure_time
+        (HH:MM), block_minutes, days_of_operation (SSIM style, e.g. '1.3.5.7'),
+        effective_from, effective_to (YYYY-MM-DD). Rows with an unparseable
+        flight number are skipped.
+        """
+        rows = []
+        with open(path, encoding='utf-8', newline='') as f:
+            reader = csv.reader(f)
+            next(reader, None)  # header
+            for airline, number, departure, arrival, departure_time, block, days, start, end in reader:
+                key = flight_key(f"{airline}{number}")
+                if key is None:
+                    continue
+                hours, minutes = departure_time.split(':')
+                rows.append((
+                    key,
+                    departure.upper(),
+                    arrival.upper(),
+                    int(hours) * 60 + int(minutes),
+                    int(block),
+                    _days_mask(days),
+                    date.fromisoformat(start).toordinal(),
+                    date.fromisoformat(end).toordinal()
+                ))
+        return cls(rows)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def lookup(self, flight_number: str, flight_date=None) -> Optional[Dict]:
+        """
+        Find the scheduled operation of a flight
+
+        Args:
+            flight_number: Flight number, e.g. '6E-234'
+            flight_date: Date of travel (date, datetime or 'YYYY-MM-DD'). When
+                omitted, the period in effect today is used.
+
+        Returns:
+            Dictionary with flight_number, departure_airport, arrival_airport,
+            scheduled_departure_time (local, HH:MM) and block_hours, or None if
+            the flight does not operate on that date
+        """
+        if not flight_number:
+            return None
+        key = flight_key(flight_number)
+        if key is None:
+            return None
+
+        lo = bisect_left(self.keys, key)
+        hi = bisect_right(self.keys, key, lo)
+        if lo == hi:
+            return None
+
+        if flight_date:
+            try:
+                day = _to_date(flight_date)
+            except ValueError:
+                return None
+            check_weekday = True
+        else:
+            day = date.today()
+            check_weekday = False
+
+        ordinal = day.toordinal()
+        weekday_bit = 1 << day.weekday()
+        for i in range(lo, hi):
+            if not self.effective_from[i] <= ordinal <= self.effective_to[i]:
+                continue
+            if check_weekday and not self.days[i] & weekday_bit:
+                continue
+            return self._row(i, key)
+        return None
+
+    def _row(self, i: int, key: int) -> Dict:
+        designator, number = divmod(key, _MAX_FLIGHT_NUMBER)
+        code = _BASE36[designator // 36] + _BASE36[designator % 36]
+        hours, minutes = divmod(self.departure_minutes[i], 60)
+        return {
+            'flight_number': f"{code}-{number}",
+            'departure_airport': self.airports[self.departure[i]],
+            'arrival_airport': self.airports[self.arrival[i]],
+            'scheduled_departure_time': f"{hours:02d}:{minutes:02d}",
+            'block_hours': round(self.block_minutes[i] / 60, 2)
+        }
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_schedule_index() -> ScheduleIndex:
+    """Return the shared schedule index, ingesting the schedule file on first use"""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = ScheduleIndex.from_csv(os.getenv('SCHEDULE_FILE', DEFAULT_SCHEDULE_FILE))
+    return _index
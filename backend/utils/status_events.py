@@ -0,0 +1,198 @@
+"""
+Status Events - Buffered ingestion of Twilio status callbacks
+Callbacks are appended to an in-memory buffer and written to the
+message_status_events table in multi-row inserts, flushed when a batch
+fills up or a time interval passes
+"""
+
+import os
+import time
+import atexit
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import insert
+
+from backend.database.models import MessageStatusEvent
+
+
+class StatusEventBuffer:
+    """
+    Write-behind buffer for status callbacks
+
+    record() only appends under a lock, so the callback request returns
+    without touching the database. A flusher thread writes everything
+    buffered once max_batch events are waiting or flush_interval seconds
+    have passed, whichever comes first. If the database is unavailable the
+    batch is kept and retried; beyond max_buffered events the oldest are
+    dropped (and counted) so memory stays bounded. Events still buffered
+    when the process exits are flushed by an atexit hook; a crash loses at
+    most one interval's worth.
+    """
+
+    def __init__(
+        self,
+        max_batch: int = 500,
+        flush_interval: float = 1.0,
+        max_buffered: int = 20000,
+        on_flush: Optional[Callable[[List[Dict]], None]] = None,
+        session_factory: Optional[Callable] = None
+    ):
+        """
+        Args:
+            max_batch: Rows per insert; reaching it triggers a flush
+            flush_interval: Maximum seconds an event waits in the buffer
+            max_buffered: Cap on buffered events while the database is down
+            on_flush: Called with each batch after it is stored
+            session_factory: Session factory (defaults to SessionLocal)
+        """
+        if session_factory is None:
+            from backend.database.db_session import SessionLocal
+            session_factory = SessionLocal
+
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.max_buffered = max_buffered
+        self.on_flush = on_flush
+        self.session_factory = session_factory
+
+        self._buffer = deque()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._batch_ready = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+        self._counters = {
+            'received': 0,
+            'stored': 0,
+            'batches': 0,
+            'flush_failures': 0,
+            'dropped': 0
+        }
+        self._last_flush_ms = None
+        # Registered once; start() may run again after stop()
+        atexit.register(self.stop)
+
+    @classmethod
+    def from_env(cls, prefix: str, **kwargs) -> 'StatusEventBuffer':
+        prefix = prefix.upper()
+        return cls(
+            max_batch=int(os.getenv(f'{prefix}_STATUS_BATCH_SIZE', 500)),
+            flush_interval=float(os.getenv(f'{prefix}_STATUS_FLUSH_INTERVAL', 1.0)),
+            max_buffered=int(os.getenv(f'{prefix}_STATUS_BUFFER_SIZE', 20000)),
+            **kwargs
+        )
+
+    def record(self, message_sid: str, status: str, error_code: Optional[str] = None,
+               to_number: Optional[str] = None) -> None:
+        """Buffer one status callback"""
+        event = {
+            'message_sid': message_sid,
+            'status': status,
+            'error_code': error_code or None,
+            'to_number': to_number or None,
+            'received_at': datetime.utcnow()
+        }
+        with self._lock:
+            self._buffer.append(event)
+            self._counters['received'] += 1
+            if len(self._buffer) > self.max_buffered:
+                self._buffer.popleft()
+                self._counters['dropped'] += 1
+            batch_ready = len(self._buffer) >= self.max_batch
+
+        self.start()
+        if batch_ready:
+            self._batch_ready.set()
+
+    def start(self):
+        """Start the flusher thread if it is not running"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._run, name='status-flusher', daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5):
+        """Stop the flusher and write whatever is still buffered"""
+        self._stopped.set()
+        self._batch_ready.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        try:
+            self.flush()
+        except Exception as e:
+            print(f"[status-events] final flush failed, {len(self._buffer)} events lost: {e}")
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._batch_ready.wait(self.flush_interval)
+            self._batch_ready.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"[status-events] flush failed: {e}")
+                time.sleep(self.flush_interval)  # Don't spin while the database is down
+
+    def flush(self) -> int:
+        """
+        Write all buffered events, max_batch rows per insert
+
+        Returns:
+            Number of events stored
+        """
+        stored = 0
+        with self._flush_lock:
+            while True:
+                with self._lock:
+                    batch = [self._buffer.popleft() for _ in range(min(self.max_batch, len(self._buffer)))]
+                if not batch:
+                    return stored
+
+                started = time.perf_counter()
+                try:
+                    self._insert(batch)
+                except Exception:
+                    with self._lock:
+                        self._buffer.extendleft(reversed(batch))  # Keep order for the retry
+                        self._counters['flush_failures'] += 1
+                        while len(self._buffer) > self.max_buffered:
+                            self._buffer.popleft()  # Oldest first, as in record()
+                            self._counters['dropped'] += 1
+                    raise
+
+                with self._lock:
+                    self._counters['stored'] += len(batch)
+                    self._counters['batches'] += 1
+                    self._last_flush_ms = round((time.perf_counter() - started) * 1000, 2)
+                stored += len(batch)
+
+                if self.on_flush:
+                    try:
+                        self.on_flush(batch)
+                    except Exception as e:
+                        print(f"[status-events] on_flush failed: {e}")
+
+    def _insert(self, batch: List[Dict]):
+        session = self.session_factory()
+        try:
+            session.execute(insert(MessageStatusEvent), batch)
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            counters = dict(self._counters)
+            counters['buffered'] = len(self._buffer)
+            counters['last_flush_ms'] = self._last_flush_ms
+        counters['avg_batch_size'] = round(counters['stored'] / counters['batches'], 1) if counters['batches'] else None
+        return counters
@@ -0,0 +1,100 @@
+"""
+Bounded Worker Pool - Background execution with back-pressure and metrics
+Used to move slow agent work out of the request/response cycle
+"""
+
+import time
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict
+
+from backend.utils.percentiles import percentiles
+
+
+class BoundedWorkerPool:
+    """
+    Thread pool that rejects work instead of queueing without limit
+
+    At most max_workers tasks run at once and at most max_queue more wait
+    for a free worker. submit() returns False when the pool is saturated so
+    the caller can shed load instead of piling up latency.
+    """
+
+    def __init__(self, name: str, max_workers: int = 4, max_queue: int = 100, latency_window: int = 500):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue)
+        self._lock = threading.Lock()
+
+        self.queued = 0
+        self.active = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self._queue_waits = deque(maxlen=latency_window)
+        self._latencies = deque(maxlen=latency_window)
+
+    def submit(self, fn: Callable, *args, **kwargs) -> bool:
+        """
+        Schedule fn(*args, **kwargs) on the pool
+
+        Returns:
+            True if accepted, False if the pool is full
+        """
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            return False
+
+        with self._lock:
+            self.queued += 1
+
+        submitted_at = time.perf_counter()
+        self._executor.submit(self._run, submitted_at, fn, args, kwargs)
+        return True
+
+    def _run(self, submitted_at: float, fn: Callable, args, kwargs):
+        started_at = time.perf_counter()
+        with self._lock:
+            self.queued -= 1
+            self.active += 1
+            self._queue_waits.append(started_at - submitted_at)
+
+        try:
+            fn(*args, **kwargs)
+            outcome = 'completed'
+        except Exception as e:
+            print(f"[{self.name}] task failed: {e}")
+            outcome = 'failed'
+        finally:
+            finished_at = time.perf_counter()
+            with self._lock:
+                self.active -= 1
+                setattr(self, outcome, getattr(self, outcome) + 1)
+                self._latencies.append(finished_at - submitted_at)
+            self._slots.release()
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
+
+    def stats(self) -> Dict:
+        """Return queue depth, utilization and latency percentiles"""
+        with self._lock:
+            queue_waits = list(self._queue_waits)
+            latencies = list(self._latencies)
+            return {
+                'name': self.name,
+                'max_workers': self.max_workers,
+                'max_queue': self.max_queue,
+                'queue_depth': self.queued,
+                'active_workers': self.active,
+                'utilization': round(self.active / self.max_workers, 4),
+                'completed': self.completed,
+                'failed': self.failed,
+                'rejected': self.rejected,
+                'queue_wait_ms': percentiles(queue_waits, scale=1000, digits=2),
+                'end_to_end_ms': percentiles(latencies, scale=1000, digits=2)
+            }
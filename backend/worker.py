@@ -0,0 +1,77 @@
+"""
+FlyClaim AI - Background worker
+Runs queued jobs (claim eligibility, letters, submission) and, when
+ENABLE_AUTO_ESCALATION is on, the AirSewa/DGCA escalation scheduler. Start
+as many worker processes as needed; they share the database safely
+
+Usage:
+    python -m backend.worker [--concurrency N] [--kinds claim.letter,...] [--drain] [--no-escalation]
+    python -m backend.worker --requeue-dead [--kinds ...]
+    python -m backend.worker --escalate-once   (single escalation pass, e.g. from cron)
+"""
+
+import os
+import sys
+import argparse
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from backend.utils.job_queue import JobWorker, get_job_queue
+from backend.utils.claim_jobs import get_claim_processor
+from backend.utils.escalation import EscalationScheduler
+
+AUTO_ESCALATION_ENABLED = os.getenv('ENABLE_AUTO_ESCALATION', 'True') == 'True'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='FlyClaim AI job worker')
+    parser.add_argument('--concurrency', type=int, default=int(os.getenv('WORKER_CONCURRENCY', 2)),
+                        help='jobs run at once in this process')
+    parser.add_argument('--kinds', help='comma-separated job kinds to run (default: all)')
+    parser.add_argument('--poll-interval', type=float, default=float(os.getenv('WORKER_POLL_INTERVAL', 1.0)))
+    parser.add_argument('--drain', action='store_true', help='exit once no job is due')
+    parser.add_argument('--requeue-dead', action='store_true', help='requeue dead-lettered jobs and exit')
+    parser.add_argument('--no-escalation', action='store_true', help='do not run the escalation scheduler here')
+    parser.add_argument('--escalate-once', action='store_true', help='run one escalation pass and exit')
+    args = parser.parse_args()
+
+    if args.escalate_once:
+        print(f"Escalated {EscalationScheduler.from_env().tick()}")
+        return
+
+    queue = get_job_queue()
+    handlers = get_claim_processor().handlers()
+    if args.kinds:
+        kinds = [kind.strip() for kind in args.kinds.split(',') if kind.strip()]
+        unknown = [kind for kind in kinds if kind not in handlers]
+        if unknown:
+            parser.error(f"unknown job kinds: {', '.join(unknown)} (known: {', '.join(handlers)})")
+        handlers = {kind: handlers[kind] for kind in kinds}
+
+    if args.requeue_dead:
+        requeued = sum(queue.requeue_dead(kind) for kind in handlers)
+        print(f"Requeued {requeued} dead job(s)")
+        return
+
+    # Several workers may each run a scheduler; every claim is escalated once
+    scheduler = None
+    if AUTO_ESCALATION_ENABLED and not args.no_escalation and not args.drain:
+        scheduler = EscalationScheduler.from_env()
+        scheduler.start()
+
+    worker = JobWorker(queue, handlers, concurrency=args.concurrency, poll_interval=args.poll_interval)
+    print(f"Worker {worker.worker_id} running {', '.join(handlers)} with {args.concurrency} thread(s)"
+          f"{' and the escalation scheduler' if scheduler else ''}")
+    worker.run(drain=args.drain)
+    if scheduler:
+        scheduler.stop()
+        print(f"Escalations: {scheduler.stats()}")
+    print(f"Worker {worker.worker_id} stopped; {queue.stats()}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+"""
+Gunicorn configuration - gunicorn backend.app:app (this file is picked up
+from the working directory)
+The master imports the app and preloads agents, templates and reference
+data once; forked workers share those pages copy-on-write instead of each
+building their own copy
+"""
+
+import os
+import gc
+
+
+bind = os.getenv('GUNICORN_BIND', f"0.0.0.0:{os.getenv('PORT', '5000')}")
+workers = int(os.getenv('WEB_CONCURRENCY', 2))
+threads = int(os.getenv('GUNICORN_THREADS', 4))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 60))
+preload_app = os.getenv('GUNICORN_PRELOAD', 'True') == 'True'
+
+
+def when_ready(server):
+    """Runs in the master before the first worker is forked"""
+    if not preload_app:
+        return
+    from backend.agents.registry import preload
+    from backend.utils.airline_registry import get_airline_registry
+
+    timings = preload()
+    get_airline_registry().airlines()
+    server.log.info(f"Preloaded in master: {timings}")
+
+    # Move everything allocated so far out of the collector's view; a
+    # collection in a worker would otherwise write to (and so un-share)
+    # every object header it visits
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    """
+    Drop DB connections inherited from the master (sockets cannot be
+    shared) and start this worker's outbound WhatsApp dispatcher, which
+    picks up messages left queued or leased before a restart
+    """
+    from backend.database.db_session import engine
+    engine.dispose(close=False)
+
+    from backend.routes.whatsapp_webhook import outbound_queue
+    outbound_queue.start()
@@ -0,0 +1,14 @@
+"""
+Test configuration - puts the repo root on sys.path and points the app at a
+throwaway SQLite database before any backend module is imported
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+_db_dir = tempfile.mkdtemp(prefix='flyclaim-tests-')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_db_dir, 'test.db')}"
+os.environ.setdefault('GEMINI_API_KEY', 'test')
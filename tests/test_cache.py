@@ -0,0 +1,62 @@
+"""
+Result cache - the SQLite tier connects per process, so workers forked
+from a preloaded master never share the master's connection; keys change
+with the day for relative dates and with the model/prompt version
+"""
+
+import os
+from datetime import date
+
+from backend.utils import cache as cache_module
+from backend.utils.cache import SQLiteCache, TieredCache, make_cache_key
+
+
+def test_sqlite_tier_connects_on_first_use(tmp_path, monkeypatch):
+    monkeypatch.setenv('INTAKE_CACHE_DB', str(tmp_path / 'intake.db'))
+    cache = TieredCache.from_env('INTAKE')
+    assert cache.persistent._conn is None
+
+    cache.set('key', {'intent': 'claim'})
+    cache.memory.clear()
+    assert cache.get('key') == {'intent': 'claim'}
+    assert cache.persistent_hits == 1
+
+
+def test_forked_process_opens_its_own_connection(tmp_path, monkeypatch):
+    cache = SQLiteCache(str(tmp_path / 'results.db'))
+    cache.set('key', [1, 2])
+    master_conn = cache._conn
+
+    child_pid = os.getpid() + 1
+    monkeypatch.setattr(cache_module.os, 'getpid', lambda: child_pid)
+    assert cache.get('key') == [1, 2]
+    assert cache._conn is not master_conn
+    assert cache._inherited == [master_conn]  # Left open, not closed under the parent
+
+    cache.set('other', 'value')
+    assert len(cache) == 2
+
+
+def test_relative_dates_are_keyed_by_day():
+    monday, tuesday = date(2026, 10, 12), date(2026, 10, 13)
+    message = 'My 6E-234 flight yesterday was delayed 5 hours'
+    assert make_cache_key(message, today=monday) != make_cache_key(message, today=tuesday)
+    assert make_cache_key('Kal meri flight cancel ho gayi', today=monday) != \
+        make_cache_key('Kal meri flight cancel ho gayi', today=tuesday)
+
+    absolute = 'My 6E-234 flight on 2026-10-11 was delayed 5 hours'
+    assert make_cache_key(absolute, today=monday) == make_cache_key(absolute, today=tuesday)
+    # "kal" only as a whole word
+    assert make_cache_key('Flight from Kalkaji', today=monday) == make_cache_key('Flight from Kalkaji', today=tuesday)
+
+
+def test_dates_without_a_year_are_keyed_by_year():
+    message = 'AI-101 on 28 Oct was cancelled'
+    assert make_cache_key(message, today=date(2025, 12, 31)) != make_cache_key(message, today=date(2026, 1, 1))
+
+
+def test_model_or_prompt_change_misses_the_cache():
+    message = 'AI-101 on 2026-10-02 was cancelled'
+    assert make_cache_key(message, version='gemini-a/1') != make_cache_key(message, version='gemini-a/2')
+    assert make_cache_key(message, version='gemini-a/1') == make_cache_key(' ai-101  on 2026-10-02 was CANCELLED',
+                                                                           version='gemini-a/1')
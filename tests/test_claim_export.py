@@ -0,0 +1,65 @@
+"""
+Claims export over HTTP - off unless ADMIN_API_TOKEN is set, and then only
+for requests carrying it; the airline filter matches the airline name
+"""
+
+import json
+from datetime import datetime
+
+import pytest
+from flask import Flask
+
+from backend.database.db_session import db_session, engine
+from backend.database.models import Base, Claim, ClaimStatus, DisruptionType, User
+from backend.routes.web_api import web_api_bp
+
+
+@pytest.fixture
+def client():
+    Base.metadata.create_all(engine)
+    app = Flask(__name__)
+    app.register_blueprint(web_api_bp)
+    app.teardown_appcontext(lambda exc: db_session.remove())
+    return app.test_client()
+
+
+@pytest.fixture
+def user_id():
+    session = db_session()
+    try:
+        user = User(phone_number=f'+91{datetime.utcnow().timestamp():.6f}')
+        session.add(user)
+        session.flush()
+        session.add_all(
+            Claim(user_id=user.id, claim_reference=f'FC-EXPORT-{user.id}-{airline}', flight_number='6E-234',
+                  airline_code=code, airline_name=airline, flight_date=datetime(2025, 1, 1),
+                  disruption_type=DisruptionType.DELAY, status=ClaimStatus.INITIATED)
+            for code, airline in (('6E', 'IndiGo'), ('AI', 'Air India'))
+        )
+        session.commit()
+        return user.id
+    finally:
+        db_session.remove()
+
+
+def test_export_is_off_without_an_admin_token(client, monkeypatch):
+    monkeypatch.delenv('ADMIN_API_TOKEN', raising=False)
+    assert client.get('/api/export/claims', headers={'X-Admin-Token': ''}).status_code == 404
+
+
+def test_export_requires_the_admin_token(client, monkeypatch):
+    monkeypatch.setenv('ADMIN_API_TOKEN', 'secret')
+    assert client.get('/api/export/claims').status_code == 401
+    assert client.get('/api/export/claims', headers={'X-Admin-Token': 'guess'}).status_code == 401
+
+
+def test_airline_filter_matches_the_name_in_both_endpoints(client, monkeypatch, user_id):
+    monkeypatch.setenv('ADMIN_API_TOKEN', 'secret')
+    response = client.get(f'/api/export/claims?user_id={user_id}&airline=Air India',
+                          headers={'X-Admin-Token': 'secret'})
+    assert response.status_code == 200
+    exported = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [row['airline_name'] for row in exported] == ['Air India']
+
+    listed = client.get(f'/api/users/{user_id}/claims?airline=Air India').get_json()
+    assert [claim['id'] for claim in listed] == [row['id'] for row in exported]
@@ -0,0 +1,73 @@
+"""
+Bulk claim import - a batch that fails to commit stops the import and the
+report still lists the claims committed before it
+"""
+
+import io
+import json
+from datetime import datetime
+
+import pytest
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from backend.database.db_session import engine
+from backend.database.models import Base, Claim, User
+from backend.utils import claim_import
+from backend.utils.claim_import import ClaimImporter
+
+
+@pytest.fixture
+def session_factory():
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine)
+
+
+@pytest.fixture
+def user_id(session_factory):
+    with session_factory() as session:
+        user = User(phone_number=f'+91{datetime.utcnow().timestamp():.6f}')
+        session.add(user)
+        session.commit()
+        return user.id
+
+
+def upload(user_id, rows):
+    lines = [json.dumps({'user_id': user_id, 'flight_number': '6E-234', 'airline_name': 'IndiGo',
+                         'flight_date': '2025-01-01', 'reason': 'delayed 4 hours'})
+             for _ in range(rows)]
+    return io.BytesIO('\n'.join(lines).encode())
+
+
+def test_failed_batch_stops_with_partial_report(session_factory, user_id, monkeypatch):
+    reserve = claim_import.reserve_claim_ids
+    calls = []
+
+    def reserve_then_fail(session, count):
+        calls.append(count)
+        if len(calls) == 2:
+            raise OperationalError('INSERT', {}, Exception('database is locked'))
+        return reserve(session, count)
+
+    monkeypatch.setattr(claim_import, 'reserve_claim_ids', reserve_then_fail)
+    importer = ClaimImporter(session_factory=session_factory, batch_size=2, enqueue_jobs=False)
+    report = importer.run(upload(user_id, 7))
+
+    assert report['imported'] == 2
+    assert [claim['row'] for claim in report['claims']] == [1, 2]
+    assert report['stopped']['first_row'] == 3
+    assert report['stopped']['last_row'] == 4
+    assert 'database is locked' in report['stopped']['error']
+    assert report['rows'] == 4  # Nothing after the failed batch was read
+    assert len(calls) == 2
+
+    with session_factory() as session:
+        stored = session.query(Claim.claim_reference).filter(Claim.user_id == user_id).all()
+    assert sorted(r for (r,) in stored) == sorted(c['claim_reference'] for c in report['claims'])
+
+
+def test_complete_import_has_no_stop(session_factory, user_id):
+    importer = ClaimImporter(session_factory=session_factory, batch_size=2, enqueue_jobs=False)
+    report = importer.run(upload(user_id, 3))
+    assert report['imported'] == 3
+    assert 'stopped' not in report
@@ -0,0 +1,110 @@
+"""
+Claim submission - the airline's nodal officer gets each claim email once,
+even when the job is retried after the email left
+"""
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from backend.database.db_session import engine
+from backend.database.models import Base, Claim, ClaimActivity, ClaimStatus, DisruptionType, User
+from backend.utils.claim_jobs import SUBMISSION_STARTED, ClaimProcessor
+from backend.utils.job_queue import JobQueue, PermanentJobError
+from backend.utils.mailer import MailError, SmtpMailer
+
+
+class FakeMailer(SmtpMailer):
+    def __init__(self, failures=()):
+        super().__init__('smtp.test', 587, 'claims@flyclaim.test', 'secret')
+        self.failures = list(failures)
+        self.sent = []
+
+    def send(self, to, subject, body, cc=None, attachment_path=None, message_id=None):
+        if self.failures:
+            raise self.failures.pop(0)
+        self.sent.append({'to': to, 'message_id': message_id})
+        return message_id
+
+
+class CrashAfterSend(FakeMailer):
+    """The email leaves, then the worker dies before committing"""
+
+    def send(self, *args, **kwargs):
+        super().send(*args, **kwargs)
+        raise RuntimeError('worker lost its lease')
+
+
+@pytest.fixture
+def session_factory():
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine)
+
+
+@pytest.fixture
+def claim_id(session_factory):
+    with session_factory() as session:
+        user = User(phone_number=f'+91{datetime.utcnow().timestamp():.6f}', email='p@example.com')
+        session.add(user)
+        session.flush()
+        claim = Claim(user_id=user.id, claim_reference=f'FC-TEST-{user.id}', flight_number='6E-234',
+                      airline_code='6E', airline_name='IndiGo', flight_date=datetime(2025, 1, 1),
+                      disruption_type=DisruptionType.DELAY, delay_hours=4,
+                      status=ClaimStatus.DOCUMENT_GENERATED)
+        session.add(claim)
+        session.commit()
+        return claim.id
+
+
+def processor(session_factory, mailer):
+    return ClaimProcessor(queue=JobQueue(session_factory=session_factory), session_factory=session_factory,
+                          mailer=mailer, email_submission=True, pdf_letters=False)
+
+
+def submit(session_factory, mailer, claim_id):
+    processor(session_factory, mailer).submit({'claim_id': claim_id}, {'priority': 0})
+
+
+def status_of(session_factory, claim_id):
+    with session_factory() as session:
+        return session.get(Claim, claim_id).status
+
+
+def test_retry_after_send_does_not_email_again(session_factory, claim_id):
+    crashing = CrashAfterSend()
+    with pytest.raises(RuntimeError):
+        submit(session_factory, crashing, claim_id)
+    assert status_of(session_factory, claim_id) == ClaimStatus.DOCUMENT_GENERATED
+
+    retry = FakeMailer()
+    submit(session_factory, retry, claim_id)
+    assert len(crashing.sent) == 1 and retry.sent == []
+    assert status_of(session_factory, claim_id) == ClaimStatus.SUBMITTED_TO_AIRLINE
+
+
+def test_failed_send_is_retried(session_factory, claim_id):
+    mailer = FakeMailer(failures=[MailError('SMTP unavailable', retryable=True)])
+    with pytest.raises(MailError):
+        submit(session_factory, mailer, claim_id)
+    with session_factory() as session:
+        assert session.query(ClaimActivity).filter_by(
+            claim_id=claim_id, activity_type=SUBMISSION_STARTED).count() == 0
+
+    submit(session_factory, mailer, claim_id)
+    assert len(mailer.sent) == 1
+    with session_factory() as session:
+        reference = session.get(Claim, claim_id).claim_reference
+    assert mailer.sent[0]['message_id'] == f'<{reference}@flyclaim.test>'
+    assert status_of(session_factory, claim_id) == ClaimStatus.SUBMITTED_TO_AIRLINE
+
+    submit(session_factory, mailer, claim_id)  # Already submitted: no-op
+    assert len(mailer.sent) == 1
+
+
+def test_rejected_send_is_permanent(session_factory, claim_id):
+    mailer = FakeMailer(failures=[MailError('recipient refused', retryable=False)])
+    with pytest.raises(PermanentJobError):
+        submit(session_factory, mailer, claim_id)
+    assert mailer.sent == []
+    assert status_of(session_factory, claim_id) == ClaimStatus.DOCUMENT_GENERATED
@@ -0,0 +1,60 @@
+"""
+Conversation store - two workers sharing one database never serve each
+other's stale conversations, and only the conversation asks for a missing
+delay length
+"""
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from backend.agents.intake_agent import IntakeAgent
+from backend.database.db_session import build_engine
+from backend.database.models import Base
+from backend.utils.conversation_store import ConversationStore
+
+
+@pytest.fixture
+def workers(tmp_path):
+    engine = build_engine(f"sqlite:///{tmp_path / 'conversations.db'}")
+    Base.metadata.create_all(engine)
+    session_factory = sessionmaker(bind=engine)
+    return (ConversationStore(memory_ttl_seconds=600, session_factory=session_factory),
+            ConversationStore(memory_ttl_seconds=600, session_factory=session_factory))
+
+
+def test_save_on_another_worker_is_seen(workers):
+    a, b = workers
+    a.save('+911', {'flight_number': '6E-1'}, ['flight_date'], turns=1)
+    assert b.get('+911')['fields']['flight_number'] == '6E-1'
+
+    b.save('+911', {'flight_number': '6E-1', 'flight_date': '2025-01-01'}, ['delay_hours'], turns=2)
+    conversation = a.get('+911')
+    assert conversation['fields']['flight_date'] == '2025-01-01'
+    assert conversation['pending'] == ['delay_hours'] and conversation['turns'] == 2
+
+
+def test_clear_on_another_worker_is_seen(workers):
+    a, b = workers
+    a.save('+912', {'flight_number': 'AI-2'}, [], turns=1)
+    assert a.get('+912') is not None
+    b.clear('+912')
+    assert a.get('+912') is None
+
+
+def test_unchanged_row_is_served_from_memory(workers):
+    a, _ = workers
+    a.save('+913', {'flight_number': 'SG-3'}, [], turns=1)
+    a.get('+913')
+    a.get('+913')
+    assert a.stats()['memory_hits'] == 2 and a.stats()['db_hits'] == 0
+
+
+def test_only_the_conversation_requires_delay_hours():
+    extracted = {'flight_number': '6E-234', 'flight_date': '2025-01-01', 'disruption_type': 'delay'}
+    agent = IntakeAgent()
+
+    api = agent.validate_extracted_data(dict(extracted))
+    assert api['is_valid'] and 'Delay duration not specified' in api['warnings']
+
+    whatsapp = agent.validate_extracted_data(dict(extracted), require_delay_hours=True)
+    assert not whatsapp['is_valid'] and whatsapp['required_follow_up'] == ['delay_hours']
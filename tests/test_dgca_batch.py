@@ -0,0 +1,81 @@
+"""
+Batch eligibility - calculate_compensation_batch agrees with the scalar
+DGCARulesEngine.calculate_compensation on randomized claims
+"""
+
+import random
+
+import pytest
+
+from backend.utils.dgca_batch import calculate_compensation_batch, score_claims_batch
+from backend.utils.dgca_rules import DGCARulesEngine, DisruptionType
+
+
+CASES = 20000
+
+REASONS = [
+    None, '', 'technical fault', 'crew shortage', 'heavy fog at Delhi', 'Cyclone warning',
+    'atc strike', 'strike by ground staff', 'bird hit', 'political unrest', 'operational reasons'
+]
+
+# Exact threshold values exercise the >= comparisons
+DELAYS = [None, 0, 1.9, 2, 2.5, 3, 4, 5.99, 6, 8, 12]
+DURATIONS = [None, 0.5, 1, 1.5, 2, 2.01, 3, 6, 10]
+
+
+def random_claims(count, seed=20250101):
+    rng = random.Random(seed)
+    return [
+        {
+            'flight_duration_hours': rng.choice(DURATIONS + [round(rng.uniform(0.3, 14), 2)]),
+            'delay_hours': rng.choice(DELAYS + [round(rng.uniform(0, 15), 2)]),
+            'is_international': rng.random() < 0.3,
+            'disruption_type': rng.choice(list(DisruptionType)).value,
+            'notification_days': rng.choice([None, 0, 3, 13, 14, 15, rng.randint(0, 30)]),
+            'alternative_offered_within_hours': rng.choice([None, 0, 1.5, 2, 2.5, 24, round(rng.uniform(0, 30), 1)]),
+            'exemption_reason': rng.choice(REASONS),
+            'fare_paid': rng.choice([None, 0, 4999.5, rng.randint(1500, 60000)])
+        }
+        for _ in range(count)
+    ]
+
+
+def scalar(claim):
+    duration = claim['flight_duration_hours']
+    return DGCARulesEngine.calculate_compensation(
+        disruption_type=DisruptionType(claim['disruption_type']),
+        flight_duration_hours=2.0 if duration is None else duration,
+        delay_hours=claim['delay_hours'],
+        is_international=claim['is_international'],
+        exemption_reason=claim['exemption_reason'],
+        notification_days=claim['notification_days'],
+        alternative_offered_within_hours=claim['alternative_offered_within_hours'],
+        fare_paid=claim['fare_paid']
+    )
+
+
+def test_batch_matches_scalar_engine():
+    claims = random_claims(CASES)
+    batch = calculate_compensation_batch(**{
+        name: [claim[name] for claim in claims] for name in claims[0]
+    })
+
+    mismatches = []
+    for index, claim in enumerate(claims):
+        expected = scalar(claim)
+        got = {
+            'eligible': bool(batch['eligible'][index]),
+            'compensation_amount': int(batch['compensation_amount'][index]),
+            'exemption_applied': bool(batch['exemption_applied'][index]),
+            'exemption_reason': batch['exemption_reason'][index]
+        }
+        if any(got[key] != expected[key] for key in got):
+            mismatches.append((claim, expected, got))
+
+    assert not mismatches[:5], f"{len(mismatches)} of {CASES} claims differ"
+    assert batch['rules_version'] == expected['rules_version']
+
+
+def test_score_claims_batch_rejects_ragged_columns():
+    with pytest.raises(ValueError):
+        score_claims_batch({'delay_hours': [3, 4], 'flight_duration_hours': [1.5]})
@@ -0,0 +1,28 @@
+"""
+DGCA rules engine - the class-level tables callers used before the rules
+file still read the active rule set
+"""
+
+import pytest
+
+from backend.utils.dgca_rules import DGCARulesEngine
+
+
+def test_legacy_tables_match_original_values():
+    assert dict(DGCARulesEngine.COMPENSATION_MATRIX['domestic_short']) == {
+        'delay_threshold': 2, 'compensation': 5000, 'applies_to_cancellation': True
+    }
+    assert dict(DGCARulesEngine.COMPENSATION_MATRIX['international']) == {
+        'delay_threshold': 4, 'compensation': 20000, 'applies_to_cancellation': True
+    }
+    assert dict(DGCARulesEngine.DENIED_BOARDING_COMPENSATION) == {
+        'domestic_short': 10000, 'domestic_medium': 10000, 'domestic_long': 10000, 'international': 20000
+    }
+    assert dict(DGCARulesEngine.DOWNGRADE_REFUND_PERCENTAGE) == {'domestic': 75, 'international': 50}
+
+
+def test_legacy_tables_are_read_only():
+    with pytest.raises(TypeError):
+        DGCARulesEngine.DENIED_BOARDING_COMPENSATION['international'] = 0
+    with pytest.raises(TypeError):
+        DGCARulesEngine.COMPENSATION_MATRIX['international']['compensation'] = 0
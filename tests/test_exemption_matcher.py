@@ -0,0 +1,77 @@
+"""
+Exemption matching - the precompiled vocabulary must not exempt reasons the
+original substring check paid out on
+"""
+
+from typing import Optional, Tuple
+
+import pytest
+
+from backend.utils.dgca_rules import DGCARulesEngine, DisruptionType, ExemptionReason
+
+
+def baseline_check_exemption(reason: str) -> Tuple[bool, Optional[ExemptionReason]]:
+    """The extraordinary-circumstances check as it was before the vocabulary"""
+    exempt_reasons = [
+        "weather", "extraordinary weather", "cyclone", "storm",
+        "security", "security threat", "terrorism",
+        "atc strike", "air traffic control strike",
+        "political instability", "riots", "civil unrest"
+    ]
+    if reason and any(exempt in reason.lower() for exempt in exempt_reasons):
+        if "weather" in reason.lower():
+            return True, ExemptionReason.WEATHER
+        elif "security" in reason.lower():
+            return True, ExemptionReason.SECURITY
+        elif "atc" in reason.lower() or "strike" in reason.lower():
+            return True, ExemptionReason.ATC_STRIKE
+        elif "political" in reason.lower() or "riot" in reason.lower():
+            return True, ExemptionReason.POLITICAL_INSTABILITY
+    return False, None
+
+
+def check(reason: str):
+    return DGCARulesEngine.check_exemption(DisruptionType.DELAY, reason)
+
+
+@pytest.mark.parametrize('reason', [
+    'bird strike',
+    'pilots strike',
+    'crew strike',
+    'cabin crew on strike',
+    'ATC congestion',
+    'atc delay due to traffic',
+    'hartal in the city',
+    'strike',
+    'brainstorm session overran',
+    'technical snag'
+])
+def test_not_exempt_as_before(reason):
+    assert baseline_check_exemption(reason) == (False, None)
+    assert check(reason) == (False, None)
+
+
+@pytest.mark.parametrize('reason', [
+    'ATC strike',
+    'air traffic control strike at Delhi',
+    'bad weather',
+    'weather conditions',
+    'security threat at the terminal',
+    'political instability',
+    'political riots'
+])
+def test_exempt_as_before(reason):
+    assert check(reason) == baseline_check_exemption(reason)
+
+
+@pytest.mark.parametrize('reason, expected', [
+    ('heavy fog at Delhi', ExemptionReason.WEATHER),
+    ('kharab mausam', ExemptionReason.WEATHER),
+    ('ATC  strike', ExemptionReason.ATC_STRIKE),
+    ('airport hartal', ExemptionReason.ATC_STRIKE),
+    ('एटीसी हड़ताल', ExemptionReason.ATC_STRIKE),
+    ('riots near the airport', ExemptionReason.POLITICAL_INSTABILITY),
+    ('storm and security alert', ExemptionReason.WEATHER)
+])
+def test_vocabulary_phrases(reason, expected):
+    assert check(reason) == (True, expected)
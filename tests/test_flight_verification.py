@@ -0,0 +1,124 @@
+"""
+Flight verification - cached rows expire by flight status, and concurrent
+lookups for one flight share a single provider call
+"""
+
+import json
+import threading
+from datetime import datetime
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from backend.database.db_session import build_engine
+from backend.database.models import Base, FlightVerification
+from backend.utils.flight_verification import (
+    STATUS_TTL_SECONDS, FileFlightProvider, FlightDataProvider, FlightVerificationService
+)
+
+
+FLIGHTS = [
+    {'flight_number': '6E-234', 'flight_date': '2026-10-01', 'status': 'landed', 'delay_minutes': 315},
+    {'flight_number': 'AI-101', 'flight_date': '2026-10-02', 'status': 'delayed', 'delay_minutes': 95},
+    {'flight_number': 'SG-8169', 'flight_date': '2026-10-03', 'status': 'scheduled'}
+]
+
+
+@pytest.fixture
+def flights_file(tmp_path):
+    path = tmp_path / 'flights.json'
+    path.write_text(json.dumps(FLIGHTS))
+    return str(path)
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = build_engine(f"sqlite:///{tmp_path / 'flights.db'}")
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine)
+
+
+def ttl_seconds(result):
+    if result['expires_at'] is None:
+        return None
+    expires_at = datetime.fromisoformat(result['expires_at'])
+    return round((expires_at - datetime.fromisoformat(result['verified_at'])).total_seconds())
+
+
+def test_provider_must_implement_fetch():
+    with pytest.raises(TypeError):
+        FlightDataProvider()
+
+
+@pytest.mark.parametrize('flight_number, flight_date, status', [
+    ('6E234', '2026-10-01', 'landed'),
+    ('ai 101', '2026-10-02', 'delayed'),
+    ('SG-8169', '2026-10-03', 'scheduled'),
+    ('UK-999', '2026-10-04', 'not_found')
+])
+def test_rows_expire_by_flight_status(flights_file, session_factory, flight_number, flight_date, status):
+    provider = FileFlightProvider(flights_file)
+    service = FlightVerificationService(provider, session_factory=session_factory, evict_interval=0)
+
+    first = service.verify(flight_number, flight_date)
+    assert first['status'] == status and first['source'] == 'file'
+    assert ttl_seconds(first) == STATUS_TTL_SECONDS[status]
+
+    again = service.verify(flight_number, flight_date)
+    assert again['source'] == 'cache' and provider.calls == 1
+
+
+def test_expired_row_is_fetched_again(flights_file, session_factory):
+    provider = FileFlightProvider(flights_file)
+    service = FlightVerificationService(provider, session_factory=session_factory, evict_interval=0)
+    service.verify('AI-101', '2026-10-02')
+
+    with session_factory() as session:
+        session.query(FlightVerification).update({'expires_at': datetime(2000, 1, 1)})
+        session.commit()
+
+    assert service.verify('AI-101', '2026-10-02')['source'] == 'file'
+    assert provider.calls == 2
+    assert service.evict_expired() == 0  # The refresh replaced the expired row
+
+
+class BlockingProvider(FileFlightProvider):
+    """Holds every fetch until released, so callers pile up behind the first"""
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def fetch(self, flight_number, flight_date):
+        self.started.set()
+        self.release.wait(5)
+        return super().fetch(flight_number, flight_date)
+
+
+def test_concurrent_lookups_share_one_provider_call(flights_file, session_factory):
+    provider = BlockingProvider(flights_file)
+    service = FlightVerificationService(provider, session_factory=session_factory, evict_interval=0)
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(service.verify('6E-234', '2026-10-01')))
+    leader.start()
+    assert provider.started.wait(5)
+    followers = [
+        threading.Thread(target=lambda: results.append(service.verify('6e 234', '2026-10-01')))
+        for _ in range(7)
+    ]
+    for thread in followers:
+        thread.start()
+    for _ in range(500):
+        if service.stats()['coalesced'] == 7:
+            break
+        threading.Event().wait(0.01)
+    provider.release.set()
+    for thread in [leader] + followers:
+        thread.join(5)
+
+    assert provider.calls == 1
+    assert len(results) == 8 and {r['status'] for r in results} == {'landed'}
+    stats = service.stats()
+    assert stats['misses'] == 1 and stats['coalesced'] == 7
@@ -0,0 +1,41 @@
+"""
+Database upgrade - tables created from older models gain the new columns
+"""
+
+from datetime import datetime
+
+from sqlalchemy import inspect, text
+from sqlalchemy.orm import sessionmaker
+
+from backend.database.db_session import build_engine
+from backend.database.init_db import create_tables
+from backend.database.models import Base, Claim, DisruptionType, User
+
+
+def test_create_tables_adds_columns_missing_from_old_tables(tmp_path):
+    engine = build_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    Base.metadata.create_all(engine)
+    # As created before Claim.rules_version existed
+    with engine.begin() as connection:
+        connection.execute(text('ALTER TABLE claims DROP COLUMN rules_version'))
+        connection.execute(text(
+            "INSERT INTO users (id, phone_number) VALUES (1, '+910000000000')"
+        ))
+        connection.execute(text(
+            "INSERT INTO claims (claim_reference, user_id, flight_number, flight_date, disruption_type, status)"
+            " VALUES ('FC-1', 1, '6E-1', '2025-01-01 00:00:00', 'DELAY', 'INITIATED')"
+        ))
+
+    create_tables(engine)
+
+    assert 'rules_version' in {column['name'] for column in inspect(engine).get_columns('claims')}
+    with sessionmaker(bind=engine)() as session:
+        claim = session.query(Claim).one()
+        assert claim.claim_reference == 'FC-1' and claim.rules_version is None
+        session.add(Claim(user_id=1, claim_reference='FC-2', flight_number='6E-2',
+                          flight_date=datetime(2025, 1, 2), disruption_type=DisruptionType.DELAY,
+                          rules_version='2024.3'))
+        session.commit()
+        assert session.query(User).count() == 1
+
+    create_tables(engine)  # Idempotent
@@ -0,0 +1,228 @@
+"""
+Outbound WhatsApp queue against the fake Twilio server - retries with
+backoff on 429/5xx, re-claiming expired leases, statuses that only move
+forward, and callbacks that arrive before the SID is stored
+"""
+
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+from backend.database.db_session import build_engine
+from backend.database.models import Base, MessageStatusEvent, OutboundMessage
+from backend.utils.fake_twilio import FakeTwilioServer
+from backend.utils.outbound_sender import OutboundQueue, TwilioRestClient
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = build_engine(f"sqlite:///{tmp_path / 'outbound.db'}")
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine)
+
+
+@pytest.fixture
+def twilio():
+    server = FakeTwilioServer().start()
+    yield server
+    server.stop()
+
+
+def make_queue(session_factory, twilio, **kwargs):
+    client = TwilioRestClient('AC123', 'token', base_url=twilio.url, timeout=5)
+    options = dict(rate_per_second=1000, burst=1000, backoff_base=0.001, backoff_max=0.01)
+    options.update(kwargs)
+    return OutboundQueue(client, 'whatsapp:+14155238886', session_factory=session_factory, **options)
+
+
+def enqueue(session_factory, body='Your claim FC-1 was filed'):
+    with session_factory() as session:
+        row = OutboundMessage(to_number='whatsapp:+919876543210', body=body, status='queued',
+                              next_attempt_at=datetime.utcnow())
+        session.add(row)
+        session.commit()
+        return row.id
+
+
+def load(session_factory, message_id):
+    with session_factory() as session:
+        return session.get(OutboundMessage, message_id)
+
+
+def respond_with(twilio, errors):
+    """Answer the next create requests with these statuses, then accept"""
+    errors = list(errors)
+    admit = twilio._admit
+
+    def scripted():
+        if errors:
+            twilio.requests += 1
+            return errors.pop(0)
+        return admit()
+
+    twilio._admit = scripted
+
+
+def dispatch_when_due(queue):
+    time.sleep(0.02)  # Past the (tiny) backoff
+    return queue.dispatch_once()
+
+
+@pytest.mark.parametrize('error', [429, 500])
+def test_transient_error_is_retried_with_backoff(session_factory, twilio, error):
+    queue = make_queue(session_factory, twilio)
+    message_id = enqueue(session_factory)
+    respond_with(twilio, [error])
+
+    before = datetime.utcnow()
+    assert queue.dispatch_once() == 1
+    row = load(session_factory, message_id)
+    assert row.status == 'queued' and row.attempts == 1
+    assert f'Twilio {error}' in row.last_error
+    assert before <= row.next_attempt_at <= datetime.utcnow() + timedelta(seconds=queue.backoff_max)
+    assert queue.stats()['retried'] == 1
+
+    assert dispatch_when_due(queue) == 1
+    row = load(session_factory, message_id)
+    assert row.status == 'sent' and row.attempts == 2
+    assert row.provider_sid == twilio.messages[0]['sid'] and row.last_error is None
+
+
+def test_gives_up_after_max_attempts(session_factory, twilio):
+    queue = make_queue(session_factory, twilio, max_attempts=3)
+    message_id = enqueue(session_factory)
+    respond_with(twilio, [500, 503, 429])
+
+    queue.dispatch_once()
+    dispatch_when_due(queue)
+    dispatch_when_due(queue)
+    row = load(session_factory, message_id)
+    assert row.status == 'failed' and row.attempts == 3
+    assert twilio.requests == 3 and not twilio.messages
+    assert dispatch_when_due(queue) == 0
+
+
+def test_expired_lease_is_claimed_again(session_factory, twilio):
+    message_id = enqueue(session_factory)
+    crashed = make_queue(session_factory, twilio, lease_seconds=0.05)
+    assert [m['id'] for m in crashed._claim_batch()] == [message_id]  # Then the worker dies
+
+    survivor = make_queue(session_factory, twilio, lease_seconds=0.05)
+    assert survivor.dispatch_once() == 0  # Still leased
+    time.sleep(0.1)
+    assert survivor.dispatch_once() == 1
+    row = load(session_factory, message_id)
+    assert row.status == 'sent' and row.attempts == 2
+    assert len(twilio.messages) == 1
+
+
+def test_status_only_moves_forward(session_factory, twilio):
+    queue = make_queue(session_factory, twilio)
+    message_id = enqueue(session_factory)
+    queue.dispatch_once()
+    sid = load(session_factory, message_id).provider_sid
+
+    assert queue.record_status(sid, 'delivered')
+    assert not queue.record_status(sid, 'sent')  # Late, out of order
+    assert load(session_factory, message_id).status == 'delivered'
+    assert queue.record_status(sid, 'read')
+    assert queue.record_status(sid, 'failed', error_code='63016')
+    assert not queue.record_status(sid, 'read')  # failed is final
+    row = load(session_factory, message_id)
+    assert row.status == 'failed' and row.last_error == 'Twilio error 63016'
+    assert row.delivered_at is not None
+
+
+def test_callback_before_sid_write_is_applied_from_stored_events(session_factory, twilio):
+    sender = make_queue(session_factory, twilio)
+    other_worker = make_queue(session_factory, twilio)
+    message_id = enqueue(session_factory)
+
+    create = twilio._create_message
+
+    def create_and_call_back(form):
+        # Twilio reports delivery (handled by another worker) before the
+        # send response reaches the dispatcher
+        message = create(form)
+        with session_factory() as session:
+            for status in ('sent', 'delivered'):
+                session.add(MessageStatusEvent(message_sid=message['sid'], status=status,
+                                               received_at=datetime.utcnow()))
+            session.commit()
+        assert not other_worker.record_status(message['sid'], 'delivered')
+        return message
+
+    twilio._create_message = create_and_call_back
+    sender.dispatch_once()
+
+    row = load(session_factory, message_id)
+    assert row.status == 'delivered' and row.delivered_at is not None
+    assert other_worker.stats()['early_callbacks'] == 1
+    assert sender.stats()['delivered'] == 1
+
+
+def test_batch_of_callbacks_uses_set_based_updates(session_factory, twilio):
+    queue = make_queue(session_factory, twilio, batch_size=10)
+    ids = [enqueue(session_factory, body=f'Message {n}') for n in range(6)]
+    queue.dispatch_once()
+    sids = [load(session_factory, message_id).provider_sid for message_id in ids]
+    now = datetime.utcnow()
+
+    events = [{'message_sid': sid, 'status': 'delivered', 'error_code': None, 'received_at': now}
+              for sid in sids[:4]]
+    events += [
+        {'message_sid': sids[0], 'status': 'sent', 'error_code': None, 'received_at': now},  # Late
+        {'message_sid': sids[1], 'status': 'read', 'error_code': None, 'received_at': now},
+        {'message_sid': sids[4], 'status': 'undelivered', 'error_code': '63024', 'received_at': now},
+        {'message_sid': 'SM-not-ours', 'status': 'delivered', 'error_code': None, 'received_at': now}
+    ]
+
+    statements = []
+    engine = session_factory.kw['bind']
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement.split()[0])
+
+    event.listen(engine, 'before_cursor_execute', count)
+    try:
+        assert queue.apply_statuses(events) == 5
+    finally:
+        event.remove(engine, 'before_cursor_execute', count)
+
+    # One SELECT, an UPDATE per resulting status (delivered, read,
+    # undelivered) and one executemany for delivered_at
+    assert statements == ['SELECT', 'UPDATE', 'UPDATE', 'UPDATE', 'UPDATE']
+    assert [load(session_factory, message_id).status for message_id in ids] == [
+        'delivered', 'read', 'delivered', 'delivered', 'undelivered', 'sent'
+    ]
+    assert load(session_factory, ids[4]).last_error == 'Twilio error 63024'
+    stats = queue.stats()
+    assert stats['delivered'] == 4 and stats['failed'] == 1 and stats['early_callbacks'] == 1
+
+
+def test_restarted_queue_sends_pending_rows_without_a_new_enqueue(session_factory, twilio):
+    retry_id = enqueue(session_factory, body='Queued for a retry')
+    leased_id = enqueue(session_factory, body='Leased by a worker that died')
+    crashed = make_queue(session_factory, twilio, lease_seconds=0.05)
+    crashed._claim_batch()
+    with session_factory() as session:
+        retry = session.get(OutboundMessage, retry_id)
+        retry.status, retry.attempts = 'queued', 1
+        session.commit()
+    time.sleep(0.1)  # The dead worker's lease runs out
+
+    restarted = make_queue(session_factory, twilio, poll_interval=0.01)
+    restarted.start()
+    try:
+        for _ in range(500):
+            if len(twilio.messages) == 2:
+                break
+            time.sleep(0.01)
+    finally:
+        restarted.stop()
+
+    assert {load(session_factory, m).status for m in (retry_id, leased_id)} == {'sent'}
+    assert restarted.stats()['enqueued'] == 0
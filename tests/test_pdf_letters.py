@@ -0,0 +1,92 @@
+"""
+PDF letters - a claim's stored letter outlives cache eviction, and a hit
+that races an eviction does not leak its file handle
+"""
+
+import os
+from concurrent.futures import Future
+
+import pytest
+
+from backend.utils import pdf_letters
+from backend.utils.pdf_letters import PdfLetterCache, render_letter_pdf
+
+
+LETTER = 'To the Nodal Officer\n\nFlight 6E-234 was delayed by 4 hours.\n\nCompensation due: 10000'
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = PdfLetterCache(cache_dir=str(tmp_path / 'cache'), letter_dir=str(tmp_path / 'letters'))
+
+    def render_inline(letter_text, path, title):
+        # No process pool in tests
+        future = Future()
+        future.set_result(render_letter_pdf(letter_text, path, title, cache.font_path))
+        return future
+
+    cache._submit = render_inline
+    return cache
+
+
+def test_stored_letter_survives_eviction(cache):
+    pdf_file, key = cache.open(LETTER)
+    with pdf_file:
+        path = cache.store(pdf_file, 'FC-20250101-6E234-0001')
+        assert pdf_file.read(5) == b'%PDF-'  # Rewound for streaming
+
+    assert cache.evict(target_bytes=0) == 1
+    assert not os.path.exists(cache.path_for(key))
+    with open(path, 'rb') as f:
+        assert f.read(5) == b'%PDF-'
+    assert os.path.dirname(path) == cache.letter_dir
+
+
+def test_store_name_stays_in_letter_dir(cache):
+    pdf_file, _ = cache.open(LETTER)
+    with pdf_file:
+        path = cache.store(pdf_file, '../FC/1')
+    assert os.path.dirname(path) == cache.letter_dir
+
+
+def test_hit_evicted_before_utime_closes_its_handle(cache, monkeypatch):
+    pdf_file, key = cache.open(LETTER)
+    pdf_file.close()
+    path = cache.path_for(key)
+
+    opened = []
+
+    def tracking_open(*args, **kwargs):
+        f = open(*args, **kwargs)
+        opened.append(f)
+        return f
+
+    def evicted_utime(target, *args, **kwargs):
+        monkeypatch.undo()  # Only the first hit races
+        os.remove(target)
+        raise FileNotFoundError(target)
+
+    monkeypatch.setattr(pdf_letters, 'open', tracking_open, raising=False)
+    monkeypatch.setattr(pdf_letters.os, 'utime', evicted_utime)
+
+    pdf_file, _ = cache.open(LETTER)
+    with pdf_file:
+        assert pdf_file.read(5) == b'%PDF-'
+    assert opened[0].closed
+    assert os.path.exists(path)  # Rendered again
+    assert cache.stats()['rendered'] == 2
+
+
+def test_file_in_use_is_skipped_by_eviction(cache, monkeypatch):
+    pdf_file, key = cache.open(LETTER)
+    pdf_file.close()
+    _, entries = cache._scan()
+    size = entries[0][1]
+
+    def in_use(path):
+        raise PermissionError(13, 'The process cannot access the file', path)
+
+    monkeypatch.setattr(pdf_letters.os, 'remove', in_use)
+    assert cache.evict(target_bytes=0) == 0
+    assert os.path.exists(cache.path_for(key))
+    assert cache.stats()['cache_bytes'] == size
@@ -0,0 +1,31 @@
+"""
+Claim pipeline - passengers on the same flight and day get distinct claim
+references
+"""
+
+import pytest
+
+from backend.app import app
+
+
+MESSAGE = 'My IndiGo flight 6E-234 from Delhi to Mumbai on 2026-10-01 was delayed by 5 hours'
+
+
+@pytest.fixture
+def client():
+    return app.test_client()
+
+
+def test_same_flight_same_day_gets_distinct_references(client):
+    first = client.post('/api/pipeline', json={'message': MESSAGE, 'passenger_name': 'Asha'}).get_json()
+    second = client.post('/api/pipeline', json={'message': MESSAGE, 'passenger_name': 'Ravi'}).get_json()
+
+    assert first['status'] == second['status'] == 'ready_to_send'
+    assert first['claim_reference'] != second['claim_reference']
+    assert first['claim_reference'].startswith('FC-') and '-6E-234-' in first['claim_reference']
+    assert first['claim_reference'] in first['stages']['letter']['claim_letter']
+
+
+def test_supplied_reference_is_kept(client):
+    result = client.post('/api/pipeline', json={'message': MESSAGE, 'claim_reference': 'FC-N8N-42'}).get_json()
+    assert result['claim_reference'] == 'FC-N8N-42'
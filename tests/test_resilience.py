@@ -0,0 +1,48 @@
+"""
+Resilient caller - the dependency gets each attempt's timeout, and only
+transient errors count against the circuit breaker
+"""
+
+import pytest
+
+from backend.utils.resilience import CircuitBreaker, CircuitOpenError, ResilientCaller
+
+
+def make_caller(**kwargs):
+    options = dict(max_attempts=1, breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60))
+    options.update(kwargs)
+    return ResilientCaller('test', **options)
+
+
+def test_attempt_timeout_is_passed_to_the_call():
+    seen = []
+    caller = make_caller(attempt_timeout=2, deadline=10,
+                         timeout_kwargs=lambda timeout: {'request_options': {'timeout': timeout}})
+
+    assert caller.call(lambda prompt, request_options: seen.append(request_options) or prompt, 'hi') == 'hi'
+    assert seen == [{'timeout': 2}]
+
+
+def test_non_transient_errors_do_not_open_the_breaker():
+    caller = make_caller()
+
+    def rejected():
+        raise ValueError('400 invalid argument')
+
+    for _ in range(5):
+        with pytest.raises(ValueError):
+            caller.call(rejected)
+    assert caller.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_transient_errors_open_the_breaker():
+    caller = make_caller()
+
+    def unavailable():
+        raise ConnectionError('503')
+
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            caller.call(unavailable)
+    with pytest.raises(CircuitOpenError):
+        caller.call(unavailable)
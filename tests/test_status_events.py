@@ -0,0 +1,47 @@
+"""
+Status event buffer - a batch put back after a failed flush still counts
+against max_buffered, and restarting the flusher adds no exit handlers
+"""
+
+import pytest
+
+from backend.utils import status_events
+from backend.utils.status_events import StatusEventBuffer
+
+
+class DatabaseDown(Exception):
+    pass
+
+
+def test_failed_flush_keeps_buffer_within_cap(monkeypatch):
+    monkeypatch.setattr(status_events.atexit, 'register', lambda fn: None)  # No final flush at exit
+    buffer = StatusEventBuffer(max_batch=3, max_buffered=4)
+    buffer.start = lambda: None  # No flusher thread; flushed by hand below
+    for n in range(3):
+        buffer.record(f'SM{n}', 'sent')
+
+    def insert_while_more_arrive(batch):
+        for n in range(3, 6):
+            buffer.record(f'SM{n}', 'delivered')
+        raise DatabaseDown('database is down')
+
+    buffer._insert = insert_while_more_arrive
+    with pytest.raises(DatabaseDown):
+        buffer.flush()
+
+    # Oldest dropped first, as when the cap is reached in record()
+    assert [event['message_sid'] for event in buffer._buffer] == ['SM2', 'SM3', 'SM4', 'SM5']
+    stats = buffer.stats()
+    assert stats['buffered'] == 4 and stats['dropped'] == 2 and stats['flush_failures'] == 1
+
+
+def test_exit_handler_is_registered_once(monkeypatch):
+    registered = []
+    monkeypatch.setattr(status_events.atexit, 'register', registered.append)
+    buffer = StatusEventBuffer(flush_interval=0.01)
+    buffer.flush = lambda: 0  # Nothing to write
+
+    for _ in range(3):
+        buffer.start()
+        buffer.stop()
+    assert registered == [buffer.stop]
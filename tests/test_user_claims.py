@@ -0,0 +1,81 @@
+"""
+User claims listing - every claim without paging parameters, keyset pages
+with limit or cursor
+"""
+
+import base64
+from datetime import datetime
+
+import pytest
+from flask import Flask
+
+from backend.database.db_session import db_session, engine
+from backend.database.models import Base, Claim, ClaimStatus, DisruptionType, User
+from backend.routes.web_api import CLAIMS_PAGE_SIZE, web_api_bp
+
+
+@pytest.fixture
+def client():
+    Base.metadata.create_all(engine)
+    app = Flask(__name__)
+    app.register_blueprint(web_api_bp)
+    app.teardown_appcontext(lambda exc: db_session.remove())
+    return app.test_client()
+
+
+@pytest.fixture
+def user_id():
+    count = CLAIMS_PAGE_SIZE + 5
+    session = db_session()
+    try:
+        user = User(phone_number=f'+91{datetime.utcnow().timestamp():.6f}')
+        session.add(user)
+        session.flush()
+        session.add_all(
+            Claim(user_id=user.id, claim_reference=f'FC-LIST-{user.id}-{n}', flight_number='6E-234',
+                  airline_name='IndiGo', flight_date=datetime(2025, 1, 1 + n % 28),
+                  disruption_type=DisruptionType.DELAY, status=ClaimStatus.INITIATED)
+            for n in range(count)
+        )
+        session.commit()
+        return user.id
+    finally:
+        db_session.remove()
+
+
+def test_without_paging_parameters_every_claim_is_returned(client, user_id):
+    response = client.get(f'/api/users/{user_id}/claims')
+    assert response.status_code == 200
+    claims = response.get_json()
+    assert len(claims) == CLAIMS_PAGE_SIZE + 5
+    assert 'X-Next-Cursor' not in response.headers
+    assert [c['id'] for c in claims] == sorted((c['id'] for c in claims), reverse=True)
+
+
+def test_limit_and_cursor_page_through_the_same_claims(client, user_id):
+    everything = [c['id'] for c in client.get(f'/api/users/{user_id}/claims').get_json()]
+
+    seen = []
+    response = client.get(f'/api/users/{user_id}/claims?limit=20')
+    while True:
+        seen += [c['id'] for c in response.get_json()]
+        cursor = response.headers.get('X-Next-Cursor')
+        if cursor is None:
+            break
+        response = client.get(f'/api/users/{user_id}/claims?cursor={cursor}&limit=20')
+    assert seen == everything
+
+
+def test_cursor_alone_uses_the_default_page_size(client, user_id):
+    first = client.get(f'/api/users/{user_id}/claims?limit=1')
+    response = client.get(f"/api/users/{user_id}/claims?cursor={first.headers['X-Next-Cursor']}")
+    assert len(response.get_json()) == CLAIMS_PAGE_SIZE
+    assert 'X-Next-Cursor' in response.headers
+
+
+@pytest.mark.parametrize('key', ['{}', '"id"', '7', '[]', '["x"]'])
+def test_malformed_cursor_is_rejected(client, user_id, key):
+    cursor = base64.urlsafe_b64encode(key.encode()).decode()
+    for dates in ('', '&date_from=2025-01-01'):
+        response = client.get(f'/api/users/{user_id}/claims?cursor={cursor}{dates}')
+        assert response.status_code == 400